@@ -0,0 +1,10 @@
+# curl - a simple electric field visualiser
+#
+# the physics, in charges, electrostatics, fieldlines, contours and scene,
+# needs only NumPy and imports without pygame, e.g.
+#   from curl.electrostatics import calc_grid
+# while the window is opened by curl.app; run it with python -m curl
+
+# Copyright (C) 2025 Deepto Debnath, Subhradip Mondal
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
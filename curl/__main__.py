@@ -0,0 +1,32 @@
+# __main__.py - runs the program, e.g.
+#   python -m curl scene.json
+# or renders scenes to images with no window, e.g.
+#   python -m curl render scene.json --out frames/
+# or plays back a recording of its events, made with --record, e.g.
+#   python -m curl replay drag.jsonl
+
+# Copyright (C) 2025 Deepto Debnath, Subhradip Mondal
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# the program's startup time is measured from here, so that it includes
+# importing pygame, NumPy and the rest of the program
+from time import perf_counter
+start_time = perf_counter()
+
+import sys
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    # rendering needs no window, so the window's code is not even imported
+    if argv[:1] == ["render"]:
+        from .batch import main as render_main
+        return render_main(argv[1:])
+    if argv[:1] == ["replay"]:
+        from .recording import main as replay_main
+        return replay_main(argv[1:])
+    from .app import main as app_main
+    return app_main(argv, start_time)
+
+if __name__ == "__main__":
+    sys.exit(main())
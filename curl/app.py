@@ -0,0 +1,1166 @@
+# app.py - a simple electric field visualiser, the window and its game
+# loop; run it with
+#   python -m curl [scene.json]
+
+# Copyright (C) 2025 Deepto Debnath, Subhradip Mondal
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import argparse
+from time import perf_counter
+import pygame
+import numpy as np
+from math import fabs
+from .colors import *
+from .electrostatics import *
+from .contours import find_equipotentials
+from .render import *
+from .scene import make_scene, read_scene, write_scene
+from .recording import EventRecorder, replay_events
+from .charges import ChargeStore, HIT_RADIUS
+from .profiler import FrameProfiler, render_hud, HISTORY_FRAMES
+from .worker import FieldWorker, JobCancelled
+from .dynamics import Simulation, TIME_STEP
+from .poisson import ConductorSolver, OPEN_BOUNDARY
+from .density import ChargeDensity, density_field, BRUSH_RADIUS, BRUSH_CHARGE
+from .assets import load_atlas, FONT_PATH
+
+# constants
+PROG_NAME = "Curl"
+WIDTH, HEIGHT = 1185, 630
+PLAY_SURF_WIDTH, PLAY_SURF_HEIGHT = SCENE_WIDTH, SCENE_HEIGHT
+CHARGE_LIST_SURF_WIDTH, CHARGE_LIST_SURF_HEIGHT = 130, 270
+CHARGE_LIST_TEXT_SIZE = 17
+# each row of the charge list holds three lines of text and a gap
+CHARGE_ROW_HEIGHT = 3*CHARGE_LIST_TEXT_SIZE + 5
+TEXT_SIZE = 20
+FPS = 30
+# file the scene is saved to with Ctrl+S and loaded from with Ctrl+O,
+# unless another one is given on the command line; in the compact binary
+# format if its name ends in .npz
+SCENE_PATH = "scene.json"
+# stages of a frame timed by the profiler, and the file F4 writes their
+# times to
+PROFILER_STAGES = ("wait", "buttons", "charge_list", "field", "hover", "draw", "menus", "idle", "events", "simulate", "update")
+# the stages spent waiting for the next frame to be due or for events to
+# come in, which are left out of the frame rates
+IDLE_STAGES = ("wait", "idle")
+PROFILE_PATH = "frame_times.csv"
+HUD_TEXT_SIZE = 14
+HUD_REFRESH_FRAMES = 15
+# the edit dialog's cursor blinks every CURSOR_BLINK_MS; with nothing
+# happening, the program sleeps for up to IDLE_TIMEOUT_MS at a time
+CURSOR_BLINK_MS = 500
+IDLE_TIMEOUT_MS = 1000
+# steps of the simulation run every frame, which makes the simulation run
+# in real time as long as the frames keep up with FPS
+SIMULATION_STEPS_PER_FRAME = round(1/(TIME_STEP*FPS))
+# the field layer's grids are summed in this of the PRECISIONS of
+# electrostatics.py, to keep up while charges move; the hover tooltip's
+# readouts are always exact
+FIELD_LAYER_PRECISION = "fast"
+# the extended sources L, R and A add in the middle of play space, before
+# they are dragged or edited into place
+NEW_SOURCES = {"line": {"x1": 0, "y1": -100, "x2": 0, "y2": 100},
+               "ring": {"x": 0, "y": 0, "radius": 60},
+               "arc": {"x": 0, "y": 40, "radius": 80, "start": 200, "end": 340}}
+
+# returns the position of charge, a [q, x, y, name] list, as shown in
+# the charge list and when hovering on it; charges sit on whole pixels,
+# and an extended source is listed at its middle, which may not
+def position_text(charge):
+    return str((round(charge[1]), round(charge[2])))
+
+# returns the state of the scene file at path, as scene_state does, or
+# None (after saying why) if it could not be read
+def load_scene_file(path):
+    try:
+        scene = read_scene(path)
+    except (OSError, ValueError) as error:
+        print("Could not load scene from " + path + ": " + str(error))
+        return None
+    return scene_state(scene)
+
+# returns a ChargeStore of the charges of scene, rounded to whole pixels,
+# the display mode flags, the heatmap mode, the conductors, the boundary
+# potential, a ChargeDensity of the painted charge and the extended
+# sources
+def scene_state(scene):
+    q, x, y = scene["charges"]
+    return (ChargeStore(q, np.round(x), np.round(y), scene["names"]), scene["is_continuous_mode"], scene["show_equipotentials"], scene["heatmap"],
+            scene["conductors"], scene["boundary"], ChargeDensity(PLAY_SURF_WIDTH, PLAY_SURF_HEIGHT, points=scene["density"]), scene["sources"])
+
+# the program: its window, the state of the scene and of the user
+# interface, and the game loop that draws the one and handles events for
+# the other. start_time is the perf_counter() time the program started
+# at, to tell how long it took until the first frame was on screen. the
+# events of every frame are written to record_path, if given; replay
+# is a recording read by read_recording, whose scene the program starts
+# with and whose frames it plays back in place of real events
+class App:
+    def __init__(self, scene_path=None, start_time=None, record_path=None, replay=None):
+        # how long each step of starting up took, in seconds; "imports" is
+        # the time before App was made, if start_time is given
+        self.start_time = perf_counter() if start_time is None else start_time
+        self.startup_times = {"imports": perf_counter() - self.start_time}
+        self.startup_time = None
+        step_start = perf_counter()
+
+        # initiate pygame and set up the display, timer, font
+        pygame.init()
+        self.screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.SCALED|pygame.RESIZABLE)
+        self.timer = pygame.time.Clock()
+        self.font = pygame.font.Font(FONT_PATH, TEXT_SIZE)
+        self.hud_font = pygame.font.Font(FONT_PATH, HUD_TEXT_SIZE)
+        self.startup_times["display"] = perf_counter() - step_start
+        step_start = perf_counter()
+
+        # get resources, all from one atlas image. the field worker draws
+        # charges on its own thread, so it gets images of its own rather
+        # than subsurfaces that share the atlas with the game loop
+        self.images = load_atlas()
+        self.charge_images = self.images["plus"].copy(), self.images["minus"].copy()
+        self.startup_times["images"] = perf_counter() - step_start
+
+        # set up display nuances
+        pygame.display.set_caption(PROG_NAME)
+        pygame.display.set_icon(self.images["icon"])
+
+        # the overlay that darkens the screen behind the edit dialog
+        self.overlay = pygame.Surface((WIDTH, HEIGHT))
+        self.overlay.set_alpha(128)
+        self.overlay.fill(black)
+
+        # event posted by the field worker when a new field layer is ready
+        self.field_layer_ready = pygame.event.custom_type()
+
+        # program variables; charges are referred to by their id in
+        # charges, which stays the same when other charges are deleted
+        self.scene_path = scene_path or SCENE_PATH
+        self.charges = ChargeStore()
+        self.selected_charge_id = None
+        self.editing_charge = None
+        self.right_click_charge_id = None
+        self.right_click_charge = None
+        # extended sources, dicts as described at SOURCE_SHAPES, are
+        # referred to by their index in sources, and listed after the
+        # charges; L, R and A add a line, a ring and an arc
+        self.sources = []
+        self.selected_source = None
+        self.drag_start = None
+        self.right_click_source = None
+        self.editing_source = None
+
+        self.is_plus_btn_pressed = False
+        self.is_minus_btn_pressed = False
+        self.is_custom_btn_pressed = False
+        self.is_mode_btn_pressed = False
+
+        self.is_editing_charge = False
+        self.is_name_field_focused = True
+        self.is_mag_field_focused = False
+        self.is_x_field_focused = False
+        self.is_y_field_focused = False
+        self.is_charge_mag_btn_pressed = False
+        self.is_done_btn_pressed = False
+        self.is_cursor_visible = False
+
+        self.is_del_btn_pressed = False
+        self.is_edit_btn_pressed = False
+
+        self.is_continuous_mode = False
+        self.show_equipotentials = False
+        # one of HEATMAP_MODES, switched between with H
+        self.heatmap = "off"
+        # conductors held at fixed potentials come from the scene file;
+        # the edges of the play area are open, or held at boundary volts,
+        # switched between open and grounded with B
+        self.conductors = []
+        self.boundary = OPEN_BOUNDARY
+        # charge painted over play space with the brush, which D switches
+        # between painting positive charge, negative charge and off, and
+        # which paints while the left button is held down; C clears it
+        self.density = ChargeDensity(PLAY_SURF_WIDTH, PLAY_SURF_HEIGHT)
+        self.brush_sign = 0
+        self.is_painting = False
+        # while simulating, switched on and off with space, the charges
+        # move under each other's forces, except those pinned with P
+        self.is_simulating = False
+        self.simulation = Simulation(bounds=(0, 0, PLAY_SURF_WIDTH, PLAY_SURF_HEIGHT))
+
+        self.running = True
+        self.frame_count = 0
+        # where the mouse was, and the time in ms from pygame.time, when
+        # the events of the last frame came in; the whole frame goes by
+        # these, so that a replay of its events draws the same frame
+        self.mouse_pos = pygame.mouse.get_pos()
+        self.ticks = pygame.time.get_ticks()
+        self.scroll_pos = 0
+
+        # rects of the buttons, the charge list, play space and the menus,
+        # where they were last drawn, to tell what a click landed on
+        self.plus_btn_rect = self.minus_btn_rect = self.custom_btn_rect = self.mode_btn_rect = pygame.Rect(0, 0, 0, 0)
+        self.charge_list_rect = self.play_rect = pygame.Rect(0, 0, 0, 0)
+        self.del_text_rect = self.edit_text_rect = pygame.Rect(0, 0, 0, 0)
+        self.charge_mag_btn_rect = self.done_btn_rect = pygame.Rect(0, 0, 0, 0)
+        self.name_text_rect = pygame.Rect(446, 247, 292, 28)
+        self.mag_text_rect = pygame.Rect(478, 309, 260, 28)
+        self.x_text_rect = pygame.Rect(466, 372, 123, 28)
+        self.y_text_rect = pygame.Rect(614, 372, 123, 28)
+
+        # the field layer holds the field, the equipotential lines and the
+        # charges drawn in play space. it is drawn by the field worker on
+        # its own thread, from a snapshot of the scene, while the last
+        # finished layer stays on screen. scene_version is bumped on every
+        # change to charges or the display mode, and a new layer is asked
+        # for then and whenever a drag starts or ends; drag_count tells
+        # drags apart. the charges that move, the dragged one or while
+        # simulating all but the pinned ones, are left out of the layer
+        # and drawn over it every frame
+        self.scene_version = 0
+        self.drag_count = 0
+        self.submitted_field_job = None
+        self.field_layer_count = 0
+        self.field_layer = pygame.surface.Surface((PLAY_SURF_WIDTH, PLAY_SURF_HEIGHT))
+        self.field_layer.fill(dark_lavender)
+        self.play_surface = pygame.surface.Surface((PLAY_SURF_WIDTH, PLAY_SURF_HEIGHT))
+
+        # the field worker keeps the grids and potentials of the charges
+        # that stay still between the layers of one drag, or of a run of
+        # the simulation, and only adds the moving charges' part to them.
+        # it also solves for the field induced on the conductors, warm
+        # started from the last layer's solution, and works out the field
+        # of the painted charge whenever it has changed. layer_cache and
+        # conductor_solver are only ever touched on its thread
+        self.layer_cache = {"drag": None, "grids": None, "potential": None, "heatmap": None, "density": None, "density_field": None}
+        self.conductor_solver = ConductorSolver(PLAY_SURF_WIDTH, PLAY_SURF_HEIGHT)
+        # every layer comes with the field of the painted charge and the
+        # extended sources, external_field, for the simulation, and the sum
+        # of that and the induced field, grid_field, for the hover tooltip,
+        # which the game loop takes over along with the layer
+        self.external_field = None
+        self.grid_field = None
+        self.field_worker = FieldWorker((PLAY_SURF_WIDTH, PLAY_SURF_HEIGHT), self.draw_field_layer, self.field_layer_ready)
+
+        # rendered rows of the charge list, by the charge they show; a row
+        # is only rendered again once its charge has changed, and only the
+        # rows scrolled into view are looked up at all
+        self.charge_row_cache = {}
+        self.charge_list_surface = pygame.surface.Surface((CHARGE_LIST_SURF_WIDTH, CHARGE_LIST_SURF_HEIGHT))
+
+        # what each part of the screen showed when it was last drawn, by
+        # part, and where the tooltip and the profiler's numbers were drawn
+        self.drawn_keys = {}
+        self.redraw_all = True
+        self.hover_tooltip = None
+        self.drawn_tooltip = None
+        self.drawn_hud_rect = None
+        self.dirty_rects = []
+        self.redrawn_rects = []
+
+        # the profiler times every stage of every frame; F3 shows its
+        # numbers on screen, refreshed every HUD_REFRESH_FRAMES frames
+        self.profiler = FrameProfiler(PROFILER_STAGES, HISTORY_FRAMES if replay is None else max(HISTORY_FRAMES, len(replay["frames"]) + 1), IDLE_STAGES)
+        self.show_hud = False
+        self.hud_surface = None
+
+        # start with the scene given on the command line, if any, or the
+        # one of the replay
+        if replay is not None:
+            self.charges, self.is_continuous_mode, self.show_equipotentials, self.heatmap, self.conductors, self.boundary, self.density, self.sources = scene_state(replay["scene"])
+            self.mouse_pos = replay["mouse"]
+        elif scene_path:
+            loaded_scene = load_scene_file(scene_path)
+            if loaded_scene:
+                self.charges, self.is_continuous_mode, self.show_equipotentials, self.heatmap, self.conductors, self.boundary, self.density, self.sources = loaded_scene
+
+        # a replay feeds in the recorded frames one at a time, and waits
+        # for each field layer to be drawn, so that every frame draws what
+        # it did when it was recorded however fast the machine is
+        self.replay = None if replay is None else replay_events(replay)
+        self.recorder = None if record_path is None else EventRecorder(record_path, self.scene(), self.mouse_pos)
+
+    # returns a pygame.surface.Surface with given text
+    def write_text(self, text, color):
+        screen_text = self.font.render(text, False, color)
+        return screen_text
+
+    # returns a pygame.surface.Surface with the name, position and
+    # magnitude of charge, as shown in a row of the charge list
+    def render_charge_row(self, charge):
+        name_text = self.write_text("\""+charge[3]+"\"", white)
+        charge_pos_text = self.write_text(position_text(charge), white)
+        mag_text = self.write_text("Q = "+"{:.2e}".format(charge[0])+"C", light_red)
+        name_text = pygame.transform.scale(name_text, (name_text.get_width()*(CHARGE_LIST_TEXT_SIZE/name_text.get_height()), CHARGE_LIST_TEXT_SIZE))
+        charge_pos_text = pygame.transform.scale(charge_pos_text, (charge_pos_text.get_width()*(CHARGE_LIST_TEXT_SIZE/charge_pos_text.get_height()), CHARGE_LIST_TEXT_SIZE))
+        mag_text = pygame.transform.scale(mag_text, (mag_text.get_width()*(CHARGE_LIST_TEXT_SIZE/mag_text.get_height()), CHARGE_LIST_TEXT_SIZE))
+        charge_details_surf = pygame.surface.Surface((CHARGE_LIST_SURF_WIDTH, CHARGE_ROW_HEIGHT))
+        charge_details_surf.fill(prussian_blue)
+        charge_details_surf.blit(name_text, (0, 0))
+        charge_details_surf.blit(charge_pos_text, (0, CHARGE_LIST_TEXT_SIZE))
+        charge_details_surf.blit(mag_text, (0, 2*CHARGE_LIST_TEXT_SIZE))
+        return charge_details_surf
+
+    # returns the rect of a button at pos, or 6 pixels lower while pressed,
+    # and draws it if it looks different from when it was last drawn
+    def place_button(self, name, up_image, down_image, pos, is_pressed):
+        image = down_image if is_pressed else up_image
+        rect = image.get_rect(left=pos[0], top=pos[1]+6 if is_pressed else pos[1])
+        if self.drawn_keys.get(name) != (image, rect.top):
+            area = up_image.get_rect(left=pos[0], top=pos[1]).union(rect)
+            self.screen.fill(lavender, area)
+            self.screen.blit(image, rect)
+            self.dirty_rects.append(area)
+            self.redrawn_rects.append(area)
+            self.drawn_keys[name] = (image, rect.top)
+        return rect
+
+    # draws the field layer of job, a dict made in update_field_layer, on
+    # surface, and returns its external_field and grid_field; runs on the
+    # field worker's thread
+    def draw_field_layer(self, surface, job, is_cancelled):
+        cache = self.layer_cache
+        moving = job["moving"]
+        if moving is not None and cache["drag"] != job["drag"]:
+            cache.update(drag=job["drag"], grids=None, potential=None, heatmap=None)
+        # the painted charge's field only changes with it, and is kept
+        # until it does
+        if job["density"] is None:
+            cache["density_field"] = None
+        elif cache["density_field"] is None or not np.array_equal(cache["density"], job["density"]):
+            cache["density_field"] = density_field(job["density"])
+        cache["density"] = job["density"]
+        external_field = combine_grid_fields(cache["density_field"], SourceField(job["sources"]) if job["sources"] else None)
+        # the induced field depends on every charge, so it is solved for
+        # every layer, starting from the last solution
+        induced = self.conductor_solver.solve(job["charges"], job["conductors"], job["boundary"], external_field)
+        grid_field = combine_grid_fields(external_field, induced)
+        if is_cancelled():
+            raise JobCancelled
+
+        potential_grid = None
+        if job["heatmap"] != "off":
+            if moving is not None:
+                if cache["heatmap"] is None:
+                    cache["heatmap"] = calc_potential_grid(job["others"], heatmap_grid_x, heatmap_grid_y, precision=FIELD_LAYER_PRECISION)
+                potential_grid = cache["heatmap"] + calc_potential_grid(moving, heatmap_grid_x, heatmap_grid_y, precision=FIELD_LAYER_PRECISION)
+            else:
+                potential_grid = calc_potential_grid(job["charges"], heatmap_grid_x, heatmap_grid_y, precision=FIELD_LAYER_PRECISION)
+            if grid_field is not None:
+                potential_grid = grid_field.add_to_potential(potential_grid, heatmap_grid_x, heatmap_grid_y)
+            if is_cancelled():
+                raise JobCancelled
+        draw_background(surface, potential_grid, job["heatmap"])
+        if job["density"] is not None:
+            draw_density(surface, job["density"])
+
+        if job["heatmap"] != "only":
+            if job["is_continuous_mode"]:
+                field_lines = trace_field_lines(job["charges"], PLAY_SURF_WIDTH, PLAY_SURF_HEIGHT, cancelled=is_cancelled, grid_field=grid_field, sources=job["sources"])
+                if is_cancelled():
+                    raise JobCancelled
+                draw_field_lines(surface, job["charges"], field_lines=field_lines, grid_field=grid_field, sources=job["sources"])
+            else:
+                if moving is not None:
+                    # only the moving charges change, so add their part to
+                    # the grids of the still charges instead of summing
+                    # them all again
+                    if cache["grids"] is None:
+                        cache["grids"] = calc_grid(job["others"], arrow_grid_x, arrow_grid_y, precision=FIELD_LAYER_PRECISION)
+                    field_grids = superpose_grid(cache["grids"], moving, arrow_grid_x, arrow_grid_y, precision=FIELD_LAYER_PRECISION)
+                else:
+                    field_grids = calc_grid(job["charges"], arrow_grid_x, arrow_grid_y, precision=FIELD_LAYER_PRECISION)
+                if grid_field is not None:
+                    field_grids = grid_field.add_to_grid(field_grids, arrow_grid_x, arrow_grid_y)
+                if is_cancelled():
+                    raise JobCancelled
+                # finer arrows where the field changes quickly, as many as
+                # there is time for
+                field_grids, xs, ys, depth = refine_arrow_grid(job["charges"], field_grids, ARROW_REFINE_BUDGET, grid_field=grid_field, precision=FIELD_LAYER_PRECISION)
+                draw_field_arrows(surface, field_grids, 1, xs, ys, depth)
+            if is_cancelled():
+                raise JobCancelled
+
+        # the conductors, the sources and all charges but the moving ones,
+        # which are drawn over the layer as they move
+        draw_conductors(surface, job["conductors"])
+        draw_sources(surface, [source for i, source in enumerate(job["sources"]) if i != job["selected_source"]])
+        draw_charges(surface, job["others"], *self.charge_images)
+
+        if job["show_equipotentials"]:
+            if moving is not None:
+                if cache["potential"] is None:
+                    cache["potential"] = calc_potential_grid(job["others"], contour_grid_x, contour_grid_y, precision=FIELD_LAYER_PRECISION)
+                potential_grid = cache["potential"] + calc_potential_grid(moving, contour_grid_x, contour_grid_y, precision=FIELD_LAYER_PRECISION)
+            else:
+                potential_grid = calc_potential_grid(job["charges"], contour_grid_x, contour_grid_y, precision=FIELD_LAYER_PRECISION)
+            if grid_field is not None:
+                potential_grid = grid_field.add_to_potential(potential_grid, contour_grid_x, contour_grid_y)
+            draw_equipotentials(surface, find_equipotentials(potential_grid))
+        return external_field, grid_field
+
+    # draws the parts of the screen that never change, when the edit
+    # dialog opens or closes, or when the window asks for it
+    def draw_frames(self):
+        if self.redraw_all or self.drawn_keys.get("editing") != self.is_editing_charge:
+            self.screen.fill(lavender)
+            self.screen.blit(self.images["charge_list_frame"], (5, 230))
+            self.screen.blit(self.images["play_surf_frame"], (160, 5))
+            self.drawn_keys.clear()
+            self.drawn_keys["editing"] = self.is_editing_charge
+            self.dirty_rects.append(self.screen.get_rect())
+            self.redrawn_rects.append(self.screen.get_rect())
+            self.redraw_all = False
+        if self.is_editing_charge:
+            # the cursor of the edit dialog blinks every CURSOR_BLINK_MS
+            self.is_cursor_visible = self.ticks // CURSOR_BLINK_MS % 2 == 0
+
+    def draw_buttons(self):
+        images = self.images
+        self.plus_btn_rect = self.place_button("plus", images["plus_btn_up"], images["plus_btn_down"], (5, 5), self.is_plus_btn_pressed)
+        self.minus_btn_rect = self.place_button("minus", images["minus_btn_up"], images["minus_btn_down"], (5, 80), self.is_minus_btn_pressed)
+        self.custom_btn_rect = self.place_button("custom", images["custom_btn_up"], images["custom_btn_down"], (5, 155), self.is_custom_btn_pressed)
+        if self.is_continuous_mode:
+            self.mode_btn_rect = self.place_button("mode", images["cont_mode_btn_up"], images["cont_mode_btn_down"], (5, 555), self.is_mode_btn_pressed)
+        else:
+            self.mode_btn_rect = self.place_button("mode", images["discrete_mode_btn_up"], images["discrete_mode_btn_down"], (5, 555), self.is_mode_btn_pressed)
+
+    # returns the number of rows of the charge list, one for each charge
+    # and then one for each extended source
+    def charge_list_length(self):
+        return len(self.charges) + len(self.sources)
+
+    # returns row i of the charge list as a [q, x, y, name] list
+    def charge_list_row(self, i):
+        if i < len(self.charges):
+            return self.charges.get_row(i)
+        source = self.sources[i - len(self.charges)]
+        return [source["q"], *source_position(source), source["name"]]
+
+    # display list of charges
+    def draw_charge_list(self):
+        rows = self.charge_list_length()
+        self.charge_list_rect = self.charge_list_surface.get_rect(left=13, top=268)
+        if self.drawn_keys.get("charge_list") != (self.scene_version, self.scroll_pos):
+            if rows > 0:
+                self.charge_list_surface.fill(prussian_blue)
+                first_row = max(0, -self.scroll_pos // CHARGE_ROW_HEIGHT)
+                last_row = min(rows, (-self.scroll_pos + CHARGE_LIST_SURF_HEIGHT) // CHARGE_ROW_HEIGHT + 1)
+                for i in range(first_row, last_row):
+                    charge = self.charge_list_row(i)
+                    row_key = tuple(charge)
+                    if row_key not in self.charge_row_cache:
+                        self.charge_row_cache[row_key] = self.render_charge_row(charge)
+                    self.charge_list_surface.blit(self.charge_row_cache[row_key], (0, self.scroll_pos + i*CHARGE_ROW_HEIGHT))
+                # forget rows of charges that have since moved or been deleted
+                if len(self.charge_row_cache) > 2*rows + 10:
+                    self.charge_row_cache.clear()
+                self.screen.blit(self.charge_list_surface, (13, 268))
+            else:
+                self.charge_list_rect = self.images["charge_list_surface_filler"].get_rect(left=13, top=268)
+                self.screen.blit(self.images["charge_list_surface_filler"], (13, 268))
+            self.drawn_keys["charge_list"] = (self.scene_version, self.scroll_pos)
+            self.dirty_rects.append(self.charge_list_rect)
+            self.redrawn_rects.append(self.charge_list_rect)
+
+    # display play space as per selected mode; a new field layer is asked
+    # of the field worker when the scene has changed, with a copy of the
+    # charges, and shown once it is ready
+    def update_field_layer(self):
+        charges = self.charges
+        if self.submitted_field_job != (self.scene_version, self.selected_charge_id, self.selected_source):
+            is_moving = self.moving_mask()
+            drag = self.drag_count
+            if not is_moving.any():
+                moving = None
+                others = tuple(array.copy() for array in charges.arrays())
+            else:
+                moving = tuple(array[is_moving] for array in charges.arrays())
+                others = tuple(array[~is_moving] for array in charges.arrays())
+            if self.is_simulating:
+                # the still charges are the pinned ones, which may be
+                # edited while the simulation runs
+                drag = (self.drag_count,) + tuple(array.tobytes() for array in others)
+            self.field_worker.submit({"charges": tuple(array.copy() for array in charges.arrays()), "moving": moving, "others": others,
+                                      "drag": drag, "conductors": self.conductors, "boundary": self.boundary,
+                                      "density": None if self.density.is_empty() else self.density.charge.copy(),
+                                      "sources": [dict(source) for source in self.sources], "selected_source": self.selected_source,
+                                      "is_continuous_mode": self.is_continuous_mode,
+                                      "show_equipotentials": self.show_equipotentials, "heatmap": self.heatmap})
+            self.submitted_field_job = (self.scene_version, self.selected_charge_id, self.selected_source)
+            if self.replay is not None:
+                self.field_worker.wait()
+        result = self.field_worker.take_result(self.field_layer)
+        if result is not None:
+            self.field_layer, (self.external_field, self.grid_field) = result
+            self.field_layer_count += 1
+        self.play_rect = self.play_surface.get_rect(left=168, top=13)
+
+    # returns a mask of the charges that move over the field layer instead
+    # of being drawn into it: the dragged charge, and while simulating
+    # every charge that is not pinned
+    def moving_mask(self):
+        is_moving = self.charges.ids == self.selected_charge_id
+        if self.is_simulating:
+            is_moving |= ~self.simulation.pinned(self.charges.ids)
+        return is_moving
+
+    # returns the index of the topmost extended source within HIT_RADIUS
+    # of point (px, py), or None
+    def source_at(self, px, py):
+        for i in range(len(self.sources) - 1, -1, -1):
+            if source_distance(self.sources[i], px, py) < HIT_RADIUS:
+                return i
+        return None
+
+    # returns whether the right click menu of a charge or a source is open
+    def is_right_click_menu_open(self):
+        return self.right_click_charge_id is not None or self.right_click_source is not None
+
+    # display potential and field value at each position;
+    # also show charge details if hovered on a charge. the tooltip is
+    # only made again once the cursor or the charges have moved; returns
+    # what the tooltip shows, or None if there is none
+    def update_hover_tooltip(self):
+        charges = self.charges
+        hover_key = None
+        if self.play_rect.collidepoint(self.mouse_pos) and not self.is_right_click_menu_open() and not self.is_editing_charge:
+            hover_key = (self.mouse_pos, self.scene_version, self.grid_field)
+        if hover_key != self.drawn_keys.get("hover"):
+            self.hover_tooltip = None
+        if hover_key is not None and self.hover_tooltip is None:
+            name_pos_text = None; name_text = None; mag_text = None
+            play_surf_pos = (self.mouse_pos[0]-168, self.mouse_pos[1]-13)
+            hovered_charge_id = charges.charge_at(*play_surf_pos)
+            if hovered_charge_id is not None:
+                charge = charges.get(hovered_charge_id)
+                pinned_text = " (pinned)" if self.simulation.is_pinned(hovered_charge_id) else ""
+                name_pos_text = self.write_text("\""+charge[3]+"\" at "+position_text(charge)+pinned_text, white)
+                mag_text = self.write_text("Charge(Q) = "+"{:.2e}".format(charge[0])+"C", light_red)
+            else:
+                hovered_source = self.source_at(*play_surf_pos)
+                if hovered_source is not None:
+                    source = self.sources[hovered_source]
+                    name_pos_text = self.write_text("\""+source["name"]+"\" ("+source["shape"]+") at "+position_text(self.charge_list_row(len(charges) + hovered_source)), white)
+                    mag_text = self.write_text("Charge(Q) = "+"{:.2e}".format(source["q"])+"C", light_red)
+            field_grids = calc_grid(charges, *play_surf_pos, theta=0)
+            if self.grid_field is not None:
+                field_grids = self.grid_field.add_to_grid(field_grids, *play_surf_pos)
+            potential = "{:.3e}".format(float(field_grids[0])) + "V"
+            field = "{:.3e}".format(float(field_grids[3])) + "V/m"
+            pos_text = self.write_text("Cursor at "+str(play_surf_pos), white)
+            potential_text = self.write_text("Potential(V) = "+potential, light_red)
+            field_text = self.write_text("Field(E) = "+field, light_red)
+
+            if name_pos_text:
+                hover_bg_size = (max(name_pos_text.get_width(), mag_text.get_width(), pos_text.get_width(), potential_text.get_width(), field_text.get_width()) + 8,
+                                               name_pos_text.get_height() + mag_text.get_height() + pos_text.get_height() + potential_text.get_height() + field_text.get_height() + 8)
+            else:
+                hover_bg_size = (max(pos_text.get_width(), potential_text.get_width(), field_text.get_width()) + 8,
+                                               pos_text.get_height() + potential_text.get_height() + field_text.get_height() + 8)
+
+            hover_bg = pygame.surface.Surface(hover_bg_size)
+            hover_bg.fill(grey)
+            if name_pos_text:
+                hover_bg.blit(name_pos_text, (4, 4))
+                hover_bg.blit(mag_text, (4, 4 + name_pos_text.get_height()))
+                hover_bg.blit(pos_text, (4, 4 + name_pos_text.get_height() + mag_text.get_height()))
+                hover_bg.blit(potential_text, (4, 4 + name_pos_text.get_height() + mag_text.get_height() + pos_text.get_height()))
+                hover_bg.blit(field_text, (4, 4 + name_pos_text.get_height() + mag_text.get_height() + pos_text.get_height() + potential_text.get_height()))
+            else:
+                hover_bg.blit(pos_text, (4, 4))
+                hover_bg.blit(potential_text, (4, 4 + pos_text.get_height()))
+                hover_bg.blit(field_text, (4, 4 + pos_text.get_height() + potential_text.get_height()))
+            if hover_bg.get_rect(left=self.mouse_pos[0]-168, top=self.mouse_pos[1]-13).right > 1000:
+                if hover_bg.get_rect(left=self.mouse_pos[0]-168, top=self.mouse_pos[1]-13).bottom > 600:
+                    self.hover_tooltip = hover_bg, (self.mouse_pos[0]-168-hover_bg.get_width(), self.mouse_pos[1]-13-hover_bg.get_height())
+                else:
+                    self.hover_tooltip = hover_bg, (self.mouse_pos[0]-168-hover_bg.get_width(), self.mouse_pos[1]-13)
+            elif hover_bg.get_rect(left=self.mouse_pos[0]-168, top=self.mouse_pos[1]-13).bottom > 600:
+                self.hover_tooltip = hover_bg, (self.mouse_pos[0]-168, self.mouse_pos[1]-13-hover_bg.get_height())
+            else:
+                self.hover_tooltip = hover_bg, (self.mouse_pos[0]-168, self.mouse_pos[1]-13)
+        return hover_key
+
+    # show menu on right clicking charge, or an extended source, whose
+    # menu opens at its middle
+    def draw_right_click_menu(self):
+        if self.right_click_charge_id is not None:
+            right_click_charge = self.right_click_charge = self.charges.get(self.right_click_charge_id)
+            del_text = self.write_text("Delete charge", light_red)
+            edit_text = self.write_text("Edit charge", white)
+        else:
+            right_click_charge = self.right_click_charge = self.charge_list_row(len(self.charges) + self.right_click_source)
+            del_text = self.write_text("Delete source", light_red)
+            edit_text = self.write_text("Edit source", white)
+        hover_bg = pygame.surface.Surface((max(del_text.get_width(), edit_text.get_width()) + 8,
+                                           del_text.get_height() + edit_text.get_height() + 8))
+        hover_bg.fill(grey)
+        if hover_bg.get_rect(left=right_click_charge[1], top=right_click_charge[2]).right > 1000:
+            if hover_bg.get_rect(left=right_click_charge[1], top=right_click_charge[2]).bottom > 600:
+                blit_coords = (right_click_charge[1]-hover_bg.get_width(), right_click_charge[2]-hover_bg.get_height())
+            else:
+                blit_coords = (right_click_charge[1]-hover_bg.get_width(), right_click_charge[2])
+        elif hover_bg.get_rect(left=right_click_charge[1], top=right_click_charge[2]).bottom > 600:
+            blit_coords = (right_click_charge[1], right_click_charge[2]-hover_bg.get_height())
+        else:
+            blit_coords = (right_click_charge[1], right_click_charge[2])
+        if not self.is_del_btn_pressed:
+            hover_bg.blit(del_text, (4, 4))
+            self.del_text_rect = del_text.get_rect(left=blit_coords[0]+172, top=blit_coords[1]+17)
+        else:
+            hover_bg.blit(del_text, (4, 6))
+            self.del_text_rect = del_text.get_rect(left=blit_coords[0]+172, top=blit_coords[1]+19)
+        if not self.is_edit_btn_pressed:
+            hover_bg.blit(edit_text, (4, 4 + del_text.get_height()))
+            self.edit_text_rect = edit_text.get_rect(left=blit_coords[0]+172, top=blit_coords[1]+17+del_text.get_height())
+        else:
+            hover_bg.blit(edit_text, (4, 6 + del_text.get_height()))
+            self.edit_text_rect = edit_text.get_rect(left=blit_coords[0]+172, top=blit_coords[1]+19+del_text.get_height())
+        self.play_surface.blit(hover_bg, blit_coords)
+
+    # put the play space together from the field layer, the moving
+    # charges, the brush, the tooltip, the right click menu and the
+    # profiler's numbers
+    # whenever one of them, or the edit dialog over it, has changed. the
+    # whole play space is updated on the display when its content has
+    # changed, and otherwise only where the tooltip or numbers were and are
+    def draw_play_space(self, hover_key):
+        if self.show_hud and (self.hud_surface is None or self.frame_count % HUD_REFRESH_FRAMES == 0):
+            extra_lines = ["field worker: " + "{:.2f}".format(self.field_worker.job_time*1000) + "ms"]
+            if self.startup_time is not None:
+                extra_lines.append("startup: " + "{:.0f}".format(self.startup_time*1000) + "ms")
+            self.hud_surface = render_hud(self.profiler, self.hud_font, white, grey, extra_lines)
+        play_surf_pos = (self.mouse_pos[0]-168, self.mouse_pos[1]-13)
+        brush_key = self.brush_sign != 0 and self.play_rect.collidepoint(self.mouse_pos) and (self.brush_sign, play_surf_pos)
+        play_key = (self.field_layer_count, self.scene_version, self.selected_charge_id, self.selected_source, self.right_click_charge_id, self.right_click_source,
+                    self.is_del_btn_pressed, self.is_edit_btn_pressed, brush_key)
+        hud_key = self.show_hud and self.hud_surface
+        dialog_key = self.is_editing_charge and (tuple(self.editing_charge), self.is_name_field_focused, self.is_mag_field_focused, self.is_x_field_focused,
+                                                 self.is_y_field_focused, self.is_charge_mag_btn_pressed, self.is_done_btn_pressed, self.is_cursor_visible)
+        changed = [name for name, key in (("play", play_key), ("hover", hover_key), ("hud", hud_key), ("dialog", dialog_key)) if self.drawn_keys.get(name) != key]
+        if not changed:
+            return
+        self.play_surface.blit(self.field_layer, (0, 0))
+        is_moving = self.moving_mask()
+        if is_moving.any():
+            draw_charges(self.play_surface, tuple(array[is_moving] for array in self.charges.arrays()), self.images["plus"], self.images["minus"])
+        if self.selected_source is not None:
+            draw_sources(self.play_surface, [self.sources[self.selected_source]])
+        if brush_key:
+            pygame.draw.circle(self.play_surface, light_red if self.brush_sign > 0 else gradient_15, play_surf_pos, BRUSH_RADIUS, width=2)
+        if self.hover_tooltip is not None:
+            self.play_surface.blit(*self.hover_tooltip)
+        if self.is_right_click_menu_open():
+            self.draw_right_click_menu()
+        self.screen.blit(self.play_surface, (168, 13))
+        self.redrawn_rects.append(self.play_rect)
+
+        # show the profiler's numbers over the top right of play space
+        hud_rect = None
+        if self.show_hud:
+            hud_rect = self.hud_surface.get_rect(right=168 + PLAY_SURF_WIDTH, top=13)
+            self.screen.blit(self.hud_surface, hud_rect)
+
+        if "play" in changed:
+            self.dirty_rects.append(self.play_rect)
+        else:
+            if "hover" in changed:
+                for tooltip in (self.drawn_tooltip, self.hover_tooltip):
+                    if tooltip is not None:
+                        self.dirty_rects.append(tooltip[0].get_rect(left=tooltip[1][0]+168, top=tooltip[1][1]+13))
+            if "hud" in changed:
+                self.dirty_rects += [rect for rect in (self.drawn_hud_rect, hud_rect) if rect is not None]
+        self.drawn_keys.update(play=play_key, hover=hover_key, hud=hud_key, dialog=dialog_key)
+        self.drawn_tooltip = self.hover_tooltip
+        self.drawn_hud_rect = hud_rect
+
+    # show charge adding dialogue over everything redrawn beneath it
+    def draw_edit_dialog(self):
+        if not (self.is_editing_charge and self.redrawn_rects):
+            return
+        editing_charge = self.editing_charge
+        if self.screen.get_rect() in self.redrawn_rects:
+            self.redrawn_rects = [self.screen.get_rect()]
+        for rect in self.redrawn_rects:
+            self.screen.blit(self.overlay, rect, rect)
+
+        # the dialog's image is already converted for the display, and only
+        # copied to write on
+        edit_charge_dialog = self.images["edit_charge_dialog"].copy()
+        if not self.is_charge_mag_btn_pressed:
+            if editing_charge[4] == "+":
+                self.charge_mag_btn_rect = self.images["plus_mag_btn_up"].get_rect(left=446, top=309)
+                edit_charge_dialog.blit(self.images["plus_mag_btn_up"], (13, 137))
+            elif editing_charge[4] == "-":
+                self.charge_mag_btn_rect = self.images["minus_mag_btn_up"].get_rect(left=446, top=309)
+                edit_charge_dialog.blit(self.images["minus_mag_btn_up"], (13, 137))
+        else:
+            if editing_charge[4] == "+":
+                self.charge_mag_btn_rect = self.images["plus_mag_btn_down"].get_rect(left=446, top=311)
+                edit_charge_dialog.blit(self.images["plus_mag_btn_down"], (13, 139))
+            elif editing_charge[4] == "-":
+                self.charge_mag_btn_rect = self.images["minus_mag_btn_down"].get_rect(left=446, top=311)
+                edit_charge_dialog.blit(self.images["minus_mag_btn_down"], (13, 139))
+
+        if not self.is_done_btn_pressed:
+            self.done_btn_rect = self.images["done_btn_up"].get_rect(left=446, top=412)
+            edit_charge_dialog.blit(self.images["done_btn_up"], (13, 240))
+        else:
+            self.done_btn_rect = self.images["done_btn_down"].get_rect(left=446, top=414)
+            edit_charge_dialog.blit(self.images["done_btn_down"], (13, 242))
+
+        charge_name_text = self.write_text(editing_charge[3], black)
+        if editing_charge[0] == "" or editing_charge[0] == ".":
+            charge_mag_text = self.write_text('0', light_grey)
+        else:
+            charge_mag_text = self.write_text(editing_charge[0], black)
+        if editing_charge[1] == "":
+            charge_x_text = self.write_text('0', light_grey)
+        else:
+            charge_x_text = self.write_text(editing_charge[1], black)
+        if editing_charge[2] == "":
+            charge_y_text = self.write_text('0', light_grey)
+        else:
+            charge_y_text = self.write_text(editing_charge[2], black)
+        edit_charge_dialog.blit(charge_name_text, (20, 75))
+        edit_charge_dialog.blit(charge_mag_text,  (52, 137))
+        edit_charge_dialog.blit(charge_x_text,  (40, 200))
+        edit_charge_dialog.blit(charge_y_text,  (188, 200))
+
+        if self.is_name_field_focused and self.is_cursor_visible:
+            pygame.draw.line(edit_charge_dialog, black, (charge_name_text.get_width()+20, 78), (charge_name_text.get_width()+20, 95))
+        elif self.is_mag_field_focused and self.is_cursor_visible:
+            pygame.draw.line(edit_charge_dialog, black, (charge_mag_text.get_width()+52, 140), (charge_mag_text.get_width()+52, 157))
+        elif self.is_x_field_focused and self.is_cursor_visible:
+            pygame.draw.line(edit_charge_dialog, black, (charge_x_text.get_width()+40, 203), (charge_x_text.get_width()+40, 220))
+        elif self.is_y_field_focused and self.is_cursor_visible:
+            pygame.draw.line(edit_charge_dialog, black, (charge_y_text.get_width()+188, 203), (charge_y_text.get_width()+188, 220))
+
+        self.screen.blit(edit_charge_dialog, (433, 172))
+        self.dirty_rects.append(edit_charge_dialog.get_rect(left=433, top=172))
+
+    # returns the events that came in since the last frame, and updates
+    # mouse_pos and ticks. when nothing has changed on screen, sleeps
+    # until something happens first: an event comes in, the field worker
+    # finishes a layer, or the cursor of the edit dialog is due to blink.
+    # a replay takes the next recorded frame instead, and quits once they
+    # have all been played
+    def wait_for_events(self):
+        if self.replay is not None:
+            pygame.event.get()
+            frame = next(self.replay, None)
+            if frame is None:
+                return [pygame.event.Event(pygame.QUIT)]
+            self.mouse_pos, self.ticks, events = frame
+            return events
+        events = []
+        if not self.dirty_rects:
+            if self.is_editing_charge:
+                events.append(pygame.event.wait(CURSOR_BLINK_MS - pygame.time.get_ticks() % CURSOR_BLINK_MS))
+            else:
+                events.append(pygame.event.wait(IDLE_TIMEOUT_MS))
+        events += pygame.event.get()
+        self.mouse_pos = pygame.mouse.get_pos()
+        self.ticks = pygame.time.get_ticks()
+        return events
+
+    # returns the scene as it is now, as make_scene does
+    def scene(self):
+        return make_scene(self.charges.charge_list(), self.is_continuous_mode, self.show_equipotentials, heatmap=self.heatmap,
+                          conductors=self.conductors, boundary=self.boundary,
+                          density=None if self.density.is_empty() else self.density.points(), sources=self.sources)
+
+    # adds a charge of q coulombs in the middle of play space and returns
+    # its id
+    def add_charge(self, q):
+        charge_id = self.charges.add(q, int(PLAY_SURF_WIDTH/2), int(PLAY_SURF_HEIGHT/2), "Charge"+str(len(self.charges)+1))
+        self.scene_version += 1
+        return charge_id
+
+    # adds an extended source of one coulomb, of the given shape, in the
+    # middle of play space
+    def add_source(self, shape):
+        count = sum(source["shape"] == shape for source in self.sources)
+        source = {"shape": shape, "name": shape.capitalize()+str(count+1), "q": 1.0}
+        source.update({key: float(value) for key, value in NEW_SOURCES[shape].items()})
+        self.sources.append(move_source(source, int(PLAY_SURF_WIDTH/2), int(PLAY_SURF_HEIGHT/2)))
+        self.scene_version += 1
+
+    # closes the edit dialog and puts the charge as edited into charges,
+    # or the source as edited into sources, moved so that its middle is
+    # at the position typed in
+    def finish_editing(self):
+        editing_charge = self.editing_charge
+        self.is_editing_charge = False
+        editing_charge[0] = editing_charge[0].strip("+-*/")
+        if (editing_charge[0] == "" or editing_charge[0] == ".") and editing_charge[4] == "+":
+            editing_charge[0] = 0.0
+        elif (editing_charge[0] == "" or editing_charge[0] == ".") and editing_charge[4] == "-":
+            editing_charge[0] = -0.0
+        else:
+            editing_charge[0] = float(editing_charge[4] + str(eval(editing_charge[0])))
+        if editing_charge[1] == "":
+            editing_charge[1] = 0
+        else:
+            editing_charge[1] = int(editing_charge[1])
+        if editing_charge[2] == "":
+            editing_charge[2] = 0
+        else:
+            editing_charge[2] = int(editing_charge[2])
+        del editing_charge[4]
+        if self.editing_source is not None:
+            source = self.sources[self.editing_source]
+            x, y = source_position(source)
+            source = move_source(source, editing_charge[1] - x, editing_charge[2] - y)
+            source.update(q=editing_charge[0], name=editing_charge[3])
+            self.sources[self.editing_source] = source
+            self.editing_source = None
+        else:
+            self.charges.update(editing_charge[4], *editing_charge[0:4])
+        self.scene_version += 1
+
+    # focuses the edit dialog's field of the given name
+    def focus_field(self, name):
+        self.is_name_field_focused = name == "name"
+        self.is_mag_field_focused = name == "mag"
+        self.is_x_field_focused = name == "x"
+        self.is_y_field_focused = name == "y"
+
+    def handle_mouse_up(self, event):
+        charges = self.charges
+        if self.plus_btn_rect.collidepoint(event.pos) and not self.is_editing_charge:
+            self.add_charge(1)
+        elif self.minus_btn_rect.collidepoint(event.pos) and not self.is_editing_charge:
+            self.add_charge(-1)
+        elif self.custom_btn_rect.collidepoint(event.pos) and not self.is_editing_charge:
+            self.is_editing_charge = True
+            new_charge_id = self.add_charge(1)
+            new_charge = charges.get(new_charge_id)
+            self.editing_charge = [str(fabs(new_charge[0])), str(round(new_charge[1])), str(round(new_charge[2])), new_charge[3], "+", new_charge_id]
+        elif self.is_editing_charge and self.charge_mag_btn_rect.collidepoint(event.pos):
+            if self.editing_charge[4] == "+":
+                self.editing_charge[4] = "-"
+            elif self.editing_charge[4] == "-":
+                self.editing_charge[4] = "+"
+        elif self.is_editing_charge and self.done_btn_rect.collidepoint(event.pos):
+            self.finish_editing()
+        elif self.is_editing_charge and self.name_text_rect.collidepoint(event.pos):
+            self.focus_field("name")
+        elif self.is_editing_charge and self.mag_text_rect.collidepoint(event.pos):
+            self.focus_field("mag")
+        elif self.is_editing_charge and self.x_text_rect.collidepoint(event.pos):
+            self.focus_field("x")
+        elif self.is_editing_charge and self.y_text_rect.collidepoint(event.pos):
+            self.focus_field("y")
+        elif self.mode_btn_rect.collidepoint(event.pos) and not self.is_editing_charge:
+            self.is_continuous_mode = not self.is_continuous_mode
+            self.scene_version += 1
+        elif self.is_right_click_menu_open() and self.del_text_rect.collidepoint(event.pos):
+            if self.right_click_charge_id is not None:
+                charges.remove(self.right_click_charge_id)
+            else:
+                del self.sources[self.right_click_source]
+            self.scene_version += 1
+            self.right_click_charge_id = None
+        elif self.is_right_click_menu_open() and self.edit_text_rect.collidepoint(event.pos):
+            self.is_editing_charge = True
+            self.editing_source = self.right_click_source
+            right_click_charge = self.right_click_charge
+            if right_click_charge[0] >= 0:
+                self.editing_charge = [str(fabs(right_click_charge[0])), str(round(right_click_charge[1])), str(round(right_click_charge[2])), right_click_charge[3], "+", self.right_click_charge_id]
+            else:
+                self.editing_charge = [str(fabs(right_click_charge[0])), str(round(right_click_charge[1])), str(round(right_click_charge[2])), right_click_charge[3], "-", self.right_click_charge_id]
+            self.right_click_charge_id = None
+
+        self.is_plus_btn_pressed = False
+        self.is_minus_btn_pressed = False
+        self.is_custom_btn_pressed = False
+        self.is_mode_btn_pressed = False
+        self.is_charge_mag_btn_pressed = False
+        self.is_done_btn_pressed = False
+        self.is_del_btn_pressed = False
+        self.is_edit_btn_pressed = False
+        self.selected_charge_id = None
+        self.selected_source = None
+        self.right_click_charge_id = None
+        self.right_click_source = None
+        self.is_painting = False
+
+        if event.button == 3: # check if there has been a right click
+            self.right_click_charge_id = charges.charge_at(event.pos[0]-168, event.pos[1]-13)
+            if self.right_click_charge_id is None and self.play_rect.collidepoint(event.pos):
+                self.right_click_source = self.source_at(event.pos[0]-168, event.pos[1]-13)
+
+        if self.charge_list_rect.collidepoint(event.pos) and self.charge_list_length() > 0:
+            if event.button == 4 and self.scroll_pos < 0: # check for mouse scroll up
+                self.scroll_pos += 10
+            elif event.button == 5 and self.scroll_pos > -self.charge_list_length()*CHARGE_ROW_HEIGHT + self.charge_list_rect.height: # check for mouse scroll down
+                self.scroll_pos -= 10
+
+    def handle_mouse_down(self, event):
+        if self.plus_btn_rect.collidepoint(event.pos):
+            self.is_plus_btn_pressed = True
+        if self.minus_btn_rect.collidepoint(event.pos):
+            self.is_minus_btn_pressed = True
+        if self.custom_btn_rect.collidepoint(event.pos):
+            self.is_custom_btn_pressed = True
+        if self.mode_btn_rect.collidepoint(event.pos):
+            self.is_mode_btn_pressed = True
+        if self.is_editing_charge and self.charge_mag_btn_rect.collidepoint(event.pos):
+            self.is_charge_mag_btn_pressed = True
+        if self.is_editing_charge and self.done_btn_rect.collidepoint(event.pos):
+            self.is_done_btn_pressed = True
+        if self.is_right_click_menu_open() and self.del_text_rect.collidepoint(event.pos):
+            self.is_del_btn_pressed = True
+        if self.is_right_click_menu_open() and self.edit_text_rect.collidepoint(event.pos):
+            self.is_edit_btn_pressed = True
+
+        if self.brush_sign != 0 and event.button == 1 and self.play_rect.collidepoint(event.pos) and not self.is_right_click_menu_open() and not self.is_editing_charge:
+            self.is_painting = True
+        elif not self.is_right_click_menu_open(): # handle charge drag and drop
+            self.selected_charge_id = self.charges.charge_at(event.pos[0]-168, event.pos[1]-13)
+            if self.selected_charge_id is None and self.play_rect.collidepoint(event.pos) and not self.is_editing_charge:
+                # a source is dragged by wherever it was picked up
+                self.selected_source = self.source_at(event.pos[0]-168, event.pos[1]-13)
+                self.drag_start = event.pos
+            self.drag_count += 1
+
+    def handle_key(self, event):
+        if event.key == pygame.K_e and not self.is_editing_charge:
+            self.show_equipotentials = not self.show_equipotentials
+            self.scene_version += 1
+        if event.key == pygame.K_h and not self.is_editing_charge:
+            self.heatmap = HEATMAP_MODES[(HEATMAP_MODES.index(self.heatmap) + 1) % len(HEATMAP_MODES)]
+            self.scene_version += 1
+        if event.key == pygame.K_b and not self.is_editing_charge:
+            self.boundary = 0.0 if self.boundary == OPEN_BOUNDARY else OPEN_BOUNDARY
+            self.scene_version += 1
+        if event.key == pygame.K_SPACE and not self.is_editing_charge:
+            self.is_simulating = not self.is_simulating
+            self.scene_version += 1
+        if event.key == pygame.K_d and not self.is_editing_charge:
+            self.brush_sign = {0: 1, 1: -1, -1: 0}[self.brush_sign]
+        if event.key == pygame.K_c and not event.mod & pygame.KMOD_CTRL and not self.is_editing_charge and not self.density.is_empty():
+            self.density.clear()
+            self.scene_version += 1
+        if event.key == pygame.K_l and not self.is_editing_charge:
+            self.add_source("line")
+        if event.key == pygame.K_r and not self.is_editing_charge:
+            self.add_source("ring")
+        if event.key == pygame.K_a and not self.is_editing_charge:
+            self.add_source("arc")
+        if event.key == pygame.K_p and not self.is_editing_charge:
+            hovered_charge_id = self.charges.charge_at(self.mouse_pos[0]-168, self.mouse_pos[1]-13)
+            if hovered_charge_id is not None:
+                self.simulation.set_pinned(self.charges.ids, hovered_charge_id, not self.simulation.is_pinned(hovered_charge_id))
+                self.scene_version += 1
+        if event.key == pygame.K_F3:
+            self.show_hud = not self.show_hud
+            self.hud_surface = None
+        if event.key == pygame.K_F4:
+            try:
+                self.profiler.write_csv(PROFILE_PATH)
+                print("Saved frame times to " + PROFILE_PATH)
+            except OSError as error:
+                print("Could not save frame times to " + PROFILE_PATH + ": " + str(error))
+        if event.key == pygame.K_s and event.mod & pygame.KMOD_CTRL and not self.is_editing_charge:
+            try:
+                write_scene(self.scene_path, self.scene())
+                print("Saved scene to " + self.scene_path)
+            except OSError as error:
+                print("Could not save scene to " + self.scene_path + ": " + str(error))
+        if event.key == pygame.K_o and event.mod & pygame.KMOD_CTRL and not self.is_editing_charge:
+            loaded_scene = load_scene_file(self.scene_path)
+            if loaded_scene:
+                self.charges, self.is_continuous_mode, self.show_equipotentials, self.heatmap, self.conductors, self.boundary, self.density, self.sources = loaded_scene
+                self.simulation.reset()
+                self.selected_charge_id = None
+                self.selected_source = None
+                self.right_click_charge_id = None
+                self.right_click_source = None
+                self.scroll_pos = 0
+                self.scene_version += 1
+        if event.key == pygame.K_RETURN and self.is_editing_charge:
+            self.finish_editing()
+
+        editing_charge = self.editing_charge
+        if self.is_editing_charge and self.is_name_field_focused:
+            charge_name = editing_charge[3]
+            if event.key == pygame.K_BACKSPACE and len(charge_name)>0:
+                charge_name = charge_name[:-1]
+            elif event.key != pygame.K_BACKSPACE and len(charge_name)<10:
+                charge_name += event.unicode
+            editing_charge[3] = charge_name
+        elif self.is_editing_charge and self.is_mag_field_focused:
+            allowed_chars = (pygame.K_0, pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4, pygame.K_5,
+                             pygame.K_6, pygame.K_7, pygame.K_8, pygame.K_9, pygame.K_LEFTPAREN, pygame.K_RIGHTPAREN,
+                             pygame.K_PERIOD, pygame.K_PLUS, pygame.K_MINUS, pygame.K_ASTERISK, pygame.K_SLASH)
+            charge_mag_str = editing_charge[0]
+            if event.key == pygame.K_BACKSPACE and len(charge_mag_str)>0:
+                charge_mag_str = charge_mag_str[:-1]
+            elif event.key in allowed_chars:
+                charge_mag_str += event.unicode
+            editing_charge[0] = charge_mag_str
+        elif self.is_editing_charge and self.is_x_field_focused:
+            charge_x_str = editing_charge[1]
+            allowed_chars = (pygame.K_0, pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4, pygame.K_5,
+                             pygame.K_6, pygame.K_7, pygame.K_8, pygame.K_9)
+            if event.key == pygame.K_BACKSPACE and len(charge_x_str)>0:
+                charge_x_str = charge_x_str[:-1]
+            elif event.key in allowed_chars and int(charge_x_str + event.unicode) <= 1000:
+                charge_x_str += event.unicode
+            editing_charge[1] = charge_x_str
+        elif self.is_editing_charge and self.is_y_field_focused:
+            charge_y_str = editing_charge[2]
+            allowed_chars = (pygame.K_0, pygame.K_1, pygame.K_2, pygame.K_3, pygame.K_4, pygame.K_5,
+                             pygame.K_6, pygame.K_7, pygame.K_8, pygame.K_9)
+            if event.key == pygame.K_BACKSPACE and len(charge_y_str)>0:
+                charge_y_str = charge_y_str[:-1]
+            elif event.key in allowed_chars and int(charge_y_str + event.unicode) <= 600:
+                charge_y_str += event.unicode
+            editing_charge[2] = charge_y_str
+
+    # handle mouse and keyboard events
+    def handle_event(self, event):
+        if event.type == pygame.QUIT:
+            self.running = False
+        if event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+            self.redraw_all = True
+        if event.type == pygame.MOUSEBUTTONUP:
+            self.handle_mouse_up(event)
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            self.handle_mouse_down(event)
+        if event.type == pygame.KEYDOWN:
+            self.handle_key(event)
+
+    # handle drag and drop of selected charge
+    def drag_selected_charge(self):
+        if self.selected_charge_id is None:
+            return
+        charge_move_area = pygame.Rect(self.play_rect.left, self.play_rect.top, PLAY_SURF_WIDTH, PLAY_SURF_HEIGHT)
+        if charge_move_area.collidepoint(self.mouse_pos):
+            if self.charges.get(self.selected_charge_id)[1:3] != [self.mouse_pos[0]-168, self.mouse_pos[1]-13]:
+                self.charges.update(self.selected_charge_id, x=self.mouse_pos[0]-168, y=self.mouse_pos[1]-13)
+                self.scene_version += 1
+        else:
+            self.selected_charge_id = None
+
+    # handle drag and drop of the selected extended source, which moves
+    # as far as the cursor has since the last frame
+    def drag_selected_source(self):
+        if self.selected_source is None:
+            return
+        if self.play_rect.collidepoint(self.mouse_pos):
+            mouse_pos = self.mouse_pos
+            if mouse_pos != self.drag_start:
+                self.sources[self.selected_source] = move_source(self.sources[self.selected_source], mouse_pos[0] - self.drag_start[0], mouse_pos[1] - self.drag_start[1])
+                self.drag_start = mouse_pos
+                self.scene_version += 1
+        else:
+            self.selected_source = None
+
+    # paints charge under the cursor while the brush is held down in play
+    # space
+    def paint_density(self):
+        if not self.is_painting:
+            return
+        if self.play_rect.collidepoint(self.mouse_pos):
+            self.density.paint(self.mouse_pos[0]-168, self.mouse_pos[1]-13, self.brush_sign*BRUSH_CHARGE)
+            self.scene_version += 1
+        else:
+            self.is_painting = False
+
+    # moves the charges on by a frame of the simulation, while it runs;
+    # the dragged charge stays under the cursor, painted charge and the
+    # extended sources push and pull the charges but stay put, and nothing
+    # moves while a charge is being edited
+    def step_simulation(self):
+        charges = self.charges
+        if not self.is_simulating or self.is_editing_charge or len(charges) == 0:
+            return
+        held = charges.ids == self.selected_charge_id
+        x, y = charges.x, charges.y
+        for i in range(SIMULATION_STEPS_PER_FRAME):
+            x, y = self.simulation.step(charges.ids, charges.q, x, y, held, self.external_field)
+        if not (np.array_equal(x, charges.x) and np.array_equal(y, charges.y)):
+            charges.move_all(x, y)
+            self.scene_version += 1
+
+    # runs one pass of the game loop: draws what has changed, handles the
+    # events that came in and updates the display
+    def frame(self):
+        profiler = self.profiler
+        profiler.start_frame(self.frame_count)
+
+        # setup timer and the parts of the screen that never change
+        self.timer.tick(FPS if self.replay is None else 0)
+        self.frame_count += 1
+        profiler.mark("wait")
+        # only the parts of the screen that look different from when they
+        # were last drawn are drawn again, and only those are updated on
+        # the display
+        self.dirty_rects = []
+        self.redrawn_rects = []
+        self.draw_frames()
+        self.draw_buttons()
+        profiler.mark("buttons")
+        self.draw_charge_list()
+        profiler.mark("charge_list")
+        self.update_field_layer()
+        profiler.mark("field")
+        hover_key = self.update_hover_tooltip()
+        profiler.mark("hover")
+        self.draw_play_space(hover_key)
+        profiler.mark("draw")
+        self.draw_edit_dialog()
+        profiler.mark("menus")
+
+        events = self.wait_for_events()
+        profiler.mark("idle")
+        if self.recorder is not None:
+            self.recorder.record(self.frame_count, self.mouse_pos, self.ticks, events)
+        for event in events:
+            self.handle_event(event)
+        self.drag_selected_charge()
+        self.drag_selected_source()
+        self.paint_density()
+        profiler.mark("events")
+        self.step_simulation()
+        profiler.mark("simulate")
+
+        # update the parts of the display that have changed
+        if self.dirty_rects:
+            pygame.display.update(self.dirty_rects)
+        if self.startup_time is None:
+            self.report_startup()
+        profiler.mark("update")
+
+    # says how long the program took from starting to its first frame
+    # being on screen, and which steps the time went to
+    def report_startup(self):
+        self.startup_time = perf_counter() - self.start_time
+        self.startup_times["first frame"] = self.startup_time - sum(self.startup_times.values())
+        print(PROG_NAME + " started in " + "{:.0f}".format(self.startup_time*1000) + "ms (" +
+              ", ".join(step + " " + "{:.0f}".format(seconds*1000) + "ms" for step, seconds in self.startup_times.items()) + ")")
+
+    # game execution loop
+    def run(self):
+        while self.running:
+            self.frame()
+
+        # quit when out of game execution loop
+        if self.recorder is not None:
+            self.recorder.close()
+        self.field_worker.stop()
+        pygame.quit()
+
+# opens the window with the scene file given in argv, if any, and runs
+# the program until it is closed
+def main(argv=None, start_time=None):
+    parser = argparse.ArgumentParser(prog="python -m curl", description="Electric field visualiser.")
+    parser.add_argument("scene", nargs="?", help="scene file to open, and to save to with Ctrl+S (default: " + SCENE_PATH + ")")
+    parser.add_argument("--record", metavar="PATH", help="record the events of every frame to PATH, for python -m curl replay")
+    args = parser.parse_args(argv)
+    App(args.scene, start_time, args.record).run()
+    return 0
@@ -0,0 +1,73 @@
+# assets.py - the images and font of the user interface. the images are
+# packed into one atlas, images/atlas.png, with the place of each image
+# in images/atlas.json, so that starting up reads a single image file;
+#   python -m curl.assets
+# packs the atlas again after an image in images/ has changed
+
+# Copyright (C) 2025 Deepto Debnath, Subhradip Mondal
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import json
+import pygame
+
+# the images and font live next to the package, and are found from
+# wherever the program is started
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMAGE_DIR = os.path.join(ROOT_DIR, "images")
+FONT_PATH = os.path.join(ROOT_DIR, "font", "Doto-Black.ttf")
+ATLAS_PATH = os.path.join(IMAGE_DIR, "atlas.png")
+ATLAS_INDEX_PATH = os.path.join(IMAGE_DIR, "atlas.json")
+
+# the images packed into the atlas, each from images/<name>.png
+ATLAS_IMAGES = ("plus", "minus", "icon",
+                "plus_btn_up", "plus_btn_down", "minus_btn_up", "minus_btn_down",
+                "custom_btn_up", "custom_btn_down", "discrete_mode_btn_up", "discrete_mode_btn_down",
+                "cont_mode_btn_up", "cont_mode_btn_down", "play_surf_frame", "charge_list_frame",
+                "charge_list_surface_filler", "edit_charge_dialog", "plus_mag_btn_up", "plus_mag_btn_down",
+                "minus_mag_btn_up", "minus_mag_btn_down", "done_btn_up", "done_btn_down")
+
+# returns the (x, y, width, height) of every image, by name, for images
+# of the given sizes placed in rows of an atlas width pixels wide, the
+# tallest images first, and the height of the atlas
+def pack_rects(sizes, width):
+    rects = {}
+    x, y, row_height = 0, 0, 0
+    for name in sorted(sizes, key=lambda name: (-sizes[name][1], name)):
+        image_width, image_height = sizes[name]
+        if x + image_width > width:
+            x, y, row_height = 0, y + row_height, 0
+        rects[name] = (x, y, image_width, image_height)
+        x += image_width
+        row_height = max(row_height, image_height)
+    return rects, y + row_height
+
+# packs the images of ATLAS_IMAGES into the atlas and writes it, and the
+# place of every image in it, to atlas_path and index_path
+def pack_atlas(image_dir=IMAGE_DIR, atlas_path=ATLAS_PATH, index_path=ATLAS_INDEX_PATH):
+    images = {name: pygame.image.load(os.path.join(image_dir, name + ".png")) for name in ATLAS_IMAGES}
+    sizes = {name: image.get_size() for name, image in images.items()}
+    rects, height = pack_rects(sizes, max(1024, max(width for width, height in sizes.values())))
+    atlas = pygame.Surface((max(x + width for x, y, width, height in rects.values()), height), pygame.SRCALPHA)
+    atlas.fill((0, 0, 0, 0))
+    for name, image in images.items():
+        atlas.blit(image, rects[name][:2])
+    pygame.image.save(atlas, atlas_path)
+    with open(index_path, "w") as index_file:
+        json.dump({name: list(rects[name]) for name in ATLAS_IMAGES}, index_file, indent=1)
+
+# returns the images of the atlas by name, as subsurfaces of the atlas,
+# which is loaded once; convert makes them match the display for fast
+# drawing, and needs the display to be set up
+def load_atlas(atlas_path=ATLAS_PATH, index_path=ATLAS_INDEX_PATH, convert=True):
+    with open(index_path) as index_file:
+        rects = json.load(index_file)
+    atlas = pygame.image.load(atlas_path)
+    if convert:
+        atlas = atlas.convert_alpha()
+    return {name: atlas.subsurface(rect) for name, rect in rects.items()}
+
+if __name__ == "__main__":
+    pack_atlas()
+    print("packed", len(ATLAS_IMAGES), "images into", ATLAS_PATH)
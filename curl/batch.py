@@ -0,0 +1,205 @@
+# batch.py - renders scene files to images with no window, e.g.
+#   python -m curl render scene.json --out frames/ --size 4000x2400
+
+# Copyright (C) 2025 Deepto Debnath, Subhradip Mondal
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import argparse
+import multiprocessing
+from functools import partial
+from math import ceil
+from multiprocessing import shared_memory, resource_tracker
+
+# no display is needed, so make sure SDL never tries to open one
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import numpy as np
+from .electrostatics import charge_arrays, prepare_charges, calc_potential_grid
+from .render import render_scene, load_charge_images, SCENE_WIDTH, SCENE_HEIGHT, HEATMAP_MODES, HEATMAP_STEP
+from .scene import read_scene, scene_frames
+from .poisson import ConductorSolver
+
+# with fewer frames than processes, as for a single large poster, each
+# frame's heatmap is split into tiles of TILE_POINTS points that the
+# whole pool works on, once it has at least MIN_TILED_POINTS points
+TILE_POINTS = 2**16
+MIN_TILED_POINTS = 4*TILE_POINTS
+
+# charge images of a worker process, loaded once by init_worker, and its
+# conductor solver, which warm starts each frame from the one before
+charge_images = None
+conductor_solver = None
+# the name of the shared memory holding the charges of the frame a worker
+# last worked on tiles of, and those charges, prepared once for all of
+# the frame's tiles
+tile_charges = None
+
+# returns the (width, height) given as text like "4000x2400"
+def parse_size(text):
+    try:
+        width, height = (int(part) for part in text.lower().split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError("size must look like 4000x2400, not \"" + text + "\"") from None
+    if width <= 0 or height <= 0:
+        raise argparse.ArgumentTypeError("size must be positive, not \"" + text + "\"")
+    return width, height
+
+# loads the resources each process renders frames with
+def init_worker():
+    global charge_images, conductor_solver
+    charge_images = load_charge_images()
+    conductor_solver = ConductorSolver(SCENE_WIDTH, SCENE_HEIGHT)
+
+# returns a new block of shared memory holding a copy of array, and a
+# float array of its shape over the block
+def share_array(array):
+    memory = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    shared = np.ndarray(array.shape, buffer=memory.buf)
+    shared[:] = array
+    return memory, shared
+
+# works out the potential at one tile of the points of the shared
+# memory block points_name, a (3, n_points) array of their x and y
+# coordinates and the potential there, written in place, from the
+# (3, n_charges) array of q, x and y in charges_name; runs in a worker
+# process. only the names and sizes of the blocks and the range of
+# points of the tile are sent to the worker, never the arrays
+def calc_tile(task):
+    global tile_charges
+    charges_name, n_charges, points_name, n_points, start, stop = task
+    if tile_charges is None or tile_charges[0] != charges_name:
+        memory = shared_memory.SharedMemory(charges_name)
+        charges = np.ndarray((3, n_charges), buffer=memory.buf).copy()
+        memory.close()
+        tile_charges = charges_name, prepare_charges(tuple(charges))
+    memory = shared_memory.SharedMemory(points_name)
+    points = np.ndarray((3, n_points), buffer=memory.buf)
+    points[2, start:stop] = calc_potential_grid(tile_charges[1], points[0, start:stop], points[1, start:stop])
+    del points
+    memory.close()
+
+# returns the potential of the charges in charge_list at the points xs,
+# ys like calc_potential_grid, with the points split into tiles of
+# TILE_POINTS that the processes of pool work out side by side. the
+# charges and the points are put in shared memory once, and each tile
+# writes its potentials into the same shared array, which holds the
+# whole grid once every tile is done
+def tiled_potential_grid(pool, charge_list, xs, ys):
+    xs, ys = np.broadcast_arrays(np.asarray(xs, dtype=float), np.asarray(ys, dtype=float))
+    charges = np.array(charge_arrays(charge_list), dtype=float).reshape(3, -1)
+    if xs.size < MIN_TILED_POINTS or charges.shape[1] == 0:
+        return calc_potential_grid(charge_list, xs, ys)
+    charges_memory, shared_charges = share_array(charges)
+    points_memory, points = share_array(np.stack((xs.ravel(), ys.ravel(), np.zeros(xs.size))))
+    try:
+        tasks = [(charges_memory.name, charges.shape[1], points_memory.name, xs.size, start, min(start + TILE_POINTS, xs.size))
+                 for start in range(0, xs.size, TILE_POINTS)]
+        pool.map(calc_tile, tasks, chunksize=1)
+        return points[2].reshape(xs.shape).copy()
+    finally:
+        del shared_charges, points
+        for memory in (charges_memory, points_memory):
+            memory.close()
+            memory.unlink()
+
+# returns the number of points of the heatmap of a frame of the given
+# size, as render_scene samples it
+def heatmap_points(size):
+    return ceil(size[0]/HEATMAP_STEP)*ceil(size[1]/HEATMAP_STEP)
+
+# renders one frame to an offscreen surface and saves it; job is a tuple
+# of (path, charge_list, size, is_continuous_mode, show_equipotentials,
+# heatmap, conductors, boundary, density, sources). with a pool, the
+# frame's heatmap is worked out in tiles by the pool's processes
+def render_frame(job, pool=None):
+    path, charge_list, size, is_continuous_mode, show_equipotentials, heatmap, conductors, boundary, density, sources = job
+    surface = pygame.Surface(size)
+    heatmap_calc = calc_potential_grid if pool is None else partial(tiled_potential_grid, pool)
+    render_scene(surface, charge_list, is_continuous_mode, show_equipotentials, charge_images, heatmap, conductors, boundary, conductor_solver, density, sources,
+                 heatmap_calc)
+    pygame.image.save(surface, path)
+    return path
+
+# renders every job over a pool of processes processes: a frame to each
+# process at a time, or, with fewer frames than processes and heatmaps
+# big enough to split, one frame after another with the tiles of each
+# heatmap spread over the pool
+def render_frames(jobs, processes=None):
+    processes = processes or os.cpu_count() or 1
+    is_tiled = len(jobs) < processes and any(job[5] != "off" and heatmap_points(job[2]) >= MIN_TILED_POINTS for job in jobs)
+    if not is_tiled:
+        processes = min(processes, len(jobs))
+    if processes <= 1:
+        init_worker()
+        return [render_frame(job) for job in jobs]
+    # workers are forked where possible, so they start with everything
+    # already imported instead of importing the program afresh
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing.get_context()
+    if is_tiled:
+        # the workers attach to the shared memory of each frame, which is
+        # tracked by one resource tracker for the whole pool only if it
+        # runs before they are forked
+        resource_tracker.ensure_running()
+    with context.Pool(processes, initializer=init_worker) as pool:
+        if not is_tiled:
+            return pool.map(render_frame, jobs, chunksize=1)
+        init_worker()
+        return [render_frame(job, pool) for job in jobs]
+
+# joins the images at paths into an animated GIF; needs Pillow
+def write_gif(paths, gif_path, fps):
+    from PIL import Image
+    frames = [Image.open(path).convert("RGB").quantize() for path in paths]
+    frames[0].save(gif_path, save_all=True, append_images=frames[1:], duration=round(1000/fps), loop=0)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m curl render", description="Render a scene file to PNG images without opening a window.")
+    parser.add_argument("scene", help="scene file to render, as JSON or .npz")
+    parser.add_argument("--out", default="frames", help="directory to write the frames to (default: frames)")
+    parser.add_argument("--size", type=parse_size, default=(SCENE_WIDTH, SCENE_HEIGHT), help="size of the images, like 4000x2400 (default: 1000x600)")
+    parser.add_argument("--mode", choices=("discrete", "continuous"), help="display mode, overriding the one in the scene file")
+    parser.add_argument("--equipotentials", action="store_true", help="draw equipotential lines")
+    parser.add_argument("--heatmap", choices=HEATMAP_MODES, help="potential heatmap, under the field or on its own, overriding the scene file")
+    parser.add_argument("--gif", help="also join the frames into an animated GIF at this path (needs Pillow)")
+    parser.add_argument("--fps", type=float, default=30, help="frame rate of the GIF (default: 30)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="number of processes to render with (default: one per core)")
+    args = parser.parse_args(argv)
+
+    try:
+        scene = read_scene(args.scene)
+    except (OSError, ValueError) as error:
+        parser.exit(1, parser.prog + ": " + str(error) + "\n")
+    if args.gif:
+        try:
+            import PIL
+        except ImportError:
+            parser.exit(1, parser.prog + ": writing GIFs needs Pillow (pip install pillow)\n")
+
+    is_continuous_mode = scene["is_continuous_mode"]
+    if args.mode:
+        is_continuous_mode = args.mode == "continuous"
+    show_equipotentials = scene["show_equipotentials"] or args.equipotentials
+    heatmap = args.heatmap or scene["heatmap"]
+
+    frames = scene_frames(scene)
+    digits = max(4, len(str(len(frames)-1)))
+    os.makedirs(args.out, exist_ok=True)
+    jobs = [(os.path.join(args.out, "frame_" + str(i).zfill(digits) + ".png"), charge_list, args.size, is_continuous_mode, show_equipotentials, heatmap,
+             scene["conductors"], scene["boundary"], scene["density"], scene["sources"])
+            for i, charge_list in enumerate(frames)]
+    paths = render_frames(jobs, args.jobs)
+    print("rendered", len(paths), "frame(s) to", args.out)
+
+    if args.gif:
+        write_gif(paths, args.gif, args.fps)
+        print("wrote", args.gif)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,359 @@
+# benchmark.py - measures the speed of the electrostatics kernels and
+# of rendering whole frames, with no display needed, e.g.
+#   python -m curl.benchmark --out results.json
+#   python -m curl.benchmark --out new.json --compare results.json
+
+# Copyright (C) 2025 Deepto Debnath, Subhradip Mondal
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+import multiprocessing
+from multiprocessing import resource_tracker
+
+# no display is needed, so make sure SDL never tries to open one
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+import numpy as np
+from .electrostatics import calc_potential, calc_field, calc_potential_grid, calc_grid, charge_arrays, approximation_error, APPROX_THETA, calc_source_terms, source_distance, source_points
+from .dynamics import Simulation, cell_list_error, CELL_LIST_CUTOFF
+from .poisson import ConductorSolver
+from .density import ChargeDensity, density_grids, kernel_spectra
+from .batch import tiled_potential_grid, heatmap_points
+from .render import render_scene, load_charge_images, draw_field_arrow, draw_field_arrows, arrow_classes, draw_heatmap, refine_arrow_grid, heatmap_grid, ARROW_ANGLES, HEATMAP_STEP, arrow_grid_x, arrow_grid_y, heatmap_grid_x, heatmap_grid_y, ARROW_REFINE_BUDGET, SCENE_WIDTH, SCENE_HEIGHT
+
+SIZES = (1, 10, 100, 1000)
+# size of the poster whose heatmap is timed in tiles over a pool of
+# processes, for POSTER_CHARGES random charges
+POSTER_SIZE = (7680, 4608)
+POSTER_CHARGES = 10
+LAYOUTS = ("dipole", "quadrupole", "random", "line")
+# each benchmark is repeated until it has run for MIN_TIME seconds,
+# but at least once and at most MAX_REPEATS times
+MIN_TIME = 0.5
+MAX_REPEATS = 20
+# keys of a result entry that hold what was measured rather than what
+# the benchmark was
+MEASURED_KEYS = ("repeats", "best", "mean", "potential_max", "potential_rms", "field_max", "field_rms", "force_max", "force_rms",
+                 "color_mismatch", "color_max", "length_mismatch", "length_max", "angle_mismatch", "angle_max")
+# the program is started this many times in a fresh interpreter to time
+# its startup, by running STARTUP_SCRIPT up to its first frame; the
+# physics is imported on its own by PHYSICS_IMPORT_SCRIPT, which also
+# tells whether that pulled in pygame. both print their times as JSON
+STARTUP_REPEATS = 5
+STARTUP_SCRIPT = """
+import json
+from curl.__main__ import start_time
+from curl.app import App
+app = App(start_time=start_time)
+app.frame()
+app.field_worker.stop()
+print(json.dumps(dict(app.startup_times, total=app.startup_time)))
+"""
+PHYSICS_IMPORT_SCRIPT = """
+import sys, json, time
+start = time.perf_counter()
+import curl.charges, curl.electrostatics, curl.fieldlines, curl.contours, curl.dynamics, curl.poisson, curl.density, curl.scene
+print(json.dumps({"time": time.perf_counter() - start, "pygame": "pygame" in sys.modules}))
+"""
+
+# a grounded plate and a charged disc, for the conductor solver
+BENCHMARK_CONDUCTORS = [{"shape": "rect", "x": 480, "y": 100, "width": 12, "height": 400, "potential": 0},
+                        {"shape": "circle", "x": 750, "y": 420, "radius": 60, "potential": 5*10**7}]
+# one extended source of each shape, for the closed forms and the
+# quadrature of electrostatics.py; each is checked against
+# SOURCE_CHECK_POINTS point charges spread along it, at the points of the
+# arrow grid at least SOURCE_CHECK_DISTANCE pixels away, where those
+# charges are close enough to the smooth charge they stand in for
+BENCHMARK_SOURCES = [{"shape": "line", "name": "Line1", "q": 1.0, "x1": 300, "y1": 150, "x2": 300, "y2": 450},
+                     {"shape": "ring", "name": "Ring1", "q": 1.0, "x": 500, "y": 300, "radius": 80},
+                     {"shape": "arc", "name": "Arc1", "q": 1.0, "x": 750, "y": 300, "radius": 120, "start": 120, "end": 300}]
+SOURCE_CHECK_POINTS = 20000
+SOURCE_CHECK_DISTANCE = 10
+
+# returns a charge_list of n charges in one of the LAYOUTS:
+#   dipole      two clusters of opposite charge
+#   quadrupole  four clusters at the corners of a square, alternating sign
+#   random      charges of random sign scattered over the play area
+#   line        a row of positive charges, like a charged plate
+# the same layout and n always give the same charges
+def make_layout(layout, n):
+    rng = np.random.default_rng(n)
+    centre_x, centre_y = SCENE_WIDTH/2, SCENE_HEIGHT/2
+    if layout == "dipole":
+        poles = [(centre_x-150, centre_y, 1), (centre_x+150, centre_y, -1)]
+    elif layout == "quadrupole":
+        poles = [(centre_x-150, centre_y-150, 1), (centre_x+150, centre_y-150, -1),
+                 (centre_x+150, centre_y+150, 1), (centre_x-150, centre_y+150, -1)]
+    elif layout == "random":
+        return [[float(rng.choice([-1, 1])), float(rng.uniform(0, SCENE_WIDTH)), float(rng.uniform(0, SCENE_HEIGHT)), "Charge"+str(i+1)]
+                for i in range(n)]
+    elif layout == "line":
+        xs = np.linspace(100, SCENE_WIDTH-100, n) if n > 1 else [centre_x]
+        return [[1.0, float(x), centre_y, "Charge"+str(i+1)] for i, x in enumerate(xs)]
+    else:
+        raise ValueError("unknown layout \"" + layout + "\"")
+
+    # charges of a pole are spread over a small cluster around it
+    charge_list = []
+    for i in range(n):
+        x, y, sign = poles[i % len(poles)]
+        charge_list.append([float(sign), float(x + rng.normal(0, 10)), float(y + rng.normal(0, 10)), "Charge"+str(i+1)])
+    return charge_list
+
+# runs function repeatedly and returns a result entry with the best and
+# mean time of a run, in seconds
+def measure(name, function, **params):
+    times = []
+    while len(times) < MAX_REPEATS and (not times or sum(times) < MIN_TIME):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    entry = {"name": name}
+    entry.update(params)
+    entry.update({"repeats": len(times), "best": min(times), "mean": sum(times)/len(times)})
+    return entry
+
+# returns the error of the field of source at the points xs, ys at least
+# SOURCE_CHECK_DISTANCE from it, against that of SOURCE_CHECK_POINTS
+# point charges along it, relative to the root mean square of the latter
+def source_error(source, xs, ys):
+    far = source_distance(source, xs, ys) >= SOURCE_CHECK_DISTANCE
+    xs, ys = xs[far], ys[far]
+    x, y = source_points(source, SOURCE_CHECK_POINTS)[:2]
+    exact = calc_grid((np.full(SOURCE_CHECK_POINTS, source["q"]/SOURCE_CHECK_POINTS), x, y), xs, ys, theta=0)
+    potential_grid, field_x, field_y = calc_source_terms([source], xs, ys)
+    potential_error = np.abs(potential_grid - exact[0])
+    field_error = np.hypot(field_x - exact[1], field_y - exact[2])
+    potential_scale = np.sqrt(np.mean(exact[0]**2))
+    field_scale = np.sqrt(np.mean(exact[3]**2))
+    return {"potential_max": float(potential_error.max()/potential_scale),
+            "potential_rms": float(np.sqrt(np.mean(potential_error**2))/potential_scale),
+            "field_max": float(field_error.max()/field_scale),
+            "field_rms": float(np.sqrt(np.mean(field_error**2))/field_scale)}
+
+# returns how often the arrows of charge_list at the points xs, ys are
+# drawn differently when their grids are summed in "fast" rather than
+# "exact" precision: for their colour band, length class and direction
+# class, the fraction of arrows whose class differs and the most it
+# differs by, in classes (directions counted around the circle)
+def precision_disagreement(charge_list, xs, ys):
+    exact = arrow_classes(calc_grid(charge_list, xs, ys, theta=0))
+    fast = arrow_classes(calc_grid(charge_list, xs, ys, theta=0, precision="fast"))
+    disagreement = {}
+    for name, exact_class, fast_class in zip(("color", "length", "angle"), exact, fast):
+        difference = np.abs(exact_class - fast_class)
+        if name == "angle":
+            difference = np.where((exact_class < 0) != (fast_class < 0), 1, np.minimum(difference, ARROW_ANGLES - difference))
+        disagreement[name + "_mismatch"] = float(np.count_nonzero(difference)/difference.size)
+        disagreement[name + "_max"] = int(difference.max(initial=0))
+    return disagreement
+
+# returns micro-benchmarks of the scalar kernels, of drawing a single
+# arrow and of drawing the whole arrow grid from the sprite atlas; the
+# kernels are timed for one point of a random layout of n charges, and
+# for the whole discrete mode arrow grid with calc_grid, summed exactly,
+# in "fast" single precision, whose disagreement with the exact arrows
+# is recorded, and with the Barnes-Hut approximation at opening angle
+# theta, whose error against the exact sums is recorded too. refining the arrow grid
+# is timed within the program's time budget, and the potential heatmap
+# from its potential grid to the scaled up image. a step of the charges'
+# simulation is timed with the forces summed over every pair and with a
+# cell list, whose error against the full sums is recorded. so is
+# solving for the field induced on BENCHMARK_CONDUCTORS in a grounded
+# play area, from scratch and warm started after the charges moved. the
+# FFT convolution giving the field of painted charge is timed with the
+# kernel spectra worked out afresh and cached, and the field of each of
+# BENCHMARK_SOURCES over the arrow grid, with its error
+def micro_benchmarks(sizes, theta=APPROX_THETA):
+    results = []
+    surface = pygame.Surface((SCENE_WIDTH, SCENE_HEIGHT))
+    for n in sizes:
+        charge_list = make_layout("random", n)
+        point = [SCENE_WIDTH/2 + 0.5, SCENE_HEIGHT/2 + 0.5]
+        results.append(measure("calc_potential", lambda: calc_potential(charge_list, point), n=n))
+        results.append(measure("calc_field", lambda: calc_field(charge_list, point), n=n))
+        charges = charge_arrays(charge_list)
+        results.append(measure("calc_grid", lambda: calc_grid(charges, arrow_grid_x, arrow_grid_y, theta=0), n=n, points=arrow_grid_x.size))
+        results.append(measure("calc_grid_fast", lambda: calc_grid(charges, arrow_grid_x, arrow_grid_y, theta=0, precision="fast"), n=n, points=arrow_grid_x.size))
+        results[-1].update(precision_disagreement(charges, arrow_grid_x, arrow_grid_y))
+        results.append(measure("calc_grid_fast", lambda: calc_grid(charges, heatmap_grid_x, heatmap_grid_y, theta=0, precision="fast"), n=n, points=heatmap_grid_x.size))
+        results[-1].update(precision_disagreement(charges, heatmap_grid_x, heatmap_grid_y))
+        results.append(measure("calc_grid_approx", lambda: calc_grid(charges, arrow_grid_x, arrow_grid_y, theta=theta),
+                               n=n, points=arrow_grid_x.size, theta=theta))
+        results[-1].update(approximation_error(charges, arrow_grid_x, arrow_grid_y, theta))
+        field_grids = calc_grid(charges, arrow_grid_x, arrow_grid_y)
+        results.append(measure("refine_arrow_grid", lambda: refine_arrow_grid(charges, field_grids, ARROW_REFINE_BUDGET), n=n, budget=ARROW_REFINE_BUDGET))
+        results.append(measure("draw_heatmap", lambda: draw_heatmap(surface, calc_potential_grid(charges, heatmap_grid_x, heatmap_grid_y)),
+                               n=n, points=heatmap_grid_x.size))
+        ids = np.arange(n)
+        for forces, cutoff in (("direct", np.inf), ("cell_list", CELL_LIST_CUTOFF)):
+            simulation = Simulation(cutoff=cutoff)
+            results.append(measure("simulation_step", lambda: simulation.step(ids, *charges), n=n, forces=forces))
+        results[-1].update(cell_list_error(*charges, CELL_LIST_CUTOFF))
+        results.append(measure("conductor_solve", lambda: ConductorSolver(SCENE_WIDTH, SCENE_HEIGHT).solve(charges, BENCHMARK_CONDUCTORS, 0), n=n, start="cold"))
+        # the warm solves move the charges a pixel back and forth
+        solver = ConductorSolver(SCENE_WIDTH, SCENE_HEIGHT)
+        positions = [charges, (charges[0], charges[1] + 1, charges[2])]
+        solver.solve(charges, BENCHMARK_CONDUCTORS, 0)
+        def warm_solve():
+            positions.reverse()
+            return solver.solve(positions[0], BENCHMARK_CONDUCTORS, 0)
+        results.append(measure("conductor_solve", warm_solve, n=n, start="warm"))
+
+    density = ChargeDensity(SCENE_WIDTH, SCENE_HEIGHT)
+    density.paint(SCENE_WIDTH/3, SCENE_HEIGHT/2, 1)
+    density.paint(2*SCENE_WIDTH/3, SCENE_HEIGHT/2, -1)
+    def cold_density():
+        kernel_spectra.clear()
+        return density_grids(density.charge, density.spacing)
+    results.append(measure("density_fft", cold_density, points=density.charge.size, spectra="cold"))
+    results.append(measure("density_fft", lambda: density_grids(density.charge, density.spacing), points=density.charge.size, spectra="cached"))
+
+    for source in BENCHMARK_SOURCES:
+        results.append(measure("source_grid", lambda: calc_source_terms([source], arrow_grid_x, arrow_grid_y), shape=source["shape"], points=arrow_grid_x.size))
+        results[-1].update(source_error(source, arrow_grid_x, arrow_grid_y))
+
+    field = [2.5*10**5, [0.6, 0.8]]
+    results.append(measure("draw_field_arrow", lambda: [draw_field_arrow(surface, 10**6, field, False, centre=[500, 300]) for i in range(1000)], calls=1000))
+    field_grids = calc_grid(make_layout("random", 10), arrow_grid_x, arrow_grid_y)
+    results.append(measure("draw_field_arrows", lambda: draw_field_arrows(surface, field_grids), points=arrow_grid_x.size))
+    return results
+
+# returns benchmarks of working out the heatmap of a POSTER_SIZE frame in
+# tiles, as batch.py does for large exports, over pools of one process
+# and of one process per core, to tell how the time scales with cores
+def tiled_benchmarks():
+    charges = charge_arrays(make_layout("random", POSTER_CHARGES))
+    scale = min(POSTER_SIZE[0]/SCENE_WIDTH, POSTER_SIZE[1]/SCENE_HEIGHT)
+    xs, ys = heatmap_grid(POSTER_SIZE[0]/scale, POSTER_SIZE[1]/scale, HEATMAP_STEP/scale)
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing.get_context()
+    # as in batch.py, the workers must share the parent's resource tracker
+    # so that the shared memory they attach to is not counted as leaked
+    resource_tracker.ensure_running()
+    results = []
+    for processes in sorted({1, os.cpu_count() or 1}):
+        with context.Pool(processes) as pool:
+            results.append(measure("tiled_heatmap", lambda: tiled_potential_grid(pool, charges, xs, ys), n=POSTER_CHARGES,
+                                   points=heatmap_points(POSTER_SIZE), processes=processes))
+    return results
+
+# runs script in a fresh interpreter, with no display, and returns the
+# JSON it prints last
+def run_script(script):
+    root_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True,
+                            cwd=root_dir, env=dict(os.environ, SDL_VIDEODRIVER="dummy")).stdout
+    return json.loads(output.splitlines()[-1])
+
+# returns benchmarks of importing the physics and of each step of
+# starting the program (imports, display, images, first frame), with
+# the total time from starting until the first frame is on screen
+def startup_benchmarks(repeats=STARTUP_REPEATS):
+    imports = [run_script(PHYSICS_IMPORT_SCRIPT) for i in range(repeats)]
+    if any(run["pygame"] for run in imports):
+        print("warning: importing the physics imports pygame")
+    times = {"import_physics": [run["time"] for run in imports]}
+    for i in range(repeats):
+        for step, seconds in run_script(STARTUP_SCRIPT).items():
+            times.setdefault(step, []).append(seconds)
+    return [{"name": "startup", "step": step, "repeats": len(step_times), "best": min(step_times), "mean": sum(step_times)/len(step_times)}
+            for step, step_times in times.items()]
+
+# returns macro-benchmarks of rendering one whole frame offscreen, for
+# each layout, number of charges and display mode, where the "heatmap"
+# mode shows the potential heatmap alone
+def macro_benchmarks(sizes, layouts, modes):
+    results = []
+    charge_images = load_charge_images()
+    surface = pygame.Surface((SCENE_WIDTH, SCENE_HEIGHT))
+    for layout in layouts:
+        for n in sizes:
+            charge_list = make_layout(layout, n)
+            for mode in modes:
+                is_continuous_mode = mode == "continuous"
+                heatmap = "only" if mode == "heatmap" else "off"
+                results.append(measure("render_frame", lambda: render_scene(surface, charge_list, is_continuous_mode, charge_images=charge_images, heatmap=heatmap),
+                                       layout=layout, n=n, mode=mode))
+                print_entry(results[-1])
+    return results
+
+# returns a short description of the code and machine that was measured
+def environment():
+    try:
+        commit = subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {"commit": commit, "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(), "numpy": np.__version__, "pygame": pygame.version.ver,
+            "platform": platform.platform(), "processor": platform.processor(), "cpus": os.cpu_count()}
+
+# returns the key that identifies the same benchmark in two result files
+def entry_key(entry):
+    return tuple(sorted((key, value) for key, value in entry.items() if key not in MEASURED_KEYS))
+
+def print_entry(entry, baseline=None):
+    params = ", ".join(key + "=" + str(value) for key, value in entry.items() if key not in ("name",) + MEASURED_KEYS)
+    line = "{:<18} {:<42} {:>10.3f} ms".format(entry["name"], params, entry["best"]*1000)
+    if "field_rms" in entry:
+        line += "  field error {:.1e} rms, {:.1e} max".format(entry["field_rms"], entry["field_max"])
+    if "color_mismatch" in entry:
+        line += "  differs in colour {:.1e}, length {:.1e}, direction {:.1e} (at most {}, {}, {} classes)".format(
+            entry["color_mismatch"], entry["length_mismatch"], entry["angle_mismatch"], entry["color_max"], entry["length_max"], entry["angle_max"])
+    if "force_rms" in entry:
+        line += "  force error {:.1e} rms, {:.1e} max".format(entry["force_rms"], entry["force_max"])
+    if baseline:
+        line += "  {:>6.2f}x".format(baseline["best"]/entry["best"])
+    print(line)
+    sys.stdout.flush()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the electrostatics kernels and frame rendering, with no display needed.")
+    parser.add_argument("--out", default="benchmark.json", help="JSON file to write the results to (default: benchmark.json)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES, help="numbers of charges to benchmark (default: 1 10 100 1000)")
+    parser.add_argument("--layouts", nargs="+", choices=LAYOUTS, default=LAYOUTS, help="charge layouts for the frame benchmarks")
+    parser.add_argument("--modes", nargs="+", choices=("discrete", "continuous", "heatmap"), default=("discrete", "continuous"), help="display modes for the frame benchmarks")
+    parser.add_argument("--skip-micro", action="store_true", help="only run the frame benchmarks")
+    parser.add_argument("--skip-startup", action="store_true", help="do not time starting the program")
+    parser.add_argument("--theta", type=float, default=APPROX_THETA, help="opening angle of the approximate calc_grid benchmark (default: %(default)s)")
+    parser.add_argument("--compare", help="earlier results file to print the speedup against")
+    args = parser.parse_args(argv)
+
+    results = []
+    if not args.skip_micro:
+        results += micro_benchmarks(args.sizes, args.theta) + tiled_benchmarks()
+        for entry in results:
+            print_entry(entry)
+    if not args.skip_startup:
+        startup_results = startup_benchmarks()
+        for entry in startup_results:
+            print_entry(entry)
+        results += startup_results
+    results += macro_benchmarks(args.sizes, args.layouts, args.modes)
+
+    with open(args.out, "w") as results_file:
+        json.dump({"environment": environment(), "results": results}, results_file, indent=1)
+    print("wrote", args.out)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = {entry_key(entry): entry for entry in json.load(baseline_file)["results"]}
+        print("\nspeedup against", args.compare)
+        for entry in results:
+            if entry_key(entry) in baseline:
+                print_entry(entry, baseline[entry_key(entry)])
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,154 @@
+# charges.py - storage of the charges in play space, as arrays the
+# electrostatics functions use directly, with a spatial index to find
+# the charge at a point
+
+# Copyright (C) 2025 Deepto Debnath, Subhradip Mondal
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+
+# side of the square cells of the spatial index; a charge is found at a
+# point within HIT_RADIUS of it along both axes, as the image drawn for
+# it covers, so a point only needs to look in its own and the eight
+# neighbouring cells
+HIT_RADIUS = 16
+HIT_CELL_SIZE = 2*HIT_RADIUS
+
+# holds charges as contiguous arrays of their magnitudes q and positions
+# x, y, with a list of their names. every charge gets an id when added
+# that stays the same until it is removed, however many charges before
+# it are removed; ids grow in the order charges are added, which is also
+# the order they are kept, listed and drawn in (later ones on top).
+# the arrays have room to spare, so adding a charge rarely copies them
+class ChargeStore:
+    def __init__(self, q=(), x=(), y=(), names=()):
+        self.count = len(names)
+        self._data = np.zeros((3, max(16, self.count)))
+        self._data[0, :self.count] = q
+        self._data[1, :self.count] = x
+        self._data[2, :self.count] = y
+        self._ids = np.zeros(self._data.shape[1], dtype=int)
+        self._ids[:self.count] = np.arange(self.count)
+        self.names = list(names)
+        self.next_id = self.count
+        self._build_index()
+
+    def __len__(self):
+        return self.count
+
+    # the magnitudes, positions and ids of the charges, as views of the
+    # used part of the arrays
+    @property
+    def q(self):
+        return self._data[0, :self.count]
+
+    @property
+    def x(self):
+        return self._data[1, :self.count]
+
+    @property
+    def y(self):
+        return self._data[2, :self.count]
+
+    @property
+    def ids(self):
+        return self._ids[:self.count]
+
+    # returns the (q, x, y) arrays the grid functions in electrostatics.py
+    # take in place of a charge_list
+    def arrays(self):
+        return self.q, self.x, self.y
+
+    # returns the (q, x, y) arrays of the charges with the given ids, or
+    # of every other charge if exclude is set
+    def select(self, charge_ids, exclude=False):
+        mask = np.isin(self.ids, charge_ids)
+        if exclude:
+            mask = ~mask
+        return self.q[mask], self.x[mask], self.y[mask]
+
+    # returns where the charge with charge_id is kept in the arrays
+    def row(self, charge_id):
+        row = int(np.searchsorted(self.ids, charge_id))
+        if row == len(self.ids) or self.ids[row] != charge_id:
+            raise KeyError(charge_id)
+        return row
+
+    # returns the charge with charge_id as a [q, x, y, name] list
+    def get(self, charge_id):
+        return self.get_row(self.row(charge_id))
+
+    def get_row(self, row):
+        return [float(self.q[row]), float(self.x[row]), float(self.y[row]), self.names[row]]
+
+    # returns the charges as a charge_list of [q, x, y, name]
+    def charge_list(self):
+        return [list(charge) for charge in zip(self.q.tolist(), self.x.tolist(), self.y.tolist(), self.names)]
+
+    # adds a charge and returns its id
+    def add(self, q, x, y, name):
+        charge_id = self.next_id
+        self.next_id += 1
+        if self.count == self._data.shape[1]:
+            self._data = np.concatenate((self._data, np.zeros_like(self._data)), axis=1)
+            self._ids = np.concatenate((self._ids, np.zeros_like(self._ids)))
+        self._data[:, self.count] = q, x, y
+        self._ids[self.count] = charge_id
+        self.count += 1
+        self.names.append(name)
+        self.cells.setdefault(self._cell(x, y), []).append(charge_id)
+        return charge_id
+
+    def remove(self, charge_id):
+        row = self.row(charge_id)
+        self.cells[self._cell(self.x[row], self.y[row])].remove(charge_id)
+        self._data[:, row:self.count-1] = self._data[:, row+1:self.count]
+        self._ids[row:self.count-1] = self._ids[row+1:self.count]
+        self.count -= 1
+        del self.names[row]
+
+    # changes the magnitude, position or name of the charge with charge_id
+    def update(self, charge_id, q=None, x=None, y=None, name=None):
+        row = self.row(charge_id)
+        if q is not None:
+            self.q[row] = q
+        if name is not None:
+            self.names[row] = name
+        if x is not None or y is not None:
+            self.cells[self._cell(self.x[row], self.y[row])].remove(charge_id)
+            if x is not None:
+                self.x[row] = x
+            if y is not None:
+                self.y[row] = y
+            self.cells.setdefault(self._cell(self.x[row], self.y[row]), []).append(charge_id)
+
+    # moves every charge at once, to the positions x, y given in the order
+    # the charges are kept
+    def move_all(self, x, y):
+        self.x[:] = x
+        self.y[:] = y
+        self._build_index()
+
+    # returns the id of the topmost charge at point (px, py), or None
+    def charge_at(self, px, py):
+        cell_x, cell_y = self._cell(px, py)
+        found = None
+        for i in (cell_x-1, cell_x, cell_x+1):
+            for j in (cell_y-1, cell_y, cell_y+1):
+                for charge_id in self.cells.get((i, j), ()):
+                    if found is not None and charge_id < found:
+                        continue
+                    row = self.row(charge_id)
+                    if self.x[row]-HIT_RADIUS <= px < self.x[row]+HIT_RADIUS and self.y[row]-HIT_RADIUS <= py < self.y[row]+HIT_RADIUS:
+                        found = charge_id
+        return found
+
+    # returns the cell of the spatial index that point (x, y) is in
+    def _cell(self, x, y):
+        return int(x // HIT_CELL_SIZE), int(y // HIT_CELL_SIZE)
+
+    def _build_index(self):
+        self.cells = {}
+        for charge_id, x, y in zip(self.ids.tolist(), self.x.tolist(), self.y.tolist()):
+            self.cells.setdefault(self._cell(x, y), []).append(charge_id)
@@ -0,0 +1,115 @@
+# contours.py - extraction of equipotential lines from a sampled
+# potential grid, using marching squares
+
+# Copyright (C) 2025 Deepto Debnath, Subhradip Mondal
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+
+# default potential levels of the equipotential lines; these are the
+# edges of the potential bands that the gradient_* colours stand for
+POTENTIAL_LEVELS = (-8*10**7, -4*10**7, -4*10**6, -9*10**5, -8*10**5,
+                    8*10**5, 9*10**5, 4*10**6, 4*10**7, 8*10**7)
+# distance in pixels between the points the potential is sampled at;
+# samples sit half a pixel off the pixel grid so that none of them
+# falls exactly on a charge, where its potential is not defined
+CONTOUR_SPACING = 5
+CONTOUR_ORIGIN = (0.5, 0.5)
+
+# line segments crossing a cell for each marching squares case, as pairs
+# of cell edges. a case sets bit 1, 2, 4, 8 when the top-left, top-right,
+# bottom-right, bottom-left corner is at or above the level. the saddle
+# cases 5 and 10 are listed with their corners kept apart, and are
+# flipped below when the centre of the cell is on the other side
+TOP, RIGHT, BOTTOM, LEFT = range(4)
+CELL_SEGMENTS = {
+    1: ((LEFT, TOP),), 2: ((TOP, RIGHT),), 3: ((LEFT, RIGHT),),
+    4: ((RIGHT, BOTTOM),), 5: ((LEFT, TOP), (RIGHT, BOTTOM)),
+    6: ((TOP, BOTTOM),), 7: ((LEFT, BOTTOM),), 8: ((BOTTOM, LEFT),),
+    9: ((TOP, BOTTOM),), 10: ((TOP, RIGHT), (BOTTOM, LEFT)),
+    11: ((RIGHT, BOTTOM),), 12: ((LEFT, RIGHT),), 13: ((TOP, RIGHT),),
+    14: ((LEFT, TOP),)
+}
+SADDLE_SEGMENTS = {5: CELL_SEGMENTS[10], 10: CELL_SEGMENTS[5]}
+
+# joins segments, given as pairs of ids of the grid edges they end on,
+# into chains of edge ids; every edge is shared by at most two cells,
+# so each chain is either open at both ends or a closed loop
+def _join_segments(starts, ends):
+    neighbours = {}
+    for a, b in zip(starts.tolist(), ends.tolist()):
+        neighbours.setdefault(a, []).append(b)
+        neighbours.setdefault(b, []).append(a)
+
+    chains = []
+    # walk the open chains from their loose ends first, then the loops
+    loose_ends = [edge for edge, links in neighbours.items() if len(links) == 1]
+    for first in loose_ends + list(neighbours):
+        if not neighbours.get(first):
+            continue
+        chain = [first]
+        edge = first
+        while neighbours.get(edge):
+            next_edge = neighbours[edge].pop()
+            neighbours[next_edge].remove(edge)
+            chain.append(next_edge)
+            edge = next_edge
+        chains.append(chain)
+    return chains
+
+# returns the lines along which the sampled values cross level, as a list
+# of polylines of [x, y] points. values[i][j] is the value at the point
+# (origin[0] + i*spacing, origin[1] + j*spacing)
+def find_contours(values, level, spacing=1, origin=(0, 0)):
+    values = np.asarray(values, dtype=float)
+    nx, ny = values.shape
+    if nx < 2 or ny < 2:
+        return []
+    above = values >= level
+
+    # the point where level is crossed on every grid edge; horizontal
+    # edges (i, j)-(i+1, j) come first in the edge ids, then vertical
+    # edges (i, j)-(i, j+1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_h = (level - values[:-1, :])/(values[1:, :] - values[:-1, :])
+        t_v = (level - values[:, :-1])/(values[:, 1:] - values[:, :-1])
+    i_h, j_h = np.meshgrid(np.arange(nx-1), np.arange(ny), indexing='ij')
+    i_v, j_v = np.meshgrid(np.arange(nx), np.arange(ny-1), indexing='ij')
+    edge_x = np.concatenate(((i_h + t_h).ravel(), i_v.ravel().astype(float)))*spacing + origin[0]
+    edge_y = np.concatenate((j_h.ravel().astype(float), (j_v + t_v).ravel()))*spacing + origin[1]
+    n_h = (nx-1)*ny
+
+    # ids of the four edges of every cell (i, j)
+    i, j = np.meshgrid(np.arange(nx-1), np.arange(ny-1), indexing='ij')
+    cell_edges = (i*ny + j, n_h + (i+1)*(ny-1) + j, i*ny + j + 1, n_h + i*(ny-1) + j)
+
+    case = (above[:-1, :-1]*1 + above[1:, :-1]*2 + above[1:, 1:]*4 + above[:-1, 1:]*8)
+    centre_above = (values[:-1, :-1] + values[1:, :-1] + values[1:, 1:] + values[:-1, 1:])/4 >= level
+    starts = []
+    ends = []
+    for cell_case, segments in CELL_SEGMENTS.items():
+        cells = case == cell_case
+        if cell_case in SADDLE_SEGMENTS:
+            for cell_mask, cell_segments in ((cells & ~centre_above, segments), (cells & centre_above, SADDLE_SEGMENTS[cell_case])):
+                for a, b in cell_segments:
+                    starts.append(cell_edges[a][cell_mask])
+                    ends.append(cell_edges[b][cell_mask])
+        else:
+            for a, b in segments:
+                starts.append(cell_edges[a][cells])
+                ends.append(cell_edges[b][cells])
+
+    chains = _join_segments(np.concatenate(starts), np.concatenate(ends))
+    return [np.stack((edge_x[chain], edge_y[chain]), axis=1).tolist() for chain in chains]
+
+# returns the x and y coordinates of the points to sample the potential
+# at, for equipotential lines over an area of the given width and height
+def contour_grid(width, height, spacing=CONTOUR_SPACING):
+    return np.meshgrid(np.arange(CONTOUR_ORIGIN[0], width+spacing, spacing),
+                       np.arange(CONTOUR_ORIGIN[1], height+spacing, spacing), indexing='ij')
+
+# returns the equipotential lines of a potential grid sampled at the
+# points of contour_grid, as a list of (level, polylines) pairs
+def find_equipotentials(potential_grid, levels=POTENTIAL_LEVELS, spacing=CONTOUR_SPACING):
+    return [(level, find_contours(potential_grid, level, spacing, CONTOUR_ORIGIN)) for level in levels]
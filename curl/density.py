@@ -0,0 +1,129 @@
+# density.py - charge painted as a density over the play area, whose
+# potential and field come from an FFT convolution with the Coulomb
+# kernel
+
+# Copyright (C) 2025 Deepto Debnath, Subhradip Mondal
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+from math import log, sqrt
+from .electrostatics import GridField
+
+# spacing of the grid painted charge is kept on, in pixels of the play
+# area; a grid point holds the charge of the square around it
+DENSITY_STEP = 4
+# every frame the mouse is held down, the brush spreads BRUSH_CHARGE
+# coulombs over a disc of BRUSH_RADIUS pixels, most at its centre
+BRUSH_RADIUS = 16
+BRUSH_CHARGE = 0.02
+
+# the spectra of the Coulomb kernels of every grid shape and spacing
+# convolved with so far; they only depend on the grid, so are worked
+# out once for each
+kernel_spectra = {}
+
+# returns the shortest length of at least n whose only prime factors are
+# 2, 3 and 5, which numpy's FFT is much faster at than a length with a
+# large prime factor
+def fast_length(n):
+    length = n
+    while True:
+        m = length
+        for p in (2, 3, 5):
+            while m % p == 0:
+                m //= p
+        if m == 1:
+            return length
+        length += 1
+
+# returns the shape a grid of the given shape is padded to for its
+# convolutions, at least 2n - 1 along each axis so that the charge at
+# one edge does not wrap around to the other
+def padded_shape(shape):
+    return (fast_length(2*shape[0] - 1), fast_length(2*shape[1] - 1))
+
+# returns the real FFT spectra of the kernels that give the potential and
+# the x and y components of the field at every point of a grid of the
+# given shape and spacing from a unit charge at any other. the kernels
+# are laid out for a circular convolution over the padded shape, which
+# leaves a band of zeros around the charge, so that the edges are open. a point's
+# own charge is spread over its square, whose mean 1/r is
+# 4*ln(1 + sqrt(2))/spacing, and gives it no field
+def coulomb_kernel_spectra(shape, spacing):
+    key = (tuple(shape), spacing)
+    if key not in kernel_spectra:
+        k = 9*(10**9)
+        padded = padded_shape(shape)
+        # offsets from 0 up to the size of the grid, then negative ones
+        dx, dy = np.meshgrid(np.fft.fftfreq(padded[0], 1/padded[0])*spacing, np.fft.fftfreq(padded[1], 1/padded[1])*spacing, indexing='ij')
+        r = np.hypot(dx, dy)
+        r[0, 0] = 1
+        potential_kernel = k/r
+        potential_kernel[0, 0] = k*4*log(1 + sqrt(2))/spacing
+        field_x_kernel = k*dx/r**3
+        field_y_kernel = k*dy/r**3
+        kernel_spectra[key] = tuple(np.fft.rfft2(kernel) for kernel in (potential_kernel, field_x_kernel, field_y_kernel))
+    return kernel_spectra[key]
+
+# returns the potential and the x and y components of the field at every
+# point of a grid of charge, spacing apart, from the charge of the whole
+# grid. each is one convolution with a Coulomb kernel, done as a product
+# of FFT spectra, which takes time proportional to G log G for G grid
+# points however much of the grid holds charge
+def density_grids(charge, spacing=DENSITY_STEP):
+    padded = padded_shape(charge.shape)
+    charge_spectrum = np.fft.rfft2(charge, s=padded)
+    return tuple(np.fft.irfft2(charge_spectrum*spectrum, s=padded)[:charge.shape[0], :charge.shape[1]]
+                 for spectrum in coulomb_kernel_spectra(charge.shape, spacing))
+
+# returns the potential and field of a grid of charge, as a GridField for
+# the grids of electrostatics.py to add, or None if it holds no charge
+def density_field(charge, spacing=DENSITY_STEP):
+    if not charge.any():
+        return None
+    return GridField(*density_grids(charge, spacing), (0, 0), spacing)
+
+# charge painted over a play area of the given size, kept as the charge
+# at each point of a grid spacing apart. points, as in the "density" of
+# a scene, are (q, x, y) arrays of charges that are added to the nearest
+# grid point
+class ChargeDensity:
+    def __init__(self, width, height, spacing=DENSITY_STEP, points=None):
+        self.spacing = spacing
+        self.charge = np.zeros((int(width//spacing) + 1, int(height//spacing) + 1))
+        if points is not None:
+            self.add_points(*points)
+
+    def add_points(self, q, x, y):
+        i = np.clip(np.round(np.asarray(x, dtype=float)/self.spacing).astype(np.intp), 0, self.charge.shape[0] - 1)
+        j = np.clip(np.round(np.asarray(y, dtype=float)/self.spacing).astype(np.intp), 0, self.charge.shape[1] - 1)
+        np.add.at(self.charge, (i, j), q)
+
+    # returns the charge as (q, x, y) arrays of the grid points that hold
+    # any
+    def points(self):
+        i, j = np.nonzero(self.charge)
+        return self.charge[i, j], i*float(self.spacing), j*float(self.spacing)
+
+    # spreads charge over the grid points within radius of (x, y), in
+    # proportion to 1 - (distance/radius)^2
+    def paint(self, x, y, charge, radius=BRUSH_RADIUS):
+        spacing = self.spacing
+        left = max(0, int((x - radius)//spacing) + 1)
+        right = min(self.charge.shape[0], int((x + radius)//spacing) + 1)
+        top = max(0, int((y - radius)//spacing) + 1)
+        bottom = min(self.charge.shape[1], int((y + radius)//spacing) + 1)
+        if left >= right or top >= bottom:
+            return
+        xs, ys = np.meshgrid(np.arange(left, right)*spacing, np.arange(top, bottom)*spacing, indexing='ij')
+        weight = np.maximum(1 - ((xs - x)**2 + (ys - y)**2)/radius**2, 0)
+        if weight.sum() == 0:
+            return
+        self.charge[left:right, top:bottom] += charge*weight/weight.sum()
+
+    def clear(self):
+        self.charge[:] = 0
+
+    def is_empty(self):
+        return not self.charge.any()
@@ -0,0 +1,281 @@
+# dynamics.py - motion of charges under their mutual Coulomb forces,
+# with a fixed time step velocity Verlet integrator
+
+# Copyright (C) 2025 Deepto Debnath, Subhradip Mondal
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+from .electrostatics import GRID_CHUNK_SIZE
+
+# simulated seconds per step, and the mass of every charge that is not
+# pinned in place; with charges of a coulomb or so a few hundred pixels
+# apart, this mass makes them move a few hundred pixels a second
+TIME_STEP = 1/240
+CHARGE_MASS = 5000
+# the force between two charges is softened as if they were always at
+# least SOFTENING pixels further apart, so that it stays finite as they
+# meet. charges collide when closer than twice COLLISION_RADIUS (the
+# size of the image drawn for them) and bounce off each other and the
+# bounds with RESTITUTION of their approaching speed
+SOFTENING = 10
+COLLISION_RADIUS = 16
+RESTITUTION = 0.5
+# above CELL_LIST_THRESHOLD charges, the forces are summed only over the
+# pairs closer than CELL_LIST_CUTOFF, found with a cell list, instead of
+# over every pair; this leaves out the pull of the far charges, but takes
+# time proportional to the number of charges rather than its square
+CELL_LIST_THRESHOLD = 1000
+CELL_LIST_CUTOFF = 100
+
+# returns the force on each of the charges q at (x, y) from all the
+# others, as arrays of the x and y components; without softening, this
+# is each charge times the field of the others from calc_field_grid.
+# the forces are summed over every pair in one broadcast per chunk of
+# charges, kept as small as the chunks of the grid functions in
+# electrostatics.py. a charge exerts no force on itself, since its
+# distance to itself is 0
+def coulomb_forces(q, x, y, softening=SOFTENING):
+    k = 9*(10**9)
+    force_x = np.zeros(q.size)
+    force_y = np.zeros(q.size)
+    chunk = max(1, GRID_CHUNK_SIZE//max(q.size, 1))
+    for start in range(0, q.size, chunk):
+        stop = start + chunk
+        r_x = x[start:stop, None] - x
+        r_y = y[start:stop, None] - y
+        # the temporaries are worked on in place, which saves the time of
+        # making new ones
+        r_squared = r_x*r_x
+        r_squared += r_y*r_y
+        r_squared += softening**2
+        with np.errstate(divide='ignore'):
+            weight = r_squared**-1.5
+        if softening == 0:
+            weight[r_squared == 0] = 0
+        weight *= q
+        force_x[start:stop] = k*q[start:stop]*np.einsum('ij,ij->i', weight, r_x)
+        force_y[start:stop] = k*q[start:stop]*np.einsum('ij,ij->i', weight, r_y)
+    return force_x, force_y
+
+# returns the pairs of points (x, y) closer than cutoff to each other,
+# as arrays of the indices i < j of the two points of each pair. the
+# points are sorted into square cells cutoff wide, so that each point
+# only looks at the points of its own cell and of four of its neighbours
+# (the other four look at it)
+def close_pairs(x, y, cutoff):
+    n = x.size
+    if n < 2 or cutoff <= 0:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+    cell_x = ((x - x.min())//cutoff).astype(np.int64)
+    cell_y = ((y - y.min())//cutoff).astype(np.int64)
+    rows = int(cell_y.max()) + 1
+    cell = cell_x*rows + cell_y
+    order = np.argsort(cell, kind="stable")
+    sorted_cell = cell[order]
+
+    i_parts = []
+    j_parts = []
+    for offset_x, offset_y in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)):
+        neighbour_y = cell_y + offset_y
+        neighbour = (cell_x + offset_x)*rows + neighbour_y
+        start = np.searchsorted(sorted_cell, neighbour, "left")
+        count = np.searchsorted(sorted_cell, neighbour, "right") - start
+        count[(neighbour_y < 0) | (neighbour_y >= rows)] = 0
+        # every point paired with every point of its neighbouring cell
+        i = np.repeat(np.arange(n), count)
+        j = order[np.repeat(start - np.cumsum(count) + count, count) + np.arange(count.sum())]
+        if offset_x == offset_y == 0:
+            keep = i < j
+            i, j = i[keep], j[keep]
+        i_parts.append(np.minimum(i, j))
+        j_parts.append(np.maximum(i, j))
+    i = np.concatenate(i_parts)
+    j = np.concatenate(j_parts)
+    close = (x[i] - x[j])**2 + (y[i] - y[j])**2 < cutoff**2
+    return i[close], j[close]
+
+# returns the force on each of the charges q at (x, y), as coulomb_forces
+# does, but only from the charges closer than cutoff
+def cell_list_forces(q, x, y, cutoff=CELL_LIST_CUTOFF, softening=SOFTENING):
+    k = 9*(10**9)
+    i, j = close_pairs(x, y, cutoff)
+    r_x = x[i] - x[j]
+    r_y = y[i] - y[j]
+    r_squared = r_x**2 + r_y**2 + softening**2
+    with np.errstate(divide='ignore'):
+        force_mag = np.where(r_squared > 0, k*q[i]*q[j]/(r_squared*np.sqrt(r_squared)), 0)
+    # each pair pushes its two charges apart equally
+    force_x = np.bincount(i, force_mag*r_x, x.size) - np.bincount(j, force_mag*r_x, x.size)
+    force_y = np.bincount(i, force_mag*r_y, x.size) - np.bincount(j, force_mag*r_y, x.size)
+    return force_x, force_y
+
+# returns how far the forces of cell_list_forces with the given cutoff
+# are from those summed over every pair, as a dict of the largest and
+# the root mean square error, relative to the root mean square force
+def cell_list_error(q, x, y, cutoff=CELL_LIST_CUTOFF, softening=SOFTENING):
+    exact_x, exact_y = coulomb_forces(q, x, y, softening)
+    cut_x, cut_y = cell_list_forces(q, x, y, cutoff, softening)
+    force_error = np.sqrt((cut_x - exact_x)**2 + (cut_y - exact_y)**2)
+    force_scale = max(np.sqrt(np.mean(exact_x**2 + exact_y**2)), np.finfo(float).tiny)
+    return {"force_max": float(force_error.max()/force_scale), "force_rms": float(np.sqrt(np.mean(force_error**2))/force_scale)}
+
+# the velocities and masses of charges as they move under their mutual
+# forces. charges are known by their ids, as in a ChargeStore, and every
+# step is given the charges' current arrays, so charges may be added,
+# removed or moved by hand between steps; new charges start at rest. a
+# pinned charge has an infinite mass: it pushes and pulls the others but
+# never moves itself. the forces are summed over every pair, or with a
+# cell list for more than CELL_LIST_THRESHOLD charges unless cutoff is
+# given, where a cutoff of inf always sums over every pair. the charges
+# stay within bounds, (left, top, right, bottom), if given
+class Simulation:
+    def __init__(self, time_step=TIME_STEP, mass=CHARGE_MASS, softening=SOFTENING, collision_radius=COLLISION_RADIUS,
+                 restitution=RESTITUTION, bounds=None, cutoff=None):
+        self.time_step = time_step
+        self.mass = mass
+        self.softening = softening
+        self.collision_radius = collision_radius
+        self.restitution = restitution
+        self.bounds = bounds
+        self.cutoff = cutoff
+        self.reset()
+
+    # forgets every charge's velocity and mass
+    def reset(self):
+        self.ids = np.zeros(0, dtype=int)
+        self.masses = np.zeros(0)
+        self.vx = np.zeros(0)
+        self.vy = np.zeros(0)
+        # accelerations at the end of the last step, which start the next
+        self.ax = None
+        self.ay = None
+
+    # brings the velocities and masses in line with the charges of ids,
+    # in that order: charges that are gone are dropped, and new ones start
+    # at rest with the default mass
+    def sync(self, ids):
+        if np.array_equal(ids, self.ids):
+            return
+        old_rows = {charge_id: row for row, charge_id in enumerate(self.ids.tolist())}
+        rows = np.array([old_rows.get(charge_id, -1) for charge_id in np.asarray(ids).tolist()], dtype=int)
+        kept = rows >= 0
+        masses = np.full(rows.size, float(self.mass))
+        vx = np.zeros(rows.size)
+        vy = np.zeros(rows.size)
+        masses[kept] = self.masses[rows[kept]]
+        vx[kept] = self.vx[rows[kept]]
+        vy[kept] = self.vy[rows[kept]]
+        self.ids = np.array(ids, dtype=int)
+        self.masses, self.vx, self.vy = masses, vx, vy
+        self.ax = None
+        self.ay = None
+
+    def is_pinned(self, charge_id):
+        rows = np.flatnonzero(self.ids == charge_id)
+        return rows.size > 0 and bool(np.isinf(self.masses[rows[0]]))
+
+    # returns a mask of the pinned charges of ids
+    def pinned(self, ids):
+        self.sync(ids)
+        return np.isinf(self.masses)
+
+    # pins the charge with charge_id in place, or lets it move again
+    def set_pinned(self, ids, charge_id, pinned):
+        self.sync(ids)
+        row = np.flatnonzero(self.ids == charge_id)
+        self.masses[row] = np.inf if pinned else self.mass
+        self.vx[row] = 0
+        self.vy[row] = 0
+        self.ax = None
+        self.ay = None
+
+    # returns the forces on the charges q at (x, y), with those of the
+    # field of external_field, a GridField such as that of painted charge,
+    # added if given
+    def forces(self, q, x, y, external_field=None):
+        cutoff = self.cutoff
+        if cutoff is None:
+            cutoff = CELL_LIST_CUTOFF if q.size > CELL_LIST_THRESHOLD else np.inf
+        if np.isinf(cutoff):
+            force_x, force_y = coulomb_forces(q, x, y, self.softening)
+        else:
+            force_x, force_y = cell_list_forces(q, x, y, cutoff, self.softening)
+        if external_field is not None:
+            field_x, field_y = external_field.field(x, y)
+            force_x, force_y = force_x + q*field_x, force_y + q*field_y
+        return force_x, force_y
+
+    # advances the charges of ids, with magnitudes q at (x, y), by one
+    # time step and returns their new positions. the charges in the mask
+    # held, such as one being dragged, stay where they are and come to
+    # rest, as pinned charges do. external_field is passed on to forces
+    def step(self, ids, q, x, y, held=None, external_field=None):
+        self.sync(ids)
+        dt = self.time_step
+        inverse_mass = 1/self.masses
+        if held is not None:
+            inverse_mass[held] = 0
+            self.vx[held] = 0
+            self.vy[held] = 0
+        if self.ax is None:
+            force_x, force_y = self.forces(q, x, y, external_field)
+            self.ax, self.ay = force_x*inverse_mass, force_y*inverse_mass
+
+        x = x + self.vx*dt + self.ax*(dt**2/2)
+        y = y + self.vy*dt + self.ay*(dt**2/2)
+        force_x, force_y = self.forces(q, x, y, external_field)
+        ax, ay = force_x*inverse_mass, force_y*inverse_mass
+        self.vx += (self.ax + ax)*(dt/2)
+        self.vy += (self.ay + ay)*(dt/2)
+        self.ax, self.ay = ax, ay
+
+        self._collide(x, y, inverse_mass)
+        if self.bounds is not None:
+            self._bounce(x, y, inverse_mass > 0)
+        return x, y
+
+    # makes the charges at (x, y) that overlap bounce off each other, and
+    # moves them apart until they only touch
+    def _collide(self, x, y, inverse_mass):
+        i, j = close_pairs(x, y, 2*self.collision_radius)
+        pair_inverse_mass = inverse_mass[i] + inverse_mass[j]
+        moving = pair_inverse_mass > 0
+        i, j, pair_inverse_mass = i[moving], j[moving], pair_inverse_mass[moving]
+        if i.size == 0:
+            return
+        r_x = x[i] - x[j]
+        r_y = y[i] - y[j]
+        distance = np.sqrt(r_x**2 + r_y**2)
+        # charges right on top of each other are pushed apart sideways
+        apart = distance > 0
+        normal_x = np.where(apart, r_x/np.where(apart, distance, 1), 1)
+        normal_y = np.where(apart, r_y/np.where(apart, distance, 1), 0)
+
+        approach = (self.vx[i] - self.vx[j])*normal_x + (self.vy[i] - self.vy[j])*normal_y
+        impulse = np.where(approach < 0, -(1 + self.restitution)*approach/pair_inverse_mass, 0)
+        shift = (2*self.collision_radius - distance)/pair_inverse_mass
+        n = x.size
+        for values, change in ((self.vx, impulse*normal_x), (self.vy, impulse*normal_y), (x, shift*normal_x), (y, shift*normal_y)):
+            values += np.bincount(i, change*inverse_mass[i], n) - np.bincount(j, change*inverse_mass[j], n)
+
+    # keeps the moving charges at (x, y) within bounds, bouncing them off
+    # its edges
+    def _bounce(self, x, y, moving):
+        left, top, right, bottom = self.bounds
+        for position, velocity, low, high in ((x, self.vx, left, right), (y, self.vy, top, bottom)):
+            outside = moving & ((position < low) & (velocity < 0) | (position > high) & (velocity > 0))
+            velocity[outside] *= -self.restitution
+            position[moving] = np.clip(position[moving], low, high)
+
+    # returns the total energy of the charges of ids at (x, y), kinetic
+    # and (softened) potential, which the integrator keeps nearly constant
+    # while nothing collides
+    def energy(self, ids, q, x, y):
+        k = 9*(10**9)
+        self.sync(ids)
+        moving = np.isfinite(self.masses)
+        kinetic = (self.masses[moving]*(self.vx[moving]**2 + self.vy[moving]**2)).sum()/2
+        i, j = np.triu_indices(q.size, 1)
+        potential = (k*q[i]*q[j]/np.sqrt((x[i] - x[j])**2 + (y[i] - y[j])**2 + self.softening**2)).sum()
+        return float(kinetic + potential)
@@ -0,0 +1,627 @@
+# electrostatics.py - functions to calculate values 
+# useful in electrostatics
+
+# Copyright (C) 2025 Deepto Debnath, Subhradip Mondal
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+from .charges import ChargeStore
+
+# calculates potential at a point P (x, y) 
+# due to charges in charge_list
+def calc_potential(charge_list, P):
+    k = 9*(10**9)
+    potential = 0
+    for charge in charge_list:
+        r = [P[0]-charge[1], P[1]-charge[2]]
+        r_mag = (r[0]**2 + r[1]**2)**(1/2)
+        if r_mag == 0:
+            potential += 0
+        else:
+            potential += k*charge[0]/r_mag
+    return potential
+
+# calculates electric field at a point P (x, y) 
+# due to charges in charge_list
+def calc_field(charge_list, P):
+    k=9*(10**9)
+    field_parts = []
+    for charge in charge_list:
+        r=[P[0]-charge[1],P[1]-charge[2]]
+        r_mag = (r[0]**2 + r[1]**2)**(1/2)
+        if r_mag == 0:
+            field_parts.append([0,[0,0]])
+        else: 
+            field_mag = k*charge[0]/(r_mag**2)
+            field_dir=[r[0]/(r_mag),r[1]/(r_mag)]
+            field_parts.append([field_mag, field_dir])
+    
+    field_components = [0, 0]
+    for part in field_parts:
+        field_components[0] += part[0]*part[1][0]
+        field_components[1] += part[0]*part[1][1]
+    field_mag = (field_components[0]**2 + field_components[1]**2)**(1/2)
+    if field_mag == 0:
+        field_dir = [0, 0]
+    else:
+        field_dir = [field_components[0]/field_mag, field_components[1]/field_mag]
+    return [field_mag, field_dir]
+
+# number of point-charge pairs evaluated in one broadcast by the grid
+# functions below; keeps the temporary arrays of a chunk small enough
+# (half a MB each) to stay in the CPU cache, which more than makes up
+# for the extra chunks
+GRID_CHUNK_SIZE = 2**16
+
+# above APPROX_CHARGE_THRESHOLD charges, the grid functions below use the
+# Barnes-Hut approximation with opening angle APPROX_THETA instead of
+# summing over every charge. a cell of the charge tree is taken as a
+# whole when its size is less than theta times its distance from the
+# point, so a smaller theta is more accurate and slower, and a theta of
+# 0 gives the exact sums
+APPROX_CHARGE_THRESHOLD = 1000
+APPROX_THETA = 0.5
+# cells of the charge tree with at most LEAF_SIZE charges are not split,
+# and the tree is at most MAX_TREE_DEPTH levels deep
+LEAF_SIZE = 16
+MAX_TREE_DEPTH = 16
+# number of points walked down the charge tree together
+TREE_CHUNK_SIZE = 4096
+# precisions the grid functions below can sum in: "fast" single
+# precision, which halves the memory the sums stream through, for the
+# layers drawn while the program runs, and "exact" double precision, for
+# the readouts of the hover tooltip and for exported frames. results are
+# returned in the precision they were summed in
+PRECISIONS = {"fast": np.float32, "exact": np.float64}
+
+# returns numpy arrays of charge magnitudes and x, y positions
+# of the charges in charge_list; the grid functions below also accept
+# this (q, x, y) tuple in place of charge_list, which saves converting
+# the list again when the same charges are evaluated many times, and
+# take the arrays of a ChargeStore as they are
+def charge_arrays(charge_list):
+    if isinstance(charge_list, tuple):
+        return charge_list
+    if isinstance(charge_list, ChargeStore):
+        return charge_list.arrays()
+    if isinstance(charge_list, dict):
+        return charge_list["charges"]
+    if len(charge_list) == 0:
+        return np.zeros(0), np.zeros(0), np.zeros(0)
+    charges = np.array([charge[0:3] for charge in charge_list], dtype=float)
+    return charges[:, 0], charges[:, 1], charges[:, 2]
+
+# returns a Barnes-Hut tree of the charges in charge_list, as a dict with
+#   "charges": the (q, x, y) arrays of the charges, as charge_arrays
+#   "sorted": the same arrays sorted so that every cell's charges are
+#             next to each other
+#   "levels": a dict of arrays for each level of cells, from the root
+#             (the square around all charges) down, where each cell has
+#             its size, the range of its charges in "sorted" and of its
+#             children in the next level, whether it is a leaf, and the
+#             total and centre of its positive and of its negative charge
+# the grid functions below take a tree in place of charge_list, which
+# saves building it again when the same charges are evaluated many times
+def build_charge_tree(charge_list):
+    q, charge_x, charge_y = charge_arrays(charge_list)
+    n = q.size
+    if n == 0:
+        return {"charges": (q, charge_x, charge_y), "sorted": (q, charge_x, charge_y), "levels": []}
+    left, top = charge_x.min(), charge_y.min()
+    size = max(charge_x.max() - left, charge_y.max() - top, 1.0)*(1 + 2**-20)
+
+    # sort the charges by the Morton code of the smallest cell they are
+    # in, which puts the charges of every cell of every level together
+    cells = 2**MAX_TREE_DEPTH
+    cell_x = np.minimum(((charge_x - left)/size*cells).astype(np.int64), cells-1)
+    cell_y = np.minimum(((charge_y - top)/size*cells).astype(np.int64), cells-1)
+    code = np.zeros(n, dtype=np.int64)
+    for bit in range(MAX_TREE_DEPTH):
+        code |= ((cell_x >> bit) & 1) << (2*bit) | ((cell_y >> bit) & 1) << (2*bit + 1)
+    order = np.argsort(code, kind="stable")
+    code = code[order]
+    sorted_q, sorted_x, sorted_y = q[order], charge_x[order], charge_y[order]
+
+    # running sums give the total and centre of each sign of charge of
+    # any cell from the range of its charges
+    positive = np.maximum(sorted_q, 0)
+    negative = np.minimum(sorted_q, 0)
+    sums = [np.concatenate(([0.0], np.cumsum(values))) for values in
+            (positive, positive*sorted_x, positive*sorted_y, negative, negative*sorted_x, negative*sorted_y)]
+
+    levels = []
+    for depth in range(MAX_TREE_DEPTH + 1):
+        prefix = code >> 2*(MAX_TREE_DEPTH - depth)
+        start = np.flatnonzero(np.concatenate(([True], prefix[1:] != prefix[:-1])))
+        end = np.append(start[1:], n)
+        level = {"size": size/2**depth, "prefix": prefix[start], "start": start, "end": end,
+                 "is_leaf": (end - start <= LEAF_SIZE) | (depth == MAX_TREE_DEPTH)}
+        for sign, (charge_sum, x_sum, y_sum) in (("positive", sums[0:3]), ("negative", sums[3:6])):
+            total = charge_sum[end] - charge_sum[start]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                level[sign] = (total, (x_sum[end] - x_sum[start])/total, (y_sum[end] - y_sum[start])/total)
+        levels.append(level)
+        if level["is_leaf"].all():
+            break
+    for level, next_level in zip(levels, levels[1:]):
+        level["children_start"] = np.searchsorted(next_level["prefix"], level["prefix"] << 2)
+        level["children_end"] = np.searchsorted(next_level["prefix"], (level["prefix"] + 1) << 2)
+    return {"charges": (q, charge_x, charge_y), "sorted": (sorted_q, sorted_x, sorted_y), "levels": levels}
+
+# returns the charges in charge_list in the form the grid functions
+# below evaluate them fastest in, when they are evaluated many times: as
+# a charge tree if the grid functions would approximate the sums with
+# opening angle theta, as (q, x, y) arrays otherwise
+def prepare_charges(charge_list, theta=None):
+    if isinstance(charge_list, dict):
+        return charge_list
+    charges = charge_arrays(charge_list)
+    if theta is None:
+        theta = APPROX_THETA if charges[0].size > APPROX_CHARGE_THRESHOLD else 0
+    if theta > 0:
+        return build_charge_tree(charges)
+    return charges
+
+# adds the potential and/or field at the points xs, ys of the charges q
+# at (charge_x, charge_y) to the accumulators, where point i is paired
+# with charge i; charges lying exactly on their point are skipped. the
+# terms are worked out in the precision of xs
+def _add_pair_terms(points, xs, ys, q, charge_x, charge_y, n_points, potential_grid, field_x, field_y):
+    k = 9*(10**9)
+    q, charge_x, charge_y = (array.astype(xs.dtype, copy=False) for array in (q, charge_x, charge_y))
+    r_x = xs - charge_x
+    r_y = ys - charge_y
+    r_mag = np.sqrt(r_x**2 + r_y**2)
+    r_mag[r_mag == 0] = np.inf
+    if potential_grid is not None:
+        potential_grid += np.bincount(points, k*q/r_mag, n_points)
+    if field_x is not None:
+        field_mag = k*q/(r_mag**3)
+        field_x += np.bincount(points, field_mag*r_x, n_points)
+        field_y += np.bincount(points, field_mag*r_y, n_points)
+
+# evaluates the potential and/or field of the charges of a charge tree
+# at the points xs, ys with the Barnes-Hut approximation. all points
+# walk down the tree together, one level at a time: a point takes a cell
+# whose size is less than theta times the distance to its charge as one
+# positive and one negative point charge, sums over the charges of a
+# leaf cell that is too close, and goes on to the children of any other
+def _calc_tree_terms(tree, xs, ys, theta, potential_grid, field_x, field_y):
+    sorted_q, sorted_x, sorted_y = tree["sorted"]
+    levels = tree["levels"]
+    if len(levels) == 0:
+        return
+    n_points = xs.size
+    points = np.arange(n_points)
+    cells = np.zeros(n_points, dtype=np.int64)
+    for depth, level in enumerate(levels):
+        if points.size == 0:
+            break
+        # distance to the centre of the cell's charge, whichever the sign
+        positive, negative = level["positive"], level["negative"]
+        magnitude = positive[0][cells] - negative[0][cells]
+        centre_x = (positive[0][cells]*np.nan_to_num(positive[1][cells]) - negative[0][cells]*np.nan_to_num(negative[1][cells]))/magnitude
+        centre_y = (positive[0][cells]*np.nan_to_num(positive[2][cells]) - negative[0][cells]*np.nan_to_num(negative[2][cells]))/magnitude
+        distance = np.sqrt((xs[points] - centre_x)**2 + (ys[points] - centre_y)**2)
+        accepted = level["size"] < theta*distance
+        is_leaf = level["is_leaf"][cells]
+
+        for total, cell_x, cell_y in (positive, negative):
+            far_points, far_cells = points[accepted], cells[accepted]
+            has_charge = total[far_cells] != 0
+            far_points, far_cells = far_points[has_charge], far_cells[has_charge]
+            _add_pair_terms(far_points, xs[far_points], ys[far_points], total[far_cells], cell_x[far_cells], cell_y[far_cells],
+                            n_points, potential_grid, field_x, field_y)
+
+        # pair each point with every charge of its near leaf cells
+        near = ~accepted & is_leaf
+        near_points, near_cells = points[near], cells[near]
+        counts = level["end"][near_cells] - level["start"][near_cells]
+        pair_points = np.repeat(near_points, counts)
+        pair_charges = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(level["start"][near_cells], counts)
+        _add_pair_terms(pair_points, xs[pair_points], ys[pair_points], sorted_q[pair_charges], sorted_x[pair_charges], sorted_y[pair_charges],
+                        n_points, potential_grid, field_x, field_y)
+
+        # and go on to the children of the rest
+        opened = ~accepted & ~is_leaf
+        if depth + 1 < len(levels):
+            open_points, open_cells = points[opened], cells[opened]
+            counts = level["children_end"][open_cells] - level["children_start"][open_cells]
+            points = np.repeat(open_points, counts)
+            cells = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(level["children_start"][open_cells], counts)
+
+# evaluates the potential and/or field of the charges in charge_list
+# at every point of the arrays xs, ys in one broadcast per chunk
+# of points; contributions of a charge lying exactly on a point
+# are skipped, just like in calc_potential and calc_field. the sums are
+# approximated with opening angle theta as described above, by default
+# only for more than APPROX_CHARGE_THRESHOLD charges, and are taken in
+# one of the PRECISIONS
+def _calc_grid_terms(charge_list, xs, ys, potential=True, field=True, theta=None, precision="exact"):
+    k = 9*(10**9)
+    dtype = PRECISIONS[precision]
+    xs, ys = np.broadcast_arrays(np.asarray(xs, dtype=dtype), np.asarray(ys, dtype=dtype))
+    shape = xs.shape
+    xs = xs.ravel()
+    ys = ys.ravel()
+    q, charge_x, charge_y = charge_arrays(charge_list)
+    potential_grid = np.zeros(xs.size, dtype) if potential else None
+    field_x = np.zeros(xs.size, dtype) if field else None
+    field_y = np.zeros(xs.size, dtype) if field else None
+    if theta is None:
+        theta = APPROX_THETA if q.size > APPROX_CHARGE_THRESHOLD else 0
+
+    if q.size > 0 and theta > 0:
+        tree = charge_list if isinstance(charge_list, dict) else build_charge_tree((q, charge_x, charge_y))
+        for start in range(0, xs.size, TREE_CHUNK_SIZE):
+            stop = start + TREE_CHUNK_SIZE
+            chunk_terms = [None if grid is None else np.zeros(min(stop, xs.size) - start, dtype) for grid in (potential_grid, field_x, field_y)]
+            _calc_tree_terms(tree, xs[start:stop], ys[start:stop], theta, *chunk_terms)
+            for grid, chunk_grid in zip((potential_grid, field_x, field_y), chunk_terms):
+                if grid is not None:
+                    grid[start:stop] = chunk_grid
+    elif q.size > 0:
+        q, charge_x, charge_y = (array.astype(dtype, copy=False) for array in (q, charge_x, charge_y))
+        chunk = max(1, GRID_CHUNK_SIZE//q.size)
+        for start in range(0, xs.size, chunk):
+            stop = start + chunk
+            r_x = xs[start:stop, None] - charge_x
+            r_y = ys[start:stop, None] - charge_y
+            r_mag = np.sqrt(r_x**2 + r_y**2)
+            # 1/inf is 0, so a charge at the point contributes nothing
+            r_mag[r_mag == 0] = np.inf
+            if potential:
+                potential_grid[start:stop] = (k*q/r_mag).sum(axis=1)
+            if field:
+                field_mag = k*q/(r_mag**2)
+                field_x[start:stop] = (field_mag*(r_x/r_mag)).sum(axis=1)
+                field_y[start:stop] = (field_mag*(r_y/r_mag)).sum(axis=1)
+
+    if potential:
+        potential_grid = potential_grid.reshape(shape)
+    if field:
+        field_x = field_x.reshape(shape)
+        field_y = field_y.reshape(shape)
+    return potential_grid, field_x, field_y
+
+# calculates potential at every point (xs[i], ys[i]) due to charges in
+# charge_list; gives the same values as calc_potential for each point,
+# unless theta (or the number of charges, see APPROX_THETA) makes it
+# approximate them, or they are summed in "fast" precision
+def calc_potential_grid(charge_list, xs, ys, theta=None, precision="exact"):
+    return _calc_grid_terms(charge_list, xs, ys, field=False, theta=theta, precision=precision)[0]
+
+# calculates electric field at every point (xs[i], ys[i]) due to charges
+# in charge_list; returns arrays of the x and y components and the
+# magnitude of the field, as calc_field does for a single point
+def calc_field_grid(charge_list, xs, ys, theta=None, precision="exact"):
+    field_x, field_y = _calc_grid_terms(charge_list, xs, ys, potential=False, theta=theta, precision=precision)[1:]
+    return field_x, field_y, np.sqrt(field_x**2 + field_y**2)
+
+# calculates potential and electric field at every point (xs[i], ys[i])
+# in one pass; returns potential, field x and y components and magnitude
+def calc_grid(charge_list, xs, ys, theta=None, precision="exact"):
+    potential_grid, field_x, field_y = _calc_grid_terms(charge_list, xs, ys, theta=theta, precision=precision)
+    return potential_grid, field_x, field_y, np.sqrt(field_x**2 + field_y**2)
+
+# returns how far the Barnes-Hut approximation with opening angle theta
+# is from the exact sums at the points xs, ys, as a dict of the largest
+# and the root mean square error of the potential and of the field, all
+# relative to the root mean square of the exact values
+def approximation_error(charge_list, xs, ys, theta=APPROX_THETA):
+    charges = charge_arrays(charge_list)
+    exact = calc_grid(charges, xs, ys, theta=0)
+    approx = calc_grid(prepare_charges(charges, theta), xs, ys, theta=theta)
+    potential_error = np.abs(approx[0] - exact[0])
+    field_error = np.sqrt((approx[1] - exact[1])**2 + (approx[2] - exact[2])**2)
+    potential_scale = max(np.sqrt(np.mean(exact[0]**2)), np.finfo(float).tiny)
+    field_scale = max(np.sqrt(np.mean(exact[3]**2)), np.finfo(float).tiny)
+    return {"potential_max": float(potential_error.max()/potential_scale),
+            "potential_rms": float(np.sqrt(np.mean(potential_error**2))/potential_scale),
+            "field_max": float(field_error.max()/field_scale),
+            "field_rms": float(np.sqrt(np.mean(field_error**2))/field_scale)}
+
+# adds the contribution of the charges in charge_list at the points
+# xs, ys to field_grids, as returned by calc_grid for the same points;
+# removes it instead if sign is -1. superposition lets the grids be
+# updated for a few moved charges without summing over every charge
+def superpose_grid(field_grids, charge_list, xs, ys, sign=1, precision="exact"):
+    potential_grid, field_x, field_y = _calc_grid_terms(charge_list, xs, ys, precision=precision)
+    potential_grid = field_grids[0] + sign*potential_grid
+    field_x = field_grids[1] + sign*field_x
+    field_y = field_grids[2] + sign*field_y
+    return potential_grid, field_x, field_y, np.sqrt(field_x**2 + field_y**2)
+
+# the potential and field of charge that is not made of point charges,
+# such as the charge induced on conductors or painted as a density,
+# sampled on a grid of points spacing apart from origin and interpolated
+# bilinearly in between. they are added to the grids of the functions
+# above with add_to_grid and add_to_potential. points where inside is
+# true are held at a potential, with no field, whatever the charges
+class GridField:
+    def __init__(self, potential_grid, field_x, field_y, origin, spacing):
+        self.potential_grid = potential_grid
+        self.field_x = field_x
+        self.field_y = field_y
+        self.origin = origin
+        self.spacing = spacing
+
+    # returns the values of a grid at the points xs, ys, interpolated
+    # bilinearly between the grid points around each
+    def _interpolate(self, grid, xs, ys):
+        u = np.clip((xs - self.origin[0])/self.spacing, 0, grid.shape[0] - 1.000001)
+        v = np.clip((ys - self.origin[1])/self.spacing, 0, grid.shape[1] - 1.000001)
+        i = u.astype(np.intp)
+        j = v.astype(np.intp)
+        u -= i
+        v -= j
+        return (grid[i, j]*(1 - u)*(1 - v) + grid[i + 1, j]*u*(1 - v) +
+                grid[i, j + 1]*(1 - u)*v + grid[i + 1, j + 1]*u*v)
+
+    # returns whether each point xs, ys is held at a potential, and the
+    # potential it is held at there; no point is, unless a subclass says so
+    def inside(self, xs, ys):
+        xs = np.asarray(xs, dtype=float)
+        return np.zeros(xs.shape, dtype=bool), np.zeros(xs.shape)
+
+    # returns the potential at the points xs, ys
+    def potential(self, xs, ys):
+        xs, ys = np.broadcast_arrays(np.asarray(xs, dtype=float), np.asarray(ys, dtype=float))
+        return self._interpolate(self.potential_grid, xs, ys)
+
+    # returns the x and y components of the field at the points xs, ys
+    def field(self, xs, ys):
+        xs, ys = np.broadcast_arrays(np.asarray(xs, dtype=float), np.asarray(ys, dtype=float))
+        return self._interpolate(self.field_x, xs, ys), self._interpolate(self.field_y, xs, ys)
+
+    # returns a potential grid of point charges at the points xs, ys,
+    # with this potential added
+    def add_to_potential(self, potential_grid, xs, ys):
+        xs, ys = np.broadcast_arrays(np.asarray(xs, dtype=float), np.asarray(ys, dtype=float))
+        inside, held_potential = self.inside(xs, ys)
+        return np.where(inside, held_potential, potential_grid + self.potential(xs, ys))
+
+    # returns field_grids, as returned by calc_grid for point charges at
+    # the points xs, ys, with this potential and field added
+    def add_to_grid(self, field_grids, xs, ys):
+        xs, ys = np.broadcast_arrays(np.asarray(xs, dtype=float), np.asarray(ys, dtype=float))
+        inside, held_potential = self.inside(xs, ys)
+        extra_x, extra_y = self.field(xs, ys)
+        potential_grid = np.where(inside, held_potential, field_grids[0] + self.potential(xs, ys))
+        field_x = np.where(inside, 0, field_grids[1] + extra_x)
+        field_y = np.where(inside, 0, field_grids[2] + extra_y)
+        return potential_grid, field_x, field_y, np.sqrt(field_x**2 + field_y**2)
+
+# the sum of several grid fields, on grids of their own; a point is held
+# at a potential if it is in any of them, the last one's first
+class GridFieldSum(GridField):
+    def __init__(self, fields):
+        self.fields = fields
+
+    def inside(self, xs, ys):
+        inside, held_potential = self.fields[0].inside(xs, ys)
+        for field in self.fields[1:]:
+            field_inside, field_potential = field.inside(xs, ys)
+            held_potential = np.where(field_inside, field_potential, held_potential)
+            inside = inside | field_inside
+        return inside, held_potential
+
+    def potential(self, xs, ys):
+        return sum(field.potential(xs, ys) for field in self.fields)
+
+    def field(self, xs, ys):
+        parts = [field.field(xs, ys) for field in self.fields]
+        return sum(part[0] for part in parts), sum(part[1] for part in parts)
+
+# returns the sum of the grid fields that are not None, or None if all are
+def combine_grid_fields(*fields):
+    fields = [field for field in fields if field is not None]
+    if not fields:
+        return None
+    if len(fields) == 1:
+        return fields[0]
+    return GridFieldSum(fields)
+
+# charge spread evenly over a line segment, a circular arc or a whole
+# ring, each a dict with its shape, its total charge "q", a "name" and
+# the keys of SOURCE_SHAPES for its shape, all in play area pixels:
+#   "line": from (x1, y1) to (x2, y2)
+#   "arc":  around the centre (x, y), from the angle start to end, in
+#           degrees clockwise from the x axis, as y grows downwards
+#   "ring": around the centre (x, y)
+# lines and rings have closed forms for their potential and field, arcs
+# are summed with Gauss-Legendre quadrature, ARC_ORDER points to each
+# ARC_PANEL_LENGTH pixels of arc or less, and to each FAR_PANEL_LENGTH
+# pixels for points at least that far from the arc, which need fewer. a
+# point on a line or ring gets nothing from it, as a point charge gives
+# nothing to its own point
+SOURCE_SHAPES = {"line": ("x1", "y1", "x2", "y2"), "arc": ("x", "y", "radius", "start", "end"), "ring": ("x", "y", "radius")}
+ARC_PANEL_LENGTH = 20
+FAR_PANEL_LENGTH = 80
+ARC_ORDER = 4
+# the points and weights of Gauss-Legendre quadrature of ARC_ORDER over
+# -1 to 1, the same for every panel
+ARC_NODES, ARC_WEIGHTS = np.polynomial.legendre.leggauss(ARC_ORDER)
+# most rounds of the arithmetic-geometric mean taken for the elliptic
+# integrals of a ring, enough for double precision until a hair's
+# breadth from the ring; they stop early once every point's terms are
+# below ELLIPTIC_TOLERANCE, whose square no longer counts
+ELLIPTIC_ITERATIONS = 10
+ELLIPTIC_TOLERANCE = 1e-8
+
+# returns the complete elliptic integrals of the first and second kind,
+# K(m) and E(m), of the parameter m, from the arithmetic-geometric mean
+def elliptic_integrals(m):
+    a = np.ones_like(m)
+    b = np.sqrt(1 - m)
+    total = m/2
+    power = 0.5
+    for i in range(ELLIPTIC_ITERATIONS):
+        c = (a - b)/2
+        a, b = (a + b)/2, np.sqrt(a*b)
+        power *= 2
+        total = total + power*c**2
+        if c.max(initial=0) < ELLIPTIC_TOLERANCE:
+            break
+    first_kind = np.pi/(2*a)
+    return first_kind, first_kind*(1 - total)
+
+# returns the potential and the x and y components of the field of a
+# line segment of total charge q from (x1, y1) to (x2, y2) at the points
+# xs, ys: along the segment and across it, the field at a point a
+# distance r1 from one end and r2 from the other is k*q/L*(1/r2 - 1/r1)
+# and k*q/L*(u/r1 - (u - L)/r2)/v, where u and v are its place along and
+# across, and the potential is k*q/L*ln((r1 + r2 + L)/(r1 + r2 - L))
+def _line_terms(q, x1, y1, x2, y2, xs, ys):
+    k = 9*(10**9)
+    length = np.hypot(x2 - x1, y2 - y1)
+    if length == 0:
+        return _calc_grid_terms((np.array([q]), np.array([x1]), np.array([y1])), xs, ys, theta=0)
+    density = k*q/length
+    along_x, along_y = (x2 - x1)/length, (y2 - y1)/length
+    u = (xs - x1)*along_x + (ys - y1)*along_y
+    v = (ys - y1)*along_x - (xs - x1)*along_y
+    r1 = np.hypot(xs - x1, ys - y1)
+    r2 = np.hypot(xs - x2, ys - y2)
+    gap = r1 + r2 - length
+    on_line = gap <= 0
+    potential_grid = density*np.log((r1 + r2 + length)/np.where(on_line, 1, gap))
+    potential_grid[on_line] = 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        field_u = density*(1/r2 - 1/r1)
+        field_v = density*(u/r1 - (u - length)/r2)/v
+    # beyond the ends, straight along the line, the field has no part across it
+    field_u[on_line | (r1 == 0) | (r2 == 0)] = 0
+    field_v[on_line | (v == 0)] = 0
+    return potential_grid, field_u*along_x - field_v*along_y, field_u*along_y + field_v*along_x
+
+# returns the potential and the x and y components of the field of a
+# ring of total charge q and the given radius around (x, y) at the
+# points xs, ys, in the plane of the ring: a distance d from its centre,
+# the potential is 2*k*q/pi*K(m)/(radius + d) and the field points away
+# from the centre with k*q/(pi*d)*(K(m)/(radius + d) + E(m)/(d - radius)),
+# where m = 4*radius*d/(radius + d)^2
+def _ring_terms(q, x, y, radius, xs, ys):
+    k = 9*(10**9)
+    r_x, r_y = xs - x, ys - y
+    d = np.hypot(r_x, r_y)
+    m = np.minimum(4*radius*d/(radius + d)**2, 1)
+    on_ring = m == 1
+    first_kind, second_kind = elliptic_integrals(np.where(on_ring, 0, m))
+    potential_grid = np.where(on_ring, 0, 2*k*q/np.pi*first_kind/(radius + d))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        field_mag = k*q/(np.pi*d)*(first_kind/(radius + d) + second_kind/(d - radius))/d
+    field_mag[on_ring | (d == 0)] = 0
+    return potential_grid, field_mag*r_x, field_mag*r_y
+
+# returns the charges at the Gauss-Legendre points of an arc split into
+# panels of at most panel_length pixels, as (q, x, y) arrays that add up
+# to the arc's field at points more than about half a panel from it
+def arc_quadrature_charges(source, panel_length=ARC_PANEL_LENGTH):
+    start, end = np.radians(source["start"]), np.radians(source["end"])
+    panels = max(1, int(np.ceil(abs(end - start)*source["radius"]/panel_length)))
+    edges = np.linspace(start, end, panels + 1)
+    half = (edges[1:] - edges[:-1])[:, None]/2
+    angles = ((edges[1:] + edges[:-1])[:, None]/2 + half*ARC_NODES).ravel()
+    q = np.broadcast_to(source["q"]*ARC_WEIGHTS/(2*panels), (panels, ARC_ORDER)).ravel()
+    return q, source["x"] + source["radius"]*np.cos(angles), source["y"] + source["radius"]*np.sin(angles)
+
+# returns the potential and the x and y components of the field of the
+# extended sources at the points xs, ys, which are worked on as flat
+# arrays, and given back in the shape they came in
+def calc_source_terms(sources, xs, ys):
+    xs, ys = np.broadcast_arrays(np.asarray(xs, dtype=float), np.asarray(ys, dtype=float))
+    shape = xs.shape
+    xs, ys = xs.ravel(), ys.ravel()
+    potential_grid, field_x, field_y = np.zeros(xs.shape), np.zeros(xs.shape), np.zeros(xs.shape)
+    for source in sources:
+        if source["shape"] == "line":
+            terms = _line_terms(source["q"], source["x1"], source["y1"], source["x2"], source["y2"], xs, ys)
+        elif source["shape"] == "ring":
+            terms = _ring_terms(source["q"], source["x"], source["y"], source["radius"], xs, ys)
+        else:
+            terms = [np.zeros(xs.shape) for i in range(3)]
+            near = source_distance(source, xs, ys) < FAR_PANEL_LENGTH
+            for points, panel_length in ((near, ARC_PANEL_LENGTH), (~near, FAR_PANEL_LENGTH)):
+                if points.any():
+                    for term, part in zip(terms, _calc_grid_terms(arc_quadrature_charges(source, panel_length), xs[points], ys[points], theta=0)):
+                        term[points] = part
+        potential_grid += terms[0]
+        field_x += terms[1]
+        field_y += terms[2]
+    return potential_grid.reshape(shape), field_x.reshape(shape), field_y.reshape(shape)
+
+# returns the point a source is placed by, as shown in the charge list
+# and moved by in the edit dialog: the middle of a line, the centre of
+# an arc or a ring
+def source_position(source):
+    if source["shape"] == "line":
+        return (source["x1"] + source["x2"])/2, (source["y1"] + source["y2"])/2
+    return source["x"], source["y"]
+
+# returns a copy of source moved dx, dy along
+def move_source(source, dx, dy):
+    moved = dict(source)
+    for key in ("x", "x1", "x2"):
+        if key in moved:
+            moved[key] += dx
+    for key in ("y", "y1", "y2"):
+        if key in moved:
+            moved[key] += dy
+    return moved
+
+# returns the distance from each of the points xs, ys to the nearest
+# point of source
+def source_distance(source, xs, ys):
+    xs, ys = np.asarray(xs, dtype=float), np.asarray(ys, dtype=float)
+    if source["shape"] == "line":
+        x1, y1 = source["x1"], source["y1"]
+        length_2 = (source["x2"] - x1)**2 + (source["y2"] - y1)**2
+        t = 0 if length_2 == 0 else np.clip(((xs - x1)*(source["x2"] - x1) + (ys - y1)*(source["y2"] - y1))/length_2, 0, 1)
+        return np.hypot(xs - x1 - t*(source["x2"] - x1), ys - y1 - t*(source["y2"] - y1))
+    r_x, r_y = xs - source["x"], ys - source["y"]
+    distance = np.abs(np.hypot(r_x, r_y) - source["radius"])
+    if source["shape"] == "ring":
+        return distance
+    # off the arc's angles, the nearest point is one of its ends
+    start, end = sorted(np.radians([source["start"], source["end"]]))
+    within = (np.arctan2(r_y, r_x) - start) % (2*np.pi) <= end - start
+    ends = [np.hypot(xs - source["x"] - source["radius"]*np.cos(angle), ys - source["y"] - source["radius"]*np.sin(angle)) for angle in (start, end)]
+    return np.where(within, distance, np.minimum(*ends))
+
+# returns n points spread evenly along source, and the unit normals of
+# the source there, as (x, y, normal_x, normal_y) arrays
+def source_points(source, n):
+    fractions = (np.arange(n) + 0.5)/n
+    if source["shape"] == "line":
+        length = max(np.hypot(source["x2"] - source["x1"], source["y2"] - source["y1"]), np.finfo(float).tiny)
+        normal = (-(source["y2"] - source["y1"])/length, (source["x2"] - source["x1"])/length)
+        return (source["x1"] + fractions*(source["x2"] - source["x1"]), source["y1"] + fractions*(source["y2"] - source["y1"]),
+                np.full(n, normal[0]), np.full(n, normal[1]))
+    if source["shape"] == "ring":
+        angles = 2*np.pi*fractions
+    else:
+        start, end = np.radians(source["start"]), np.radians(source["end"])
+        angles = start + fractions*(end - start)
+    return (source["x"] + source["radius"]*np.cos(angles), source["y"] + source["radius"]*np.sin(angles), np.cos(angles), np.sin(angles))
+
+# the potential and field of extended sources, worked out exactly
+# wherever they are asked for, to be added to the grids of point charges
+# like a GridField
+class SourceField(GridField):
+    def __init__(self, sources):
+        self.sources = sources
+
+    def potential(self, xs, ys):
+        return calc_source_terms(self.sources, xs, ys)[0]
+
+    def field(self, xs, ys):
+        return calc_source_terms(self.sources, xs, ys)[1:]
+
+    # the potential and field come from one pass over the sources
+    def add_to_grid(self, field_grids, xs, ys):
+        potential_grid, extra_x, extra_y = calc_source_terms(self.sources, xs, ys)
+        field_x = field_grids[1] + extra_x
+        field_y = field_grids[2] + extra_y
+        return field_grids[0] + potential_grid, field_x, field_y, np.sqrt(field_x**2 + field_y**2)
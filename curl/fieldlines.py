@@ -0,0 +1,209 @@
+# fieldlines.py - tracing of electric field lines
+
+# Copyright (C) 2025 Deepto Debnath, Subhradip Mondal
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+from math import pi
+from .electrostatics import charge_arrays, prepare_charges, calc_field_grid, source_distance, source_points
+
+# field lines leave (or enter) a charge of magnitude 1 at this many
+# points; other charges get lines in proportion to their magnitude
+LINES_PER_UNIT_CHARGE = 8
+MAX_LINES_PER_CHARGE = 48
+# lines start on a circle of SEED_RADIUS around their charge, or that far
+# to the side of an extended source, and end when they come within
+# CAPTURE_RADIUS of another charge or source
+SEED_RADIUS = 10
+CAPTURE_RADIUS = 5
+# limits of the adaptive step length, and the largest change of line
+# direction (as a difference of unit vectors) allowed within one step
+MIN_STEP = 0.5
+MAX_STEP = 16
+STEP_TOLERANCE = 0.05
+MAX_STEPS = 2000
+
+# returns the number of field lines drawn for a charge of magnitude q
+def count_field_lines(q):
+    if q == 0:
+        return 0
+    return int(min(MAX_LINES_PER_CHARGE, max(1, round(LINES_PER_UNIT_CHARGE*abs(q)))))
+
+# returns unit vectors along the field at points (xs, ys), multiplied by
+# signs, with the field of grid_field added if given; points
+# where the field vanishes give a zero vector
+def _field_direction(charges, xs, ys, signs, grid_field=None):
+    field_x, field_y, field_mag = calc_field_grid(charges, xs, ys)
+    if grid_field is not None:
+        extra_x, extra_y = grid_field.field(xs, ys)
+        field_x += extra_x
+        field_y += extra_y
+        field_mag = np.sqrt(field_x**2 + field_y**2)
+    field_mag[field_mag == 0] = np.inf
+    return np.stack((signs*field_x/field_mag, signs*field_y/field_mag), axis=1)
+
+# traces field lines from seed points with adaptive-step RK4, moving
+# along the field where signs is 1 and against it where signs is -1.
+# all lines are advanced together, one vectorized step at a time.
+# returns the list of polylines, and for each line the index of the
+# charge it ended on (-1 if it ended elsewhere). lines also end on
+# reaching a conductor of grid_field, or one of the extended sources,
+# whose index they ended on is returned too. tracing stops early,
+# leaving the lines unfinished, once cancelled() is true
+def _trace(charges, seeds, signs, width, height, max_steps, max_length, cancelled=None, grid_field=None, sources=()):
+    q, charge_x, charge_y = charge_arrays(charges)
+    n_lines = len(seeds)
+    if n_lines == 0:
+        return [], np.zeros(0, dtype=int), np.zeros(0, dtype=int)
+    pos = np.array(seeds, dtype=float).reshape(n_lines, 2)
+    signs = np.asarray(signs, dtype=float)
+    step = np.full(n_lines, MAX_STEP/4)
+    length = np.zeros(n_lines)
+    steps_taken = np.zeros(n_lines, dtype=int)
+    end_charge = np.full(n_lines, -1)
+    end_source = np.full(n_lines, -1)
+    active = np.arange(n_lines)
+    # points of all lines, in the order they were reached
+    point_lines = [active]
+    points = [pos.copy()]
+    capturing = q != 0
+
+    while active.size > 0 and not (cancelled and cancelled()):
+        p = pos[active]
+        h = step[active][:, None]
+        s = signs[active]
+        k1 = _field_direction(charges, *p.T, s, grid_field)
+        k2 = _field_direction(charges, *(p + h/2*k1).T, s, grid_field)
+        k3 = _field_direction(charges, *(p + h/2*k2).T, s, grid_field)
+        k4 = _field_direction(charges, *(p + h*k3).T, s, grid_field)
+        new_pos = p + h/6*(k1 + 2*k2 + 2*k3 + k4)
+
+        # halve the step of lines that turned too sharply and retry them
+        error = np.hypot(*(k1 - k4).T)
+        accepted = (error <= STEP_TOLERANCE) | (step[active] <= MIN_STEP)
+        rejected = active[~accepted]
+        step[rejected] = np.maximum(step[rejected]/2, MIN_STEP)
+        stalled = accepted & ~k1.any(axis=1)
+        new_pos = new_pos[accepted]
+        error = error[accepted]
+        moved = active[accepted]
+
+        length[moved] += np.hypot(*(new_pos - pos[moved]).T)
+        pos[moved] = new_pos
+        steps_taken[moved] += 1
+        point_lines.append(moved)
+        points.append(new_pos)
+
+        # grow the step of lines that barely turned, but never step past
+        # half the distance to the nearest charge or source so none can be
+        # jumped over
+        if q.size > 0:
+            dist = np.hypot(new_pos[:, 0, None] - charge_x, new_pos[:, 1, None] - charge_y)
+            dist[:, ~capturing] = np.inf
+            nearest = dist.argmin(axis=1)
+            nearest_dist = dist[np.arange(moved.size), nearest]
+        else:
+            # with no point charges, as in a scene of sources alone, there
+            # is no charge to step short of or end at
+            nearest_dist = np.full(moved.size, np.inf)
+        source_dist = np.full(moved.size, np.inf)
+        nearest_source = np.full(moved.size, -1)
+        for i, source in enumerate(sources):
+            dist = source_distance(source, new_pos[:, 0], new_pos[:, 1])
+            nearest_source[dist < source_dist] = i
+            source_dist = np.minimum(source_dist, dist)
+        grown = np.where(error < STEP_TOLERANCE/3, step[moved]*1.5, step[moved])
+        step[moved] = np.clip(np.minimum(grown, np.minimum(nearest_dist, source_dist)/2), MIN_STEP, MAX_STEP)
+
+        # stop lines that reached a charge, left the play area, stalled
+        # where the field vanishes or ran out of steps or length
+        if q.size > 0:
+            captured = nearest_dist < CAPTURE_RADIUS
+            end_charge[moved[captured]] = nearest[captured]
+            point_lines.append(moved[captured])
+            points.append(np.stack((charge_x[nearest[captured]], charge_y[nearest[captured]]), axis=1))
+        else:
+            captured = np.zeros(moved.size, dtype=bool)
+        source_captured = ~captured & (source_dist < CAPTURE_RADIUS)
+        end_source[moved[source_captured]] = nearest_source[source_captured]
+        captured |= source_captured
+        outside = (new_pos[:, 0] < 0) | (new_pos[:, 0] > width) | (new_pos[:, 1] < 0) | (new_pos[:, 1] > height)
+        if grid_field is not None:
+            outside |= grid_field.inside(new_pos[:, 0], new_pos[:, 1])[0]
+        finished = captured | outside | stalled[accepted] | (steps_taken[moved] >= max_steps) | (length[moved] >= max_length)
+        done = np.zeros(n_lines, dtype=bool)
+        done[moved[finished]] = True
+        active = active[~done[active]]
+
+    point_lines = np.concatenate(point_lines)
+    points = np.concatenate(points)
+    order = np.argsort(point_lines, kind='stable')
+    counts = np.bincount(point_lines, minlength=n_lines)
+    polylines = np.split(points[order], np.cumsum(counts)[:-1])
+    return [line.tolist() for line in polylines], end_charge, end_source
+
+# returns the angles at which field lines leave a charge whose lines
+# have already been met by lines arriving at arrival_angles: the charge
+# gets count_field_lines(q) evenly spaced angles, less the one closest
+# to each arrival
+def _seed_angles(q, arrival_angles=()):
+    n = count_field_lines(q)
+    angles = [2*pi/n*j + pi/n for j in range(n)]
+    for arrival in arrival_angles:
+        if not angles:
+            break
+        gaps = [abs((angle - arrival + pi) % (2*pi) - pi) for angle in angles]
+        del angles[gaps.index(min(gaps))]
+    return angles
+
+# returns the points field lines leave an extended source from, n of
+# them spread evenly along it, to either side in turn
+def _source_seeds(source, n):
+    if n <= 0:
+        return []
+    x, y, normal_x, normal_y = source_points(source, n)
+    side = SEED_RADIUS*np.where(np.arange(n) % 2 == 0, 1, -1)
+    return np.stack((x + side*normal_x, y + side*normal_y), axis=1).tolist()
+
+# traces the field lines of the charges in charge_list over a play area
+# of the given width and height. lines are traced along the field out of
+# positive charges until they end on a charge, leave the play area or
+# exceed max_steps or max_length; negative charges are then given lines
+# (traced against the field) for the part of their flux that no line
+# arrived at. returns a list of polylines, each a list of [x, y] points
+# ordered along the direction of the field. cancelled, if given, is
+# called every step and stops the tracing when it returns true. with
+# grid_field, the field induced on conductors as returned by
+# ConductorSolver.solve in poisson.py, that of painted charge from
+# density.py, or their sum, lines follow the field of both and end on
+# the conductors. extended sources, as described at SOURCE_SHAPES in
+# electrostatics.py, whose field is part of grid_field, get lines as
+# charges of their total charge do, leaving from along their length
+def trace_field_lines(charge_list, width, height, max_steps=MAX_STEPS, max_length=None, cancelled=None, grid_field=None, sources=()):
+    charges = prepare_charges(charge_list)
+    q, charge_x, charge_y = charge_arrays(charges)
+    if max_length is None:
+        max_length = 2*(width + height)
+
+    seeds = []
+    for i in np.flatnonzero(q > 0):
+        for angle in _seed_angles(q[i]):
+            seeds.append([charge_x[i] + SEED_RADIUS*np.cos(angle), charge_y[i] + SEED_RADIUS*np.sin(angle)])
+    for source in sources:
+        if source["q"] > 0:
+            seeds += _source_seeds(source, count_field_lines(source["q"]))
+    field_lines, end_charge, end_source = _trace(charges, seeds, np.ones(len(seeds)), width, height, max_steps, max_length, cancelled, grid_field, sources)
+
+    seeds = []
+    for i in np.flatnonzero(q < 0):
+        arrival_angles = [np.arctan2(line[-2][1] - charge_y[i], line[-2][0] - charge_x[i])
+                          for line, end in zip(field_lines, end_charge) if end == i]
+        for angle in _seed_angles(q[i], arrival_angles):
+            seeds.append([charge_x[i] + SEED_RADIUS*np.cos(angle), charge_y[i] + SEED_RADIUS*np.sin(angle)])
+    for i, source in enumerate(sources):
+        if source["q"] < 0:
+            seeds += _source_seeds(source, count_field_lines(source["q"]) - np.count_nonzero(end_source == i))
+    inward_lines = _trace(charges, seeds, -np.ones(len(seeds)), width, height, max_steps, max_length, cancelled, grid_field, sources)[0]
+
+    return field_lines + [line[::-1] for line in inward_lines]
@@ -0,0 +1,276 @@
+# poisson.py - a multigrid finite difference solver for Poisson's
+# equation, used to hold conductors and the edges of the play area at
+# fixed potentials
+
+# Copyright (C) 2025 Deepto Debnath, Subhradip Mondal
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+from math import ceil
+from .electrostatics import calc_potential_grid, GridField
+
+# spacing of the grid the potential of the conductors is solved on, in
+# pixels of the play area
+POISSON_STEP = 4
+# with open edges, the grid reaches POISSON_MARGIN of the play area's
+# size past each edge, where the potential of the conductors is taken
+# to have died away
+POISSON_MARGIN = 0.25
+# the solver stops once no point of the grid is further than
+# POISSON_TOLERANCE (relative to the largest potential held fixed) from
+# solving the equation, or after MAX_ITERATIONS iterations
+POISSON_TOLERANCE = 1e-4
+MAX_ITERATIONS = 30
+# red-black Gauss-Seidel sweeps before and after each coarse grid
+# correction, and on the coarsest grid, which has at most
+# COARSEST_INTERVALS intervals along each axis
+SMOOTHING_SWEEPS = 2
+COARSEST_SWEEPS = 10
+COARSEST_INTERVALS = 6
+
+# the edges of the play area are either held at a potential, a number
+# of volts, or left open
+OPEN_BOUNDARY = "open"
+
+# a conductor is a dict with its "shape", "rect" or "circle", and the
+# "potential" it is held at, in volts; rects have the "x", "y" of their
+# top left corner, a "width" and a "height", circles the "x", "y" of
+# their centre and a "radius"
+CONDUCTOR_SHAPES = {"rect": ("x", "y", "width", "height"), "circle": ("x", "y", "radius")}
+
+# returns whether each point xs, ys lies within one of the conductors,
+# and the potential it is held at there (0 outside all of them); where
+# conductors overlap, the later one counts
+def conductor_potentials(conductors, xs, ys):
+    xs, ys = np.broadcast_arrays(np.asarray(xs, dtype=float), np.asarray(ys, dtype=float))
+    inside = np.zeros(xs.shape, dtype=bool)
+    potential = np.zeros(xs.shape)
+    for conductor in conductors:
+        if conductor["shape"] == "rect":
+            within = ((xs >= conductor["x"]) & (xs <= conductor["x"] + conductor["width"]) &
+                      (ys >= conductor["y"]) & (ys <= conductor["y"] + conductor["height"]))
+        else:
+            within = (xs - conductor["x"])**2 + (ys - conductor["y"])**2 <= conductor["radius"]**2
+        inside |= within
+        potential[within] = conductor["potential"]
+    return inside, potential
+
+# returns the grid points that are fixed, or free, at any of the
+# neighbours of each point, including itself
+def _dilate(mask):
+    grown = mask.copy()
+    grown[1:] |= mask[:-1]
+    grown[:-1] |= mask[1:]
+    wider = grown.copy()
+    wider[:, 1:] |= grown[:, :-1]
+    wider[:, :-1] |= grown[:, 1:]
+    return wider
+
+# returns the levels of the multigrid hierarchy for a grid whose points
+# in the mask fixed are held at given values, from the finest down: the
+# spacing of each level and the masks of its red and black free points
+# inside the outer ring, which is always fixed. a coarse point is fixed
+# where any fine point around it is, so thin plates are never lost
+def build_levels(fixed, spacing):
+    levels = []
+    while True:
+        fixed = fixed.copy()
+        fixed[[0, -1], :] = True
+        fixed[:, [0, -1]] = True
+        free = ~fixed
+        i, j = np.indices(fixed.shape)
+        red = (i + j) % 2 == 0
+        levels.append({"spacing": spacing, "free": free, "red": (free & red)[1:-1, 1:-1], "black": (free & ~red)[1:-1, 1:-1]})
+        intervals = np.array(fixed.shape) - 1
+        if (intervals % 2).any() or intervals.max() <= COARSEST_INTERVALS:
+            return levels
+        fixed = _dilate(fixed)[::2, ::2]
+        spacing *= 2
+
+# runs red-black Gauss-Seidel sweeps over the free points of u, for the
+# five point Laplacian of u to equal f; in reverse, the black points are
+# swept first, which makes a sweep there and one back symmetric
+def _smooth(u, f, level, sweeps, reverse=False):
+    interior = u[1:-1, 1:-1]
+    scaled_f = f[1:-1, 1:-1]*level["spacing"]**2
+    new = np.empty(interior.shape)
+    colours = (level["black"], level["red"]) if reverse else (level["red"], level["black"])
+    for sweep in range(sweeps):
+        for colour in colours:
+            np.add(u[:-2, 1:-1], u[2:, 1:-1], out=new)
+            new += u[1:-1, :-2]
+            new += u[1:-1, 2:]
+            new -= scaled_f
+            new *= 0.25
+            np.copyto(interior, new, where=colour)
+
+# returns the five point Laplacian of u at the free points of u, and 0
+# at the fixed ones
+def _laplacian(u, level):
+    laplacian = np.zeros(u.shape)
+    laplacian[1:-1, 1:-1] = (u[:-2, 1:-1] + u[2:, 1:-1] + u[1:-1, :-2] + u[1:-1, 2:] - 4*u[1:-1, 1:-1])/level["spacing"]**2
+    laplacian[~level["free"]] = 0
+    return laplacian
+
+# returns the residual of a grid averaged onto the grid of half the
+# resolution, with full weighting
+def _restrict(residual):
+    r = residual
+    coarse = np.zeros(((r.shape[0] + 1)//2, (r.shape[1] + 1)//2))
+    coarse[1:-1, 1:-1] = (4*r[2:-2:2, 2:-2:2] + 2*(r[1:-3:2, 2:-2:2] + r[3:-1:2, 2:-2:2] + r[2:-2:2, 1:-3:2] + r[2:-2:2, 3:-1:2]) +
+                          r[1:-3:2, 1:-3:2] + r[3:-1:2, 1:-3:2] + r[1:-3:2, 3:-1:2] + r[3:-1:2, 3:-1:2])/16
+    return coarse
+
+# returns a correction on a coarse grid interpolated onto the grid of
+# twice the resolution, of the given shape
+def _prolong(e, shape):
+    fine = np.zeros(shape)
+    fine[::2, ::2] = e
+    fine[1::2, ::2] = (e[:-1] + e[1:])/2
+    fine[::2, 1::2] = (e[:, :-1] + e[:, 1:])/2
+    fine[1::2, 1::2] = (e[:-1, :-1] + e[1:, :-1] + e[:-1, 1:] + e[1:, 1:])/4
+    return fine
+
+# returns an approximate solution e, 0 at the fixed points, of the
+# Laplacian of e equalling f, from one multigrid V-cycle from the given
+# level down: smooth, solve for the smooth part of the remaining error
+# on the coarser grids, add it back and smooth again in reverse. the
+# cycle is a symmetric linear map of f, as conjugate gradients need
+def _v_cycle(levels, depth, f):
+    level = levels[depth]
+    e = np.zeros(f.shape)
+    if depth == len(levels) - 1:
+        for sweep in range(COARSEST_SWEEPS):
+            _smooth(e, f, level, 1, reverse=sweep % 2 == 1)
+        return e
+    _smooth(e, f, level, SMOOTHING_SWEEPS)
+    coarse_f = _restrict(f - _laplacian(e, level))
+    e += np.where(level["free"], _prolong(_v_cycle(levels, depth + 1, coarse_f), e.shape), 0)
+    _smooth(e, f, level, SMOOTHING_SWEEPS, reverse=True)
+    return e
+
+# solves Poisson's equation, that the Laplacian of u is source (0 if
+# not given), on a grid of the given spacing, with u held at its values
+# at the points of the mask fixed and at the edges of the grid. u is
+# solved in place, starting from its values at the free points, so a
+# previous solution makes a warm start that converges in an iteration
+# or two after a small change. the iterations are conjugate gradients,
+# with a multigrid V-cycle as preconditioner, which keeps them fast
+# around conductors of any shape. levels may be given from build_levels
+# for the same fixed points, to save building them again. returns the
+# number of iterations run
+def solve_poisson(u, fixed, spacing=1, source=None, levels=None, tolerance=POISSON_TOLERANCE, max_iterations=MAX_ITERATIONS):
+    if levels is None:
+        levels = build_levels(fixed, spacing)
+    level = levels[0]
+    if source is None:
+        source = np.zeros(u.shape)
+    scale = max(np.abs(u[~level["free"]]).max(initial=0), np.abs(source).max()*spacing**2, np.finfo(float).tiny)
+    residual = np.where(level["free"], source, 0) - _laplacian(u, level)
+    direction = None
+    for iteration in range(max_iterations + 1):
+        # stop once a sweep would change no point by more than tolerance
+        if np.abs(residual).max()*spacing**2/4 <= tolerance*scale or iteration == max_iterations:
+            return iteration
+        z = _v_cycle(levels, 0, residual)
+        rz = np.vdot(residual, z)
+        direction = z if direction is None else z + rz/last_rz*direction
+        last_rz = rz
+        step = _laplacian(direction, level)
+        alpha = rz/np.vdot(direction, step)
+        u += alpha*direction
+        residual -= alpha*step
+
+# the potential and field added to those of the free charges by the
+# charge induced on the conductors and the edges, solved on a grid, as
+# returned by ConductorSolver.solve; inside the conductors, the
+# potential is theirs and the field 0
+class InducedField(GridField):
+    def __init__(self, potential_grid, origin, spacing, conductors, boundary, width, height):
+        field_x, field_y = np.gradient(potential_grid, spacing)
+        super().__init__(potential_grid, -field_x, -field_y, origin, spacing)
+        self.conductors = conductors
+        self.boundary = boundary
+        self.width = width
+        self.height = height
+        self.iterations = 0
+
+    # returns whether each point xs, ys is inside a conductor, or outside
+    # the play area if its edges are held at a potential, and the
+    # potential it is held at there
+    def inside(self, xs, ys):
+        inside, potential = conductor_potentials(self.conductors, xs, ys)
+        if self.boundary != OPEN_BOUNDARY:
+            outside = (xs < 0) | (xs > self.width) | (ys < 0) | (ys > self.height)
+            potential[outside & ~inside] = self.boundary
+            inside |= outside
+        return inside, potential
+
+# solves for the potential induced by free charges on conductors held at
+# fixed potentials and, unless they are open, on the edges of a play
+# area of the given size. the free charges' own potential and field are
+# summed exactly as everywhere else, so the grid only carries the
+# induced part, which is smooth: it solves Laplace's equation, with the
+# conductors and edges held at their potential less that of the free
+# charges. the solution of one call is the warm start of the next, as
+# long as the conductors and edges stay the same
+class ConductorSolver:
+    def __init__(self, width, height, spacing=POISSON_STEP):
+        self.width = width
+        self.height = height
+        self.spacing = spacing
+        self.key = None
+        self.solution = None
+
+    # lays out the grid for the conductors and edges: its size along
+    # each axis is a multiple of a power of two, so it can be halved
+    # down to a few intervals, and it covers the play area, with a margin
+    # around it if the edges are open. the grid points where the
+    # potential is held fixed, and those of them next to a free point,
+    # whose value the solution depends on, are kept
+    def _build(self, conductors, boundary):
+        spacing = self.spacing
+        margin = POISSON_MARGIN if boundary == OPEN_BOUNDARY else 0
+        intervals = [ceil(size/spacing) + 2*ceil(margin*size/spacing) for size in (self.width, self.height)]
+        power = 1
+        while ceil(max(intervals)/power) > COARSEST_INTERVALS:
+            power *= 2
+        shape = [ceil(n/power)*power + 1 for n in intervals]
+        self.origin = [(self.width - (shape[0] - 1)*spacing)/2, (self.height - (shape[1] - 1)*spacing)/2]
+        xs, ys = np.meshgrid(self.origin[0] + np.arange(shape[0])*spacing, self.origin[1] + np.arange(shape[1])*spacing, indexing='ij')
+        self.fixed, held_potential = conductor_potentials(conductors, xs, ys)
+        if boundary != OPEN_BOUNDARY:
+            outside = (xs < 0) | (xs > self.width) | (ys < 0) | (ys > self.height)
+            held_potential[outside & ~self.fixed] = boundary
+            self.fixed |= outside
+        self.levels = build_levels(self.fixed, spacing)
+        # two rows of held points along each surface, so that the field
+        # found from the potential's slope next to a surface is right
+        surface = self.fixed & _dilate(_dilate(~self.fixed))
+        self.surface = np.nonzero(surface)
+        self.surface_x, self.surface_y = xs[surface], ys[surface]
+        self.surface_potential = held_potential[surface]
+        self.solution = np.zeros(shape)
+
+    # returns the InducedField of the charges in charge_list with the
+    # conductors, a list of dicts as described at CONDUCTOR_SHAPES, and
+    # the edges held at boundary volts or open; None if there is nothing
+    # to induce a charge on. external_field is the GridField of any
+    # painted charge and extended sources, whose potential is taken off
+    # the held one like the free charges'
+    def solve(self, charge_list, conductors, boundary=OPEN_BOUNDARY, external_field=None):
+        if not conductors and boundary == OPEN_BOUNDARY:
+            return None
+        key = (tuple(tuple(sorted(conductor.items())) for conductor in conductors), boundary)
+        if key != self.key:
+            self._build(conductors, boundary)
+            self.key = key
+        u = self.solution
+        u[self.surface] = self.surface_potential - calc_potential_grid(charge_list, self.surface_x, self.surface_y)
+        if external_field is not None:
+            u[self.surface] -= external_field.potential(self.surface_x, self.surface_y)
+        iterations = solve_poisson(u, self.fixed, self.spacing, levels=self.levels)
+        induced = InducedField(u.copy(), self.origin, self.spacing, conductors, boundary, self.width, self.height)
+        induced.iterations = iterations
+        return induced
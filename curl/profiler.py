@@ -0,0 +1,110 @@
+# profiler.py - timing of the stages of every frame, kept for the last
+# few hundred frames to show on screen or write to a CSV file
+
+# Copyright (C) 2025 Deepto Debnath, Subhradip Mondal
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import csv
+from time import perf_counter
+import numpy as np
+import pygame
+
+# number of frames the profiler remembers
+HISTORY_FRAMES = 300
+
+# keeps the time spent in each stage of the last HISTORY_FRAMES frames in
+# a ring buffer. a frame starts with start_frame, and mark(stage) adds
+# the time since the previous mark (or the start of the frame) to stage,
+# so timing a stage costs one clock read. the time of a frame, which the
+# frame rates are worked out from, leaves out idle_stages, those where
+# the program sleeps rather than works, so that an idle program does not
+# read as a slow one
+class FrameProfiler:
+    def __init__(self, stages, history=HISTORY_FRAMES, idle_stages=()):
+        self.stages = list(stages)
+        self.stage_index = {stage: i for i, stage in enumerate(self.stages)}
+        self.is_working = np.array([stage not in idle_stages for stage in self.stages])
+        self.stage_times = np.zeros((history, len(self.stages)))
+        self.frame_times = np.zeros(history)
+        self.frame_numbers = np.zeros(history, dtype=int)
+        self.count = 0
+        self.current = np.zeros(len(self.stages))
+        self.frame_number = 0
+        self.frame_start = None
+        self.last_mark = None
+
+    # ends the frame being timed, if any, and starts timing a new one
+    def start_frame(self, frame_number):
+        now = perf_counter()
+        if self.frame_start is not None:
+            row = self.count % len(self.frame_times)
+            self.stage_times[row] = self.current
+            self.frame_times[row] = self.current[self.is_working].sum()*1000
+            self.frame_numbers[row] = self.frame_number
+            self.count += 1
+            self.current[:] = 0
+        self.frame_number = frame_number
+        self.frame_start = now
+        self.last_mark = now
+
+    # adds the time since the last mark to stage
+    def mark(self, stage):
+        now = perf_counter()
+        self.current[self.stage_index[stage]] += now - self.last_mark
+        self.last_mark = now
+
+    # returns the frame numbers, the time in ms of each stage and the
+    # time in ms of the work of the remembered frames, oldest first
+    def history(self):
+        size = len(self.frame_times)
+        if self.count <= size:
+            order = np.arange(self.count)
+        else:
+            order = (np.arange(size) + self.count) % size
+        return self.frame_numbers[order], self.stage_times[order]*1000, self.frame_times[order]
+
+    # returns the mean time in ms of each stage over the remembered frames
+    def stage_means(self):
+        stage_times = self.history()[1]
+        if len(stage_times) == 0:
+            return {stage: 0.0 for stage in self.stages}
+        return dict(zip(self.stages, stage_times.mean(axis=0).tolist()))
+
+    # returns the frame rate that the given percentage of remembered
+    # frames were slower than, for each percentage; 50 gives the median
+    # frame rate and 1 the "1% low"
+    def fps_percentiles(self, percentages=(50, 5, 1)):
+        frame_times = self.history()[2]
+        if len(frame_times) == 0:
+            return {percentage: 0.0 for percentage in percentages}
+        return {percentage: 1000/np.percentile(frame_times, 100-percentage) for percentage in percentages}
+
+    # writes the remembered frames to a CSV file, one row per frame with
+    # the time in ms of each stage and, as total, of the frame's work
+    def write_csv(self, path):
+        frame_numbers, stage_times, frame_times = self.history()
+        with open(path, "w", newline="") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(["frame"] + self.stages + ["total"])
+            for frame_number, times, frame_time in zip(frame_numbers.tolist(), stage_times.tolist(), frame_times.tolist()):
+                writer.writerow([frame_number] + ["{:.3f}".format(t) for t in times] + ["{:.3f}".format(frame_time)])
+
+# returns a surface showing the mean time of each stage and the frame
+# rate percentiles of profiler, and any extra_lines, written with font
+def render_hud(profiler, font, text_color, bg_color, extra_lines=()):
+    lines = [stage + ": " + "{:.2f}".format(ms) + "ms" for stage, ms in profiler.stage_means().items()]
+    lines += extra_lines
+    fps = profiler.fps_percentiles()
+    lines.append("FPS " + "{:.1f}".format(fps[50]) + " median")
+    lines.append("FPS " + "{:.1f}".format(fps[5]) + " 5% low")
+    lines.append("FPS " + "{:.1f}".format(fps[1]) + " 1% low")
+    texts = [font.render(line, False, text_color) for line in lines]
+    hud = pygame.surface.Surface((max(text.get_width() for text in texts) + 8, sum(text.get_height() for text in texts) + 8))
+    hud.fill(bg_color)
+    hud.set_alpha(220)
+    height_blitted = 4
+    for text in texts:
+        hud.blit(text, (4, height_blitted))
+        height_blitted += text.get_height()
+    return hud
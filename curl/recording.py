@@ -0,0 +1,131 @@
+# recording.py - the events of every frame of the program written to a
+# file as it runs, e.g. with
+#   python -m curl scene.json --record drag.jsonl
+# and played back with no window, as fast as the frames can be drawn,
+# timing every frame
+#   python -m curl replay drag.jsonl --out drag_times.csv
+
+# Copyright (C) 2025 Deepto Debnath, Subhradip Mondal
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import os
+import json
+import argparse
+import numpy as np
+import pygame
+from .scene import scene_data, scene_from_data
+
+# the events the program acts on, which are all a recording keeps; the
+# rest, like mouse motion, only matter through the mouse position kept
+# for every frame
+RECORDED_EVENTS = (pygame.QUIT, pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE, pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.KEYDOWN)
+EVENT_TYPES = {pygame.event.event_name(event_type): event_type for event_type in RECORDED_EVENTS}
+# file a replay writes the time of every frame to, and the number of the
+# slowest frames it lists
+REPLAY_TIMES_PATH = "replay_times.csv"
+SLOWEST_FRAMES = 5
+
+# returns event as a dict of its type's name and those of its attributes
+# that are numbers, text or tuples of numbers, such as pos, button, key,
+# unicode and mod
+def event_data(event):
+    data = {"type": pygame.event.event_name(event.type)}
+    for name, value in event.dict.items():
+        if isinstance(value, (bool, int, float, str)):
+            data[name] = value
+        elif isinstance(value, tuple) and all(isinstance(item, (int, float)) for item in value):
+            data[name] = list(value)
+    return data
+
+# returns the event written by event_data
+def data_event(data):
+    return pygame.event.Event(EVENT_TYPES[data["type"]], {name: tuple(value) if isinstance(value, list) else value
+                                                         for name, value in data.items() if name != "type"})
+
+# writes a recording to path, as lines of JSON: the first holds the
+# scene the program started with and where the mouse was, and each one
+# after it a frame, with where the mouse was and the time in ms from
+# pygame.time when its events came in, and the events. each line is
+# written as its frame ends, so a recording of a crash holds every
+# frame up to it
+class EventRecorder:
+    def __init__(self, path, scene, mouse_pos):
+        self.file = open(path, "w")
+        self.write({"scene": scene_data(scene), "mouse": list(mouse_pos)})
+
+    def write(self, data):
+        self.file.write(json.dumps(data) + "\n")
+        self.file.flush()
+
+    def record(self, frame_number, mouse_pos, ticks, events):
+        self.write({"frame": frame_number, "mouse": list(mouse_pos), "ticks": ticks,
+                    "events": [event_data(event) for event in events if event.type in RECORDED_EVENTS]})
+
+    def close(self):
+        self.file.close()
+
+# reads the recording at path as a dict of the "scene" it starts with,
+# the "mouse" position it starts at and its "frames", each a dict as
+# written by EventRecorder.record; raises ValueError if it is not one
+def read_recording(path):
+    with open(path) as recording_file:
+        lines = [line for line in recording_file if line.strip()]
+    try:
+        header = json.loads(lines[0])
+        frames = [json.loads(line) for line in lines[1:]]
+        for frame in frames:
+            for event in frame["events"]:
+                if event["type"] not in EVENT_TYPES:
+                    raise ValueError("unknown event \"" + str(event["type"]) + "\" in frame " + str(frame["frame"]) + " of " + path)
+        return {"scene": scene_from_data(header["scene"], path), "mouse": tuple(header["mouse"]), "frames": frames}
+    except (IndexError, KeyError, TypeError, json.JSONDecodeError):
+        raise ValueError(path + " is not a recording") from None
+
+# yields the mouse position, the time in ms and the events of every frame
+# of a recording, as the game loop takes them from pygame
+def replay_events(recording):
+    for frame in recording["frames"]:
+        yield tuple(frame["mouse"]), frame["ticks"], [data_event(event) for event in frame["events"]]
+
+# plays back the recording given in argv with no window, then says how
+# long its frames took and writes the time of each stage of every frame
+# to a CSV file
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m curl replay", description="Play back a recording made with --record with no window, timing every frame.")
+    parser.add_argument("recording", help="recording to play back")
+    parser.add_argument("--out", default=REPLAY_TIMES_PATH, help="CSV file to write the time of every frame to (default: " + REPLAY_TIMES_PATH + ")")
+    args = parser.parse_args(argv)
+
+    try:
+        recording = read_recording(args.recording)
+    except (OSError, ValueError) as error:
+        parser.exit(1, parser.prog + ": " + str(error) + "\n")
+
+    # the window is never shown, so any machine can play back a recording
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    from .app import App
+    app = App(replay=recording)
+    app.run()
+    # the profiler keeps a frame's times once the next one starts
+    profiler = app.profiler
+    profiler.start_frame(app.frame_count)
+
+    frame_numbers, stage_times, frame_times = profiler.history()
+    print("replayed", len(frame_times), "frames in", "{:.2f}".format(frame_times.sum()/1000) + "s: median",
+          "{:.1f}".format(np.median(frame_times)) + "ms, 95th percentile", "{:.1f}".format(np.percentile(frame_times, 95)) + "ms")
+    print("mean of each stage:", ", ".join(stage + " " + "{:.2f}".format(ms) + "ms" for stage, ms in profiler.stage_means().items()))
+    for i in np.argsort(frame_times)[::-1][:SLOWEST_FRAMES].tolist():
+        stage = int(np.argmax(stage_times[i]))
+        print("frame", frame_numbers[i], "took", "{:.1f}".format(frame_times[i]) + "ms, most of it in", profiler.stages[stage],
+              "{:.1f}".format(stage_times[i][stage]) + "ms")
+    try:
+        profiler.write_csv(args.out)
+    except OSError as error:
+        parser.exit(1, parser.prog + ": could not write " + args.out + ": " + str(error) + "\n")
+    print("wrote", args.out)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
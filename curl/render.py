@@ -0,0 +1,503 @@
+# render.py - functions to draw the field, field lines, equipotential
+# lines and charges of a scene on a surface, with no display needed
+
+# Copyright (C) 2025 Deepto Debnath, Subhradip Mondal
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import pygame
+import numpy as np
+from math import ceil, cos, sin, pi, log
+from bisect import bisect_right
+from time import perf_counter
+from .colors import *
+from .electrostatics import *
+from .fieldlines import trace_field_lines
+from .contours import contour_grid, find_equipotentials, POTENTIAL_LEVELS
+from .poisson import ConductorSolver, OPEN_BOUNDARY
+from .density import ChargeDensity, density_field, DENSITY_STEP
+from .assets import load_atlas
+
+# size of the play area, in the coordinates charges are placed in
+SCENE_WIDTH, SCENE_HEIGHT = 1000, 600
+
+# points the potential is sampled at to find equipotential lines
+contour_grid_x, contour_grid_y = contour_grid(SCENE_WIDTH, SCENE_HEIGHT)
+
+# centres of the arrows drawn in discrete mode, ARROW_SPACING apart
+ARROW_SPACING = 20
+arrow_grid_x, arrow_grid_y = np.meshgrid(np.arange(ARROW_SPACING/2, SCENE_WIDTH-ARROW_SPACING/2+1, ARROW_SPACING),
+                                         np.arange(ARROW_SPACING/2, SCENE_HEIGHT-ARROW_SPACING/2+1, ARROW_SPACING), indexing='ij')
+
+# where the field changes quickly, as around charges, a cell of the arrow
+# grid is split into four with an arrow each, and those again, up to
+# MAX_ARROW_DEPTH times. a cell is split when the field turns by more
+# than REFINE_ANGLE radians or changes in strength by more than
+# REFINE_RATIO times from a neighbouring cell's, the cells where it
+# changes most first, until ARROW_REFINE_BUDGET seconds have been spent
+MAX_ARROW_DEPTH = 2
+REFINE_ANGLE = pi/6
+REFINE_RATIO = 4
+ARROW_REFINE_BUDGET = 0.010
+# number of cells split together when refining, at first; it doubles
+# with every batch, so the time a batch takes can be judged early on
+REFINE_BATCH_CELLS = 64
+
+# ways of showing the potential heatmap: not at all, under the arrows or
+# field lines, or on its own in place of them
+HEATMAP_MODES = ("off", "underlay", "only")
+# distance in pixels between the points the heatmap samples the
+# potential at; it is drawn at that resolution and smoothly scaled up
+HEATMAP_STEP = 4
+# number of colours in the heatmap's lookup table
+HEATMAP_LUT_SIZE = 256
+# opacity of the heatmap under the arrows or field lines, which are drawn
+# in the same colours and would be lost on it at full strength
+HEATMAP_UNDERLAY_ALPHA = 110
+
+# colour of each potential band between the POTENTIAL_LEVELS, as picked
+# by get_potential_color
+POTENTIAL_COLORS = (gradient_10, gradient_15, gradient_20, gradient_25, gradient_30, gradient_35,
+                    gradient_40, gradient_45, gradient_50, gradient_55, gradient_60)
+# field strengths at which arrows get longer, and the length and line
+# width of the arrows of each class of strength, for draw_field_arrow
+# and draw_field_arrows alike
+ARROW_FIELD_EDGES = np.array([10**(-4), (1/75)*10**(-2), (1/5)*10**(-3), 10**(-3), 10**(-2), 10**(-1),
+                              10, 100, 1000, 5000, 7500, 10**4])*10**5
+ARROW_LENGTHS = (0, 2, 4, 6, 10, 13, 17, 20, 25, 30, 35, 40, 45)
+ARROW_WIDTHS = (0, 1, 1, 1, 1, 2, 2, 2, 3, 3, 3, 3, 4)
+# number of directions the arrows of the atlas point in
+ARROW_ANGLES = 72
+# colour no arrow is drawn in, marking the transparent part of sprites
+ARROW_COLORKEY = (255, 0, 255)
+
+# potentials the heatmap's colours are pinned to: the pot_min and pot_max
+# of get_potential_color at the ends, and the POTENTIAL_LEVELS between
+# them, each halfway between the colours of the bands it separates
+HEATMAP_LEVELS = (-9*10**9,) + POTENTIAL_LEVELS + (9*10**9,)
+HEATMAP_POSITIONS = np.concatenate(([0], np.arange(len(POTENTIAL_LEVELS)) + 0.5, [len(POTENTIAL_LEVELS)]))
+# lookup table of the heatmap, running smoothly through the colours of
+# the potential bands from gradient_10 to gradient_60
+heatmap_lut = np.stack([np.interp(np.linspace(0, len(POTENTIAL_COLORS)-1, HEATMAP_LUT_SIZE), np.arange(len(POTENTIAL_COLORS)), channel)
+                        for channel in np.array(POTENTIAL_COLORS).T], axis=1).round().astype(np.uint8)
+
+# sprites of the arrows drawn so far, by colour band, length class,
+# direction (-1 for no field at all) and scale, with the distance from
+# their top left corner to the centre of the arrow
+arrow_sprites = {}
+
+# returns the colour of the potential gradient for a potential value:
+# that of the band between the POTENTIAL_LEVELS it falls in, a band
+# taking in its lower level, as draw_field_arrows picks it for a whole
+# grid. the potential is compared as it is, so a float needs no
+# rounding to an int first
+def get_potential_color(potential):
+    return POTENTIAL_COLORS[bisect_right(POTENTIAL_LEVELS, potential)]
+
+# draws an arrow head of line width w pointing along field_dir at arrow_point,
+# enlarged by scale
+def draw_arrow_head(surface, color, arrow_point, field_dir, w, scale=1):
+    size = (w+2)*scale
+    triangle=(arrow_point, 
+              (arrow_point[0]+size*(field_dir[1]-field_dir[0]), arrow_point[1]+size*(-field_dir[1]-field_dir[0])), 
+              (arrow_point[0]+size*(-field_dir[1]-field_dir[0]), arrow_point[1]+size*(-field_dir[1]+field_dir[0])))
+    pygame.draw.polygon(surface, color, triangle)
+
+# takes a surface, potential and field value, and draws an electric field
+# arrow of required magnitude, with colour gradient as per potntial,
+# with arrow tail at start OR arrow head at end OR arrow centred at centre;
+# the arrow is enlarged by scale for surfaces bigger than the play area
+def draw_field_arrow(surface, potential, field, centre_arrow=True, start=[-1, -1], end=[-1, -1], centre=[-1, -1], scale=1):
+    r,g,b = get_potential_color(potential)
+
+    field_mag = field[0]
+    field_dir = field[1]
+
+    # set arrow length and line width as per strength, from the same
+    # table as the arrows of draw_field_arrows
+    length_class = int(np.searchsorted(ARROW_FIELD_EDGES, abs(field_mag), side='right'))
+    length = ARROW_LENGTHS[length_class]*scale
+    w = ARROW_WIDTHS[length_class]
+    
+    if start != [-1, -1]:
+        start_point = start
+        if field_mag == 0:
+            end_point = start
+        else:
+            end_x = start[0] + (16*scale)*field_dir[0]
+            end_y = start[1] + (16*scale)*field_dir[1]
+            end_point = [round(end_x), round(end_y)]
+    elif end != [-1, -1]:
+        end_point = end
+        if field_mag == 0:
+            start_point = end
+        else:
+            start_x = end[0] - (16*scale)*field_dir[0]
+            start_y = end[1] - (16*scale)*field_dir[1]
+            start_point = [round(start_x), round(start_y)]
+    elif centre != [-1, -1]:
+        start_x = centre[0] - (length/2)*field_dir[0]
+        start_y = centre[1] - (length/2)*field_dir[1]
+        start_point = [start_x, start_y]
+        if field_mag == 0:
+            end_point = centre
+        else:
+            end_x = centre[0] + (length/2)*field_dir[0]
+            end_y = centre[1] + (length/2)*field_dir[1]
+            end_point = [end_x, end_y]
+    else:
+        raise ValueError("draw_field_arrow needs a start, an end or a centre")
+    
+    if centre_arrow:
+        arrow_point = [(start_point[0]+end_point[0])/2, (start_point[1]+end_point[1])/2]
+    else:
+        arrow_point = end_point
+    
+    pygame.draw.line(surface, (r,g,b), start_point, end_point, width=round(w*scale))
+    draw_arrow_head(surface, (r,g,b), arrow_point, field_dir, w, scale)
+    
+    return start_point, end_point
+
+# draws the field lines of the charges in charge_list on surface, each
+# coloured as per the potential at its middle, with an arrow head there;
+# the lines are traced in play area coordinates and enlarged by scale,
+# unless already traced ones are given as field_lines. grid_field is the
+# field induced on conductors, of painted charge and of the extended
+# sources, if any, and sources those sources, which lines leave and end on
+def draw_field_lines(surface, charge_list, scale=1, field_lines=None, grid_field=None, sources=()):
+    if field_lines is None:
+        field_lines = trace_field_lines(charge_list, surface.get_width()/scale, surface.get_height()/scale, grid_field=grid_field, sources=sources)
+    field_lines = [line for line in field_lines if len(line) > 2]
+    middles = [line[len(line)//2] for line in field_lines]
+    middle_x, middle_y = np.array([middle[0] for middle in middles], dtype=float), np.array([middle[1] for middle in middles], dtype=float)
+    potentials = calc_potential_grid(charge_list, middle_x, middle_y)
+    if grid_field is not None:
+        potentials = grid_field.add_to_potential(potentials, middle_x, middle_y)
+    for line, middle, potential in zip(field_lines, middles, potentials.tolist()):
+        color = get_potential_color(potential)
+        if scale != 1:
+            line = [[point[0]*scale, point[1]*scale] for point in line]
+            middle = line[len(line)//2]
+        pygame.draw.lines(surface, color, False, line, width=round(2*scale))
+        before = line[len(line)//2 - 1]
+        after = line[len(line)//2 + 1]
+        direction = [after[0]-before[0], after[1]-before[1]]
+        direction_mag = (direction[0]**2 + direction[1]**2)**(1/2)
+        if direction_mag > 0:
+            draw_arrow_head(surface, color, middle, [direction[0]/direction_mag, direction[1]/direction_mag], 2, scale)
+
+# draws equipotential lines, as returned by find_equipotentials, on
+# surface, each in the colour of the potential band it starts
+def draw_equipotentials(surface, equipotentials, scale=1):
+    for level, lines in equipotentials:
+        color = get_potential_color(level)
+        for line in lines:
+            if scale != 1:
+                line = [[point[0]*scale, point[1]*scale] for point in line]
+            pygame.draw.lines(surface, color, False, line, width=round(2*scale))
+
+# returns the sprite of an arrow like draw_field_arrow draws, in colour
+# band color_class, of length class length_class and pointing at angle
+# angle_class*360/ARROW_ANGLES degrees, and the offset of its centre;
+# each sprite is drawn the first time it is asked for
+def get_arrow_sprite(color_class, length_class, angle_class, scale=1):
+    key = (color_class, length_class, angle_class, scale)
+    if key not in arrow_sprites:
+        color = POTENTIAL_COLORS[color_class]
+        length = ARROW_LENGTHS[length_class]*scale
+        w = ARROW_WIDTHS[length_class]
+        # the arrow head reaches at most (w+2)*scale*sqrt(2) past the tip
+        half = ceil(length/2 + 1.5*(w+2)*scale + w*scale) + 1
+        sprite = pygame.surface.Surface((2*half, 2*half))
+        sprite.fill(ARROW_COLORKEY)
+        sprite.set_colorkey(ARROW_COLORKEY, pygame.RLEACCEL)
+        if angle_class < 0:
+            field_dir = [0, 0]
+        else:
+            field_dir = [cos(angle_class*2*pi/ARROW_ANGLES), sin(angle_class*2*pi/ARROW_ANGLES)]
+        start_point = [half - (length/2)*field_dir[0], half - (length/2)*field_dir[1]]
+        end_point = [half + (length/2)*field_dir[0], half + (length/2)*field_dir[1]]
+        pygame.draw.line(sprite, color, start_point, end_point, width=round(w*scale))
+        draw_arrow_head(sprite, color, end_point, field_dir, w, scale)
+        arrow_sprites[key] = sprite, half
+    return arrow_sprites[key]
+
+# returns how quickly the field changes around each point of a grid of
+# field values whose last two axes run along x and y: the most it turns
+# or changes in strength towards a neighbouring point, in units of
+# REFINE_ANGLE and REFINE_RATIO, so that cells above 1 are to be split.
+# turns between arrows too weak to be drawn are not counted
+def arrow_roughness(field_x, field_y, field_mag):
+    visible = field_mag >= ARROW_FIELD_EDGES[0]
+    strength = np.log(np.maximum(field_mag, ARROW_FIELD_EDGES[0]))
+    roughness = np.zeros(field_mag.shape)
+    for axis in (-2, -1):
+        lower = [slice(None)]*field_mag.ndim
+        upper = [slice(None)]*field_mag.ndim
+        lower[axis] = slice(None, -1)
+        upper[axis] = slice(1, None)
+        lower, upper = tuple(lower), tuple(upper)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            turn_cos = (field_x[lower]*field_x[upper] + field_y[lower]*field_y[upper])/(field_mag[lower]*field_mag[upper])
+            turn = np.where(visible[lower] & visible[upper], np.arccos(np.clip(turn_cos, -1, 1)), 0)
+        change = np.maximum(turn/REFINE_ANGLE, np.abs(strength[upper] - strength[lower])/log(REFINE_RATIO))
+        roughness[lower] = np.maximum(roughness[lower], change)
+        roughness[upper] = np.maximum(roughness[upper], change)
+    return roughness
+
+# returns the arrows of the discrete mode arrow grid, refined where the
+# field of charge_list changes quickly, as (field_grids, xs, ys, depth):
+# the potential and field at each arrow like calc_grid returns them, its
+# position and how many times its cell was split. field_grids are those
+# of the unrefined grid. with a budget, splitting stops once that many
+# seconds have passed, leaving the roughest cells split. the field of
+# grid_field, if given, is added to that of the new arrows, whose own is
+# summed in precision, one of the PRECISIONS of electrostatics.py
+def refine_arrow_grid(charge_list, field_grids, budget=None, max_depth=MAX_ARROW_DEPTH, grid_field=None, precision="exact"):
+    start = perf_counter()
+    charges = prepare_charges(charge_list)
+    # cells are kept as arrays of x, y and the four field grids; those of
+    # each depth are ravelled once their roughness is known
+    cells = [arrow_grid_x, arrow_grid_y] + list(field_grids)
+    arrows = []
+    for depth in range(max_depth + 1):
+        roughness = arrow_roughness(*cells[3:]).ravel()
+        cells = [array.ravel() for array in cells]
+        if depth == max_depth:
+            arrows.append((cells, depth))
+            break
+        split = roughness > 1
+        arrows.append(([array[~split] for array in cells], depth))
+        order = np.argsort(-roughness[split], kind='stable')
+        candidates = [array[split][order] for array in cells]
+
+        # split the candidates in batches, each twice as big as the last,
+        # for as long as the time each cell takes says there is time left
+        offset = ARROW_SPACING/2**(depth+2)
+        offset_x, offset_y = np.meshgrid([-offset, offset], [-offset, offset], indexing='ij')
+        children = []
+        done = 0
+        batch = REFINE_BATCH_CELLS
+        cell_time = None
+        while done < len(candidates[0]):
+            if budget is not None:
+                time_left = budget - (perf_counter() - start)
+                if cell_time is not None:
+                    batch = min(batch, int(time_left/cell_time))
+                if time_left <= 0 or batch == 0:
+                    break
+            stop = min(done + batch, len(candidates[0]))
+            batch_start = perf_counter()
+            child_x = candidates[0][done:stop, None, None] + offset_x
+            child_y = candidates[1][done:stop, None, None] + offset_y
+            child_grids = calc_grid(charges, child_x, child_y, precision=precision)
+            if grid_field is not None:
+                child_grids = grid_field.add_to_grid(child_grids, child_x, child_y)
+            children.append([child_x, child_y] + list(child_grids))
+            cell_time = (perf_counter() - batch_start)/(stop - done)
+            done = stop
+            batch *= 2
+        # cells there was no time to split keep their one arrow
+        arrows.append(([array[done:] for array in candidates], depth))
+        if not children:
+            break
+        cells = [np.concatenate(arrays) for arrays in zip(*children)]
+
+    xs, ys, potential_grid, field_x, field_y, field_mag = (np.concatenate(arrays) for arrays in zip(*[cells for cells, depth in arrows]))
+    depths = np.concatenate([np.full(len(cells[0]), depth) for cells, depth in arrows])
+    return (potential_grid, field_x, field_y, field_mag), xs, ys, depths
+
+# returns the colour band, length class and direction class of the
+# arrows of field_grids, as returned by calc_grid, as flat arrays of the
+# indices of POTENTIAL_COLORS, ARROW_LENGTHS and ARROW_ANGLES they are
+# drawn with (a direction of -1 where there is no field). arrows of
+# cells split depth times are kept short enough not to reach past their
+# cell
+def arrow_classes(field_grids, depth=0):
+    potential_grid, field_x, field_y, field_mag = field_grids
+    color_class = np.digitize(potential_grid.ravel(), POTENTIAL_LEVELS)
+    length_class = np.digitize(field_mag.ravel(), ARROW_FIELD_EDGES)
+    spacing = ARROW_SPACING/2**np.ravel(depth)
+    length_class = np.where(spacing < ARROW_SPACING, np.minimum(length_class, np.searchsorted(ARROW_LENGTHS, spacing, side='right') - 1), length_class)
+    angle_class = np.round(np.arctan2(field_y.ravel(), field_x.ravel())*ARROW_ANGLES/(2*pi)).astype(int) % ARROW_ANGLES
+    angle_class[field_mag.ravel() == 0] = -1
+    return color_class, length_class, angle_class
+
+# draws an arrow at each point of the discrete mode arrow grid on surface,
+# using the potential and field grids returned by calc_grid, or at the
+# points xs, ys if given, such as those of refine_arrow_grid. the arrows
+# are classified all at once by arrow_classes and blitted from the
+# sprite atlas in one go, with their directions rounded to the nearest
+# of ARROW_ANGLES
+def draw_field_arrows(surface, field_grids, scale=1, xs=arrow_grid_x, ys=arrow_grid_y, depth=0):
+    color_class, length_class, angle_class = arrow_classes(field_grids, depth)
+    sprites = [get_arrow_sprite(*classes, scale) for classes in zip(color_class.tolist(), length_class.tolist(), angle_class.tolist())]
+    centres_x = np.round(np.ravel(xs)*scale).astype(int).tolist()
+    centres_y = np.round(np.ravel(ys)*scale).astype(int).tolist()
+    surface.blits([(sprite, (x - half, y - half)) for (sprite, half), x, y in zip(sprites, centres_x, centres_y)], doreturn=False)
+
+# returns the x and y coordinates of the points to sample the potential
+# at for a heatmap over an area of the given width and height, one in
+# the middle of every step by step square
+def heatmap_grid(width, height, step=HEATMAP_STEP):
+    return np.meshgrid((np.arange(ceil(width/step)) + 0.5)*step, (np.arange(ceil(height/step)) + 0.5)*step, indexing='ij')
+
+heatmap_grid_x, heatmap_grid_y = heatmap_grid(SCENE_WIDTH, SCENE_HEIGHT)
+
+# returns the colours of a potential grid as an array of rgb values of
+# the same shape, looked up in heatmap_lut
+def heatmap_colors(potential_grid):
+    positions = np.interp(potential_grid, HEATMAP_LEVELS, HEATMAP_POSITIONS)
+    return heatmap_lut[(positions*((HEATMAP_LUT_SIZE-1)/len(POTENTIAL_LEVELS)) + 0.5).astype(np.intp)]
+
+# covers surface with the heatmap of a potential grid sampled at the
+# points of heatmap_grid, scaled up smoothly from one pixel per sample,
+# at the given opacity
+def draw_heatmap(surface, potential_grid, alpha=255):
+    samples = pygame.surface.Surface(potential_grid.shape, depth=32)
+    pygame.surfarray.blit_array(samples, heatmap_colors(potential_grid))
+    heatmap_surface = pygame.transform.smoothscale(samples, surface.get_size())
+    heatmap_surface.set_alpha(alpha)
+    surface.blit(heatmap_surface, (0, 0))
+
+# draws the heatmap of a potential grid on surface as set by heatmap, one
+# of HEATMAP_MODES: faded into the background under the field, or on its
+# own; with the heatmap off, the plain background is drawn
+def draw_background(surface, potential_grid, heatmap):
+    surface.fill(dark_lavender)
+    if heatmap == "underlay":
+        draw_heatmap(surface, potential_grid, HEATMAP_UNDERLAY_ALPHA)
+    elif heatmap == "only":
+        draw_heatmap(surface, potential_grid)
+
+# painted charge is tinted light red where positive and blue where
+# negative, more strongly the more charge a point of its grid holds, up
+# to DENSITY_ALPHA at DENSITY_FULL_CHARGE coulombs
+DENSITY_ALPHA = 160
+DENSITY_FULL_CHARGE = 0.005
+
+# draws the charge grid of a ChargeDensity, spacing apart, on surface as
+# a tint over what is there, each point covering its square, enlarged by
+# scale
+def draw_density(surface, charge, spacing=DENSITY_STEP, scale=1):
+    samples = pygame.surface.Surface(charge.shape, pygame.SRCALPHA)
+    colors = pygame.surfarray.pixels3d(samples)
+    colors[:] = np.where((charge > 0)[..., None], light_red, gradient_15)
+    alpha = pygame.surfarray.pixels_alpha(samples)
+    alpha[:] = np.minimum(np.abs(charge)/DENSITY_FULL_CHARGE, 1)*DENSITY_ALPHA
+    del colors, alpha
+    step = spacing*scale
+    tint = pygame.transform.smoothscale(samples, (round(charge.shape[0]*step), round(charge.shape[1]*step)))
+    surface.blit(tint, (round(-step/2), round(-step/2)))
+
+# extended sources are drawn SOURCE_WIDTH pixels wide, light red if
+# positive and blue if negative, like painted charge; arcs and rings as
+# lines between points every ARC_DRAW_STEP pixels along them
+SOURCE_WIDTH = 4
+ARC_DRAW_STEP = 4
+
+# draws extended sources, as described at SOURCE_SHAPES in
+# electrostatics.py, on surface, enlarged by scale
+def draw_sources(surface, sources, scale=1):
+    width = max(1, round(SOURCE_WIDTH*scale))
+    for source in sources:
+        color = light_red if source["q"] >= 0 else gradient_15
+        if source["shape"] == "line":
+            pygame.draw.line(surface, color, (source["x1"]*scale, source["y1"]*scale), (source["x2"]*scale, source["y2"]*scale), width)
+            continue
+        if source["shape"] == "ring":
+            start, end = 0, 2*pi
+        else:
+            start, end = np.radians(source["start"]), np.radians(source["end"])
+        angles = np.linspace(start, end, max(2, ceil(abs(end - start)*source["radius"]/ARC_DRAW_STEP) + 1))
+        points = np.stack((source["x"] + source["radius"]*np.cos(angles), source["y"] + source["radius"]*np.sin(angles)), axis=1)*scale
+        pygame.draw.lines(surface, color, source["shape"] == "ring", points.tolist(), width)
+
+# returns the images of positive and negative charges, from the atlas of
+# the user interface's images; they are not converted to the display
+# format, so no display needs to be open
+def load_charge_images():
+    images = load_atlas(convert=False)
+    return images["plus"], images["minus"]
+
+# draws the charges in charge_list on surface with the images plus_q and
+# minus_q, enlarged by scale
+def draw_charges(surface, charge_list, plus_q, minus_q, scale=1):
+    if scale != 1:
+        plus_q = pygame.transform.smoothscale(plus_q, (round(plus_q.get_width()*scale), round(plus_q.get_height()*scale)))
+        minus_q = pygame.transform.smoothscale(minus_q, (round(minus_q.get_width()*scale), round(minus_q.get_height()*scale)))
+    q, charge_x, charge_y = charge_arrays(charge_list)
+    for charge_q, x, y in zip(q.tolist(), charge_x.tolist(), charge_y.tolist()):
+        if charge_q > 0:
+            surface.blit(plus_q, [x*scale-plus_q.get_width()/2, y*scale-plus_q.get_height()/2])
+        elif charge_q < 0:
+            surface.blit(minus_q, [x*scale-minus_q.get_width()/2, y*scale-minus_q.get_height()/2])
+
+# draws conductors, as in the "conductors" of a scene, on surface: each
+# filled in grey and outlined in the colour of the potential it is held
+# at, enlarged by scale
+def draw_conductors(surface, conductors, scale=1):
+    for conductor in conductors:
+        color = get_potential_color(conductor["potential"])
+        if conductor["shape"] == "rect":
+            rect = pygame.Rect(round(conductor["x"]*scale), round(conductor["y"]*scale), max(1, round(conductor["width"]*scale)), max(1, round(conductor["height"]*scale)))
+            pygame.draw.rect(surface, light_grey, rect)
+            pygame.draw.rect(surface, color, rect, width=max(1, round(2*scale)))
+        else:
+            centre = (round(conductor["x"]*scale), round(conductor["y"]*scale))
+            radius = max(1, round(conductor["radius"]*scale))
+            pygame.draw.circle(surface, light_grey, centre, radius)
+            pygame.draw.circle(surface, color, centre, radius, width=max(1, round(2*scale)))
+
+# draws a whole scene on surface: the potential heatmap as set by
+# heatmap, one of HEATMAP_MODES, the field of the charges in charge_list
+# as arrows or field lines, equipotential lines if asked for, and the
+# charges themselves. the play area is scaled up to fill surface, so the
+# same scene can be drawn at any resolution; the heatmap is sampled
+# every HEATMAP_STEP pixels of surface. conductors, and the edges of
+# the play area unless boundary is open, are held at their potentials,
+# solved for with conductor_solver, or a new ConductorSolver; giving the
+# same one for every frame of an animation warm starts each frame from
+# the last. density is the painted charge of the scene, as (q, x, y)
+# arrays, if any, and sources its extended sources. the potential of the
+# charges at the heatmap's points, of which there are many on a large
+# surface, is worked out by heatmap_calc, which takes the same arguments
+# as calc_potential_grid, such as tiled_potential_grid of batch.py
+def render_scene(surface, charge_list, is_continuous_mode=False, show_equipotentials=False, charge_images=None, heatmap="off",
+                 conductors=(), boundary=OPEN_BOUNDARY, conductor_solver=None, density=None, sources=(), heatmap_calc=calc_potential_grid):
+    scale = min(surface.get_width()/SCENE_WIDTH, surface.get_height()/SCENE_HEIGHT)
+    if conductor_solver is None:
+        conductor_solver = ConductorSolver(SCENE_WIDTH, SCENE_HEIGHT)
+    if density is not None:
+        density = ChargeDensity(SCENE_WIDTH, SCENE_HEIGHT, points=density)
+    painted = None if density is None else density_field(density.charge, density.spacing)
+    external_field = combine_grid_fields(painted, SourceField(sources) if sources else None)
+    grid_field = combine_grid_fields(external_field, conductor_solver.solve(charge_list, conductors, boundary, external_field))
+    potential_grid = None
+    if heatmap != "off":
+        xs, ys = heatmap_grid(surface.get_width()/scale, surface.get_height()/scale, HEATMAP_STEP/scale)
+        potential_grid = heatmap_calc(charge_list, xs, ys)
+        if grid_field is not None:
+            potential_grid = grid_field.add_to_potential(potential_grid, xs, ys)
+    draw_background(surface, potential_grid, heatmap)
+    if painted is not None:
+        draw_density(surface, density.charge, density.spacing, scale)
+    if heatmap != "only":
+        if is_continuous_mode:
+            draw_field_lines(surface, charge_list, scale, grid_field=grid_field, sources=sources)
+        else:
+            field_grids = calc_grid(charge_list, arrow_grid_x, arrow_grid_y)
+            if grid_field is not None:
+                field_grids = grid_field.add_to_grid(field_grids, arrow_grid_x, arrow_grid_y)
+            field_grids, xs, ys, depth = refine_arrow_grid(charge_list, field_grids, grid_field=grid_field)
+            draw_field_arrows(surface, field_grids, scale, xs, ys, depth)
+    if show_equipotentials:
+        potential_grid = calc_potential_grid(charge_list, contour_grid_x, contour_grid_y)
+        if grid_field is not None:
+            potential_grid = grid_field.add_to_potential(potential_grid, contour_grid_x, contour_grid_y)
+        draw_equipotentials(surface, find_equipotentials(potential_grid), scale)
+    draw_conductors(surface, conductors, scale)
+    draw_sources(surface, sources, scale)
+    if charge_images is None:
+        charge_images = load_charge_images()
+    draw_charges(surface, charge_list, *charge_images, scale=scale)
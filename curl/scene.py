@@ -0,0 +1,340 @@
+# scene.py - reading and writing scenes of charges to files, as
+# readable JSON or as compact NumPy .npz archives
+
+# Copyright (C) 2025 Deepto Debnath, Subhradip Mondal
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import json
+import math
+import numpy as np
+from .poisson import CONDUCTOR_SHAPES, OPEN_BOUNDARY
+from .electrostatics import SOURCE_SHAPES
+
+# a scene is a dict with
+#   "charges": (q, x, y) arrays of the charges, which the grid functions
+#              in electrostatics.py take in place of a charge_list
+#   "names": the name of each charge
+#   "is_continuous_mode", "show_equipotentials": the display mode flags
+#   "heatmap": how the potential heatmap is shown, "off", "underlay" or
+#              "only" (see HEATMAP_MODES in render.py)
+#   "trajectories": a dict from the index of each charge that moves to
+#                   its list of [x, y] points, one per frame of an animation
+#   "conductors": a list of conductors held at fixed potentials, each a
+#                 dict as described at CONDUCTOR_SHAPES in poisson.py
+#   "boundary": the potential the edges of the play area are held at, in
+#               volts, or "open"
+#   "density": charge painted over the play area, as (q, x, y) arrays of
+#              the points of the grid of density.py that hold any, or None
+#   "sources": a list of extended sources of charge, lines, arcs and
+#              rings, each a dict as described at SOURCE_SHAPES in
+#              electrostatics.py
+def make_scene(charge_list, is_continuous_mode=False, show_equipotentials=False, trajectories=None, heatmap="off", conductors=None, boundary=OPEN_BOUNDARY,
+               density=None, sources=None):
+    q = np.array([charge[0] for charge in charge_list], dtype=float)
+    x = np.array([charge[1] for charge in charge_list], dtype=float)
+    y = np.array([charge[2] for charge in charge_list], dtype=float)
+    if trajectories is None:
+        trajectories = {}
+    if conductors is None:
+        conductors = []
+    if sources is None:
+        sources = []
+    return {"charges": (q, x, y),
+            "names": [charge[3] for charge in charge_list],
+            "is_continuous_mode": is_continuous_mode,
+            "show_equipotentials": show_equipotentials,
+            "heatmap": heatmap,
+            "trajectories": trajectories,
+            "conductors": conductors,
+            "boundary": boundary,
+            "density": density,
+            "sources": sources}
+
+# returns value as a float, as float() does; raises TypeError if it is
+# null and ValueError if it is not finite, like JSON's NaN and Infinity,
+# which would spread through the sums of every grid
+def read_number(value):
+    number = float(value)
+    if not math.isfinite(number):
+        raise ValueError("not finite: " + repr(value))
+    return number
+
+# returns value, what a scene file at path holds under key, which must
+# be a list; raises ValueError naming key and path if it is not one
+def read_list(value, key, path):
+    if not isinstance(value, list):
+        raise ValueError("\"" + key + "\" in " + path + " is not a list")
+    return value
+
+# returns a trajectory read from points, a list of [x, y] points with
+# every number as a float; raises ValueError naming the charge it belongs
+# to and path if it is not one
+def read_trajectory(points, i, path):
+    try:
+        if not isinstance(points, list) or not all(isinstance(point, list) and len(point) == 2 for point in points):
+            raise ValueError
+        return [[read_number(x), read_number(y)] for x, y in points]
+    except (TypeError, ValueError):
+        raise ValueError("trajectory of charge " + str(i+1) + " in " + path + " is not a list of [x, y] points") from None
+
+# returns arrays, the arrays of one kind of thing in a .npz archive at
+# path, as float arrays; raises ValueError naming what they hold if they
+# differ in length or hold anything but finite numbers
+def read_npz_arrays(arrays, what, path):
+    try:
+        arrays = tuple(np.asarray(array, dtype=float) for array in arrays)
+    except (TypeError, ValueError):
+        raise ValueError(path + " is not a scene file, its " + what + " are not numbers") from None
+    if any(array.shape != arrays[0].shape for array in arrays):
+        raise ValueError(path + " is not a scene file, the arrays of its " + what + " differ in length")
+    if not all(np.isfinite(array).all() for array in arrays):
+        raise ValueError(path + " is not a scene file, its " + what + " are not all finite")
+    return arrays
+
+# returns a conductor read from data, a dict as described at
+# CONDUCTOR_SHAPES, with every number as a float; raises ValueError
+# naming where in path it came from if it is not one
+def read_conductor(data, i, path):
+    shape = data.get("shape") if isinstance(data, dict) else None
+    if shape not in CONDUCTOR_SHAPES:
+        raise ValueError("conductor " + str(i+1) + " in " + path + " has unknown shape \"" + str(shape) + "\"")
+    conductor = {"shape": shape}
+    for key in ("potential",) + CONDUCTOR_SHAPES[shape]:
+        try:
+            conductor[key] = read_number(data.get("potential", 0) if key == "potential" else data[key])
+        except KeyError as error:
+            raise ValueError("conductor " + str(i+1) + " in " + path + " has no " + str(error)) from None
+        except (TypeError, ValueError):
+            raise ValueError("conductor " + str(i+1) + " in " + path + " has no number for \"" + key + "\"") from None
+    return conductor
+
+# returns an extended source read from data, a dict as described at
+# SOURCE_SHAPES, with every number as a float; raises ValueError naming
+# where in path it came from if it is not one
+def read_source(data, i, path):
+    shape = data.get("shape") if isinstance(data, dict) else None
+    if shape not in SOURCE_SHAPES:
+        raise ValueError("source " + str(i+1) + " in " + path + " has unknown shape \"" + str(shape) + "\"")
+    source = {"shape": shape, "name": str(data.get("name", shape.capitalize()+str(i+1)))}
+    for key in ("q",) + SOURCE_SHAPES[shape]:
+        try:
+            source[key] = read_number(data[key])
+        except KeyError as error:
+            raise ValueError("source " + str(i+1) + " in " + path + " has no " + str(error)) from None
+        except (TypeError, ValueError):
+            raise ValueError("source " + str(i+1) + " in " + path + " has no number for \"" + key + "\"") from None
+    return source
+
+# returns the boundary potential read from a scene file, a number of
+# volts or "open"
+def read_boundary(boundary, path):
+    if boundary == OPEN_BOUNDARY:
+        return boundary
+    try:
+        return read_number(boundary)
+    except (TypeError, ValueError):
+        raise ValueError("boundary must be a number of volts or \"open\", not \"" + str(boundary) + "\" in " + path) from None
+
+# returns the charges of a scene as a charge_list of [q, x, y, name];
+# positions are rounded to whole pixels if round_positions is set
+def scene_charge_list(scene, round_positions=False):
+    q, x, y = (array.tolist() for array in scene["charges"])
+    if round_positions:
+        x = [round(value) for value in x]
+        y = [round(value) for value in y]
+    return [list(charge) for charge in zip(q, x, y, scene["names"])]
+
+# reads a scene from a JSON file of the form
+#   {"mode": "discrete" or "continuous", "equipotentials": false,
+#    "heatmap": "off", "underlay" or "only",
+#    "charges": [{"name": "Charge1", "q": 1.0, "x": 500, "y": 300,
+#                 "trajectory": [[500, 300], [505, 300], ...]}, ...],
+#    "conductors": [{"shape": "rect", "x": 100, "y": 100, "width": 10,
+#                    "height": 400, "potential": 0}, ...],
+#    "boundary": "open" or a number of volts,
+#    "density": [[q, x, y], ...],
+#    "sources": [{"shape": "line", "name": "Plate1", "q": 1.0, "x1": 400,
+#                 "y1": 200, "x2": 400, "y2": 400}, ...]}
+# where everything but the charges' q, x and y may be left out
+def read_scene_json(path):
+    with open(path) as scene_file:
+        return scene_from_data(json.load(scene_file), path)
+
+# returns the scene held in data, the contents of a JSON scene file as
+# read by read_scene_json; raises ValueError naming path if it is not
+# one
+def scene_from_data(data, path):
+    if not isinstance(data, dict):
+        raise ValueError(path + " does not hold a scene")
+    if data.get("mode", "discrete") not in ("discrete", "continuous"):
+        raise ValueError("unknown mode \"" + str(data["mode"]) + "\" in " + path)
+    if data.get("heatmap", "off") not in ("off", "underlay", "only"):
+        raise ValueError("unknown heatmap \"" + str(data["heatmap"]) + "\" in " + path)
+
+    charge_list = []
+    trajectories = {}
+    for i, charge in enumerate(read_list(data.get("charges", []), "charges", path)):
+        try:
+            charge_list.append([read_number(charge["q"]), read_number(charge["x"]), read_number(charge["y"]), str(charge.get("name", "Charge"+str(i+1)))])
+        except KeyError as error:
+            raise ValueError("charge " + str(i+1) + " in " + path + " has no " + str(error)) from None
+        except (TypeError, ValueError):
+            raise ValueError("charge " + str(i+1) + " in " + path + " does not have a number for each of q, x and y") from None
+        if charge.get("trajectory"):
+            trajectories[i] = read_trajectory(charge["trajectory"], i, path)
+
+    conductors = [read_conductor(conductor, i, path) for i, conductor in enumerate(read_list(data.get("conductors", []), "conductors", path))]
+    density = None
+    if data.get("density"):
+        try:
+            density = tuple(np.array(data["density"], dtype=float).reshape(-1, 3).T)
+        except (TypeError, ValueError):
+            raise ValueError("density in " + path + " is not a list of [q, x, y] points") from None
+        if not all(np.isfinite(array).all() for array in density):
+            raise ValueError("density in " + path + " has points that are not finite numbers")
+    sources = [read_source(source, i, path) for i, source in enumerate(read_list(data.get("sources", []), "sources", path))]
+    return make_scene(charge_list, data.get("mode", "discrete") == "continuous",
+                      bool(data.get("equipotentials", False)), trajectories, data.get("heatmap", "off"),
+                      conductors, read_boundary(data.get("boundary", OPEN_BOUNDARY), path), density, sources)
+
+# writes a scene to a JSON file readable by read_scene_json
+def write_scene_json(path, scene):
+    with open(path, "w") as scene_file:
+        json.dump(scene_data(scene), scene_file, indent=1)
+
+# returns the contents of a JSON scene file holding scene, for
+# scene_from_data to read back
+def scene_data(scene):
+    charges = []
+    for i, charge in enumerate(scene_charge_list(scene)):
+        charge_data = {"name": charge[3], "q": charge[0], "x": charge[1], "y": charge[2]}
+        if i in scene["trajectories"]:
+            charge_data["trajectory"] = scene["trajectories"][i]
+        charges.append(charge_data)
+    data = {"mode": "continuous" if scene["is_continuous_mode"] else "discrete",
+            "equipotentials": scene["show_equipotentials"],
+            "heatmap": scene["heatmap"],
+            "charges": charges}
+    if scene["conductors"]:
+        data["conductors"] = scene["conductors"]
+    if scene["boundary"] != OPEN_BOUNDARY:
+        data["boundary"] = scene["boundary"]
+    if scene["density"] is not None:
+        data["density"] = np.stack(scene["density"], axis=1).tolist()
+    if scene["sources"]:
+        data["sources"] = scene["sources"]
+    return data
+
+# reads a scene from a .npz archive written by write_scene_npz; the
+# charges come straight out of the archive's arrays, so even scenes of
+# 100,000 charges load in milliseconds
+def read_scene_npz(path):
+    with np.load(path) as data:
+        try:
+            q, x, y = data["q"], data["x"], data["y"]
+            names = data["names"].tolist()
+            is_continuous_mode = bool(data["is_continuous_mode"])
+            show_equipotentials = bool(data["show_equipotentials"])
+            # scenes saved before the heatmap, the conductors, painted
+            # charge or extended sources have none
+            heatmap = str(data["heatmap"]) if "heatmap" in data.files else "off"
+            conductors = read_list(json.loads(str(data["conductors"])) if "conductors" in data.files else [], "conductors", path)
+            sources = read_list(json.loads(str(data["sources"])) if "sources" in data.files else [], "sources", path)
+            boundary = read_boundary(data["boundary"].item(), path) if "boundary" in data.files else OPEN_BOUNDARY
+            density = read_npz_arrays((data["density_q"], data["density_x"], data["density_y"]), "painted charge", path) if "density_q" in data.files and len(data["density_q"]) else None
+            trajectory_charges = data["trajectory_charges"].tolist()
+            trajectory_lengths = data["trajectory_lengths"].tolist()
+            trajectory_points = read_npz_arrays((data["trajectory_points"],), "trajectories", path)[0].reshape(-1, 2).tolist()
+        except KeyError as error:
+            raise ValueError(path + " is not a scene file, it has no " + str(error)) from None
+        except json.JSONDecodeError:
+            raise ValueError(path + " is not a scene file, its conductors or sources are not JSON") from None
+    q, x, y = read_npz_arrays((q, x, y), "charges", path)
+    if len(names) != len(q):
+        raise ValueError(path + " is not a scene file, its arrays differ in length")
+    if sum(trajectory_lengths) != len(trajectory_points) or not all(0 <= i < len(q) for i in trajectory_charges):
+        raise ValueError(path + " is not a scene file, its trajectories do not match its charges")
+
+    trajectories = {}
+    start = 0
+    for i, length in zip(trajectory_charges, trajectory_lengths):
+        trajectories[i] = trajectory_points[start:start+length]
+        start += length
+    return {"charges": (q, x, y),
+            "names": names,
+            "is_continuous_mode": is_continuous_mode,
+            "show_equipotentials": show_equipotentials,
+            "heatmap": heatmap,
+            "trajectories": trajectories,
+            "conductors": [read_conductor(conductor, i, path) for i, conductor in enumerate(conductors)],
+            "boundary": boundary,
+            "density": density,
+            "sources": [read_source(source, i, path) for i, source in enumerate(sources)]}
+
+# writes a scene to a .npz archive of flat arrays; the trajectories are
+# stored one after another, with the charge they belong to and the
+# number of points in each. the few conductors and extended sources are
+# kept as JSON text
+def write_scene_npz(path, scene):
+    q, x, y = scene["charges"]
+    density_q, density_x, density_y = scene["density"] if scene["density"] is not None else ((), (), ())
+    trajectory_charges = sorted(scene["trajectories"])
+    trajectory_points = [point for i in trajectory_charges for point in scene["trajectories"][i]]
+    with open(path, "wb") as scene_file:
+        np.savez(scene_file, q=q, x=x, y=y,
+                 names=np.array(scene["names"], dtype=str),
+                 is_continuous_mode=scene["is_continuous_mode"],
+                 show_equipotentials=scene["show_equipotentials"],
+                 heatmap=scene["heatmap"],
+                 conductors=json.dumps(scene["conductors"]),
+                 sources=json.dumps(scene["sources"]),
+                 boundary=scene["boundary"],
+                 density_x=np.array(density_x, dtype=float),
+                 density_y=np.array(density_y, dtype=float),
+                 density_q=np.array(density_q, dtype=float),
+                 trajectory_charges=np.array(trajectory_charges, dtype=int),
+                 trajectory_lengths=np.array([len(scene["trajectories"][i]) for i in trajectory_charges], dtype=int),
+                 trajectory_points=np.array(trajectory_points, dtype=float).reshape(-1, 2))
+
+# reads a scene from path, as a .npz archive if its name ends in .npz
+# and as JSON otherwise
+def read_scene(path):
+    if path.lower().endswith(".npz"):
+        return read_scene_npz(path)
+    return read_scene_json(path)
+
+# writes a scene to path, as a .npz archive if its name ends in .npz
+# and as JSON otherwise
+def write_scene(path, scene):
+    if path.lower().endswith(".npz"):
+        write_scene_npz(path, scene)
+    else:
+        write_scene_json(path, scene)
+
+# returns the charges of a scene file as the (q, x, y) arrays that the
+# grid functions in electrostatics.py take, e.g.
+#   calc_grid(read_charges("plate.npz"), xs, ys)
+# only the charge arrays are read from .npz archives
+def read_charges(path):
+    if path.lower().endswith(".npz"):
+        with np.load(path) as data:
+            try:
+                return data["q"].astype(float), data["x"].astype(float), data["y"].astype(float)
+            except KeyError as error:
+                raise ValueError(path + " is not a scene file, it has no " + str(error)) from None
+    return read_scene(path)["charges"]
+
+# returns the charge_list of every frame of a scene: frame i has each
+# charge at point i of its trajectory, or at the last point once its
+# trajectory has run out
+def scene_frames(scene):
+    charge_list = scene_charge_list(scene)
+    n_frames = max([len(trajectory) for trajectory in scene["trajectories"].values()] + [1])
+    frames = []
+    for frame in range(n_frames):
+        frame_charge_list = [list(charge) for charge in charge_list]
+        for i, trajectory in scene["trajectories"].items():
+            frame_charge_list[i][1:3] = trajectory[min(frame, len(trajectory)-1)]
+        frames.append(frame_charge_list)
+    return frames
@@ -0,0 +1,115 @@
+# worker.py - a thread that draws layers of play space in the background,
+# so that the window keeps responding while a heavy scene is computed
+
+# Copyright (C) 2025 Deepto Debnath, Subhradip Mondal
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import sys
+import threading
+import time
+import traceback
+import pygame
+
+# raised by a job function to give up on a job that has been superseded
+class JobCancelled(Exception):
+    pass
+
+# draws layers on its own thread with draw_job(surface, job, is_cancelled),
+# where job is whatever was given to submit and is_cancelled() tells
+# whether a newer job is waiting, in which case draw_job may raise
+# JobCancelled. whatever draw_job returns is handed over with its layer,
+# so that what it worked out for a layer reaches the caller with that
+# layer and never from a job that did not finish. only the latest submitted job is ever waiting; older ones
+# are dropped. layers are drawn into a back buffer while the caller shows
+# the front one, and the two swap each time take_result gives a new layer.
+# if done_event is given, an event of that type is posted whenever a new
+# layer is ready, so that a caller sleeping in pygame.event.wait wakes up
+class FieldWorker:
+    def __init__(self, size, draw_job, done_event=None):
+        self.size = size
+        self.draw_job = draw_job
+        self.done_event = done_event
+        self.condition = threading.Condition()
+        self.pending = None
+        self.result = None
+        self.spare_surfaces = [pygame.surface.Surface(size)]
+        self.busy = False
+        self.running = True
+        # time in seconds the last finished job took
+        self.job_time = 0.0
+        self.thread = threading.Thread(target=self._run, name="FieldWorker", daemon=True)
+        self.thread.start()
+
+    # queues job to be drawn, in place of any job still waiting
+    def submit(self, job):
+        with self.condition:
+            self.pending = job
+            self.condition.notify_all()
+
+    def is_cancelled(self):
+        return self.pending is not None
+
+    # returns the newest finished layer and what draw_job returned for it,
+    # or None if there is none since the last call; shown_surface, the
+    # layer shown until now, is taken back to draw the next one into
+    def take_result(self, shown_surface):
+        with self.condition:
+            if self.result is None:
+                return None
+            result = self.result
+            self.result = None
+            self.spare_surfaces.append(shown_surface)
+            return result
+
+    # blocks until every submitted job is finished (or timeout seconds
+    # have passed); returns whether they are
+    def wait(self, timeout=None):
+        with self.condition:
+            return self.condition.wait_for(lambda: self.pending is None and not self.busy, timeout)
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.pending = None
+            self.condition.notify_all()
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending is not None or not self.running)
+                if not self.running:
+                    return
+                job = self.pending
+                self.pending = None
+                self.busy = True
+                surface = self.spare_surfaces.pop() if self.spare_surfaces else pygame.surface.Surface(self.size)
+
+            # a job that fails is reported and given up on like a cancelled
+            # one, leaving the last layer shown; either way the worker is
+            # no longer busy afterwards, so wait() returns
+            start = time.perf_counter()
+            finished = False
+            try:
+                value = self.draw_job(surface, job, self.is_cancelled)
+                finished = True
+            except JobCancelled:
+                pass
+            except Exception:
+                print("Could not draw the field layer:", file=sys.stderr)
+                traceback.print_exc()
+            finally:
+                with self.condition:
+                    if finished:
+                        self.job_time = time.perf_counter() - start
+                        # a layer that was never taken is simply replaced
+                        if self.result is not None:
+                            self.spare_surfaces.append(self.result[0])
+                        self.result = (surface, value)
+                    else:
+                        self.spare_surfaces.append(surface)
+                    self.busy = False
+                    self.condition.notify_all()
+            if finished and self.done_event is not None:
+                pygame.event.post(pygame.event.Event(self.done_event))
@@ -0,0 +1,27 @@
+# test_fieldlines.py - tests of tracing field lines
+
+# Copyright (C) 2025 Deepto Debnath, Subhradip Mondal
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import numpy as np
+from curl.fieldlines import trace_field_lines, count_field_lines
+
+# a scene of extended sources and no point charges still gets the lines
+# of each source, which start on the sources and stay in the play area
+def test_trace_sources_only():
+    sources = [{"shape": "line", "name": "Plate1", "q": 2.0, "x1": 400.0, "y1": 150.0, "x2": 400.0, "y2": 450.0},
+               {"shape": "ring", "name": "Ring1", "q": -1.0, "x": 700.0, "y": 300.0, "radius": 60.0}]
+    lines = trace_field_lines([], 1000, 600, sources=sources)
+    assert len(lines) >= count_field_lines(2.0)
+    for line in lines:
+        points = np.array(line)
+        assert len(points) >= 2
+        assert np.isfinite(points).all()
+
+# lines of a dipole leave the positive charge and end on the negative one
+def test_trace_dipole():
+    lines = trace_field_lines([[1.0, 300, 300, "Charge1"], [-1.0, 700, 300, "Charge2"]], 1000, 600)
+    assert len(lines) > 0
+    ends = [line[-1] for line in lines]
+    assert any(np.hypot(x - 700, y - 300) < 1 for x, y in ends)
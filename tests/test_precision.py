@@ -0,0 +1,26 @@
+# test_precision.py - tests that the field summed in "fast" single
+# precision draws the same arrows as the exact sums
+
+# Copyright (C) 2025 Deepto Debnath, Subhradip Mondal
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import pytest
+from curl.benchmark import precision_disagreement, make_layout, LAYOUTS, SIZES
+from curl.render import arrow_grid_x, arrow_grid_y
+
+# the most of the arrow grid allowed a different colour, length or
+# direction in single precision, and by how many classes at most. arrows
+# only differ where the exact sum lies on the edge between two classes,
+# such as the 8 of the 1,500 arrows around a lone charge whose field is
+# exactly 10^6 N/C, which single precision rounds below it
+MAX_MISMATCH = 1e-2
+MAX_CLASS_DIFFERENCE = 1
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+@pytest.mark.parametrize("n", SIZES)
+def test_fast_precision_draws_same_arrows(layout, n):
+    disagreement = precision_disagreement(make_layout(layout, n), arrow_grid_x, arrow_grid_y)
+    for name in ("color", "length", "angle"):
+        assert disagreement[name + "_mismatch"] <= MAX_MISMATCH, name
+        assert disagreement[name + "_max"] <= MAX_CLASS_DIFFERENCE, name
@@ -0,0 +1,24 @@
+# test_profiler.py - tests of the frame profiler
+
+# Copyright (C) 2025 Deepto Debnath, Subhradip Mondal
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import time
+from curl.profiler import FrameProfiler
+
+# time slept in an idle stage shows up in that stage, but not in the
+# time of the frame or its frame rate
+def test_idle_stages_left_out_of_frame_time():
+    profiler = FrameProfiler(("work", "idle"), idle_stages=("idle",))
+    for frame_number in range(3):
+        profiler.start_frame(frame_number)
+        profiler.mark("work")
+        time.sleep(0.05)
+        profiler.mark("idle")
+    profiler.start_frame(3)
+    frame_numbers, stage_times, frame_times = profiler.history()
+    assert frame_numbers.tolist() == [0, 1, 2]
+    assert (stage_times[:, 1] >= 50).all()
+    assert (frame_times < 25).all()
+    assert profiler.fps_percentiles()[50] > 40
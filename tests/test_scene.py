@@ -0,0 +1,61 @@
+# test_scene.py - tests of reading and writing scene files
+
+# Copyright (C) 2025 Deepto Debnath, Subhradip Mondal
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import json
+import numpy as np
+import pytest
+from curl.scene import make_scene, read_scene, write_scene
+
+# a scene written to JSON or .npz reads back the same
+@pytest.mark.parametrize("name", ["scene.json", "scene.npz"])
+def test_round_trip(tmp_path, name):
+    sources = [{"shape": "ring", "name": "Ring1", "q": -1.0, "x": 150.0, "y": 300.0, "radius": 70.0}]
+    scene = make_scene([[1.0, 300, 300, "Charge1"], [-2.0, 700.5, 250, "Charge2"]], True, True, heatmap="underlay", boundary=0.0, sources=sources)
+    path = str(tmp_path / name)
+    write_scene(path, scene)
+    read_back = read_scene(path)
+    for array, read_array in zip(scene["charges"], read_back["charges"]):
+        assert np.array_equal(array, read_array)
+    assert read_back["names"] == scene["names"]
+    assert read_back["heatmap"] == "underlay" and read_back["boundary"] == 0.0
+    assert read_back["sources"] == sources
+
+# anything that is not a scene is a ValueError, the one error the program
+# expects from a scene file besides OSError, rather than a crash or NaN
+# positions
+@pytest.mark.parametrize("text", ['[1, 2]',
+                                  '{"charges": [{"q": 1, "x": null, "y": 3}]}',
+                                  '{"charges": [{"q": 1, "x": NaN, "y": 3}]}',
+                                  '{"charges": [{"q": 1, "y": 3}]}',
+                                  '{"charges": [5]}',
+                                  '{"conductors": [{"shape": "circle", "x": 1, "y": null, "radius": 3}]}',
+                                  '{"sources": [{"shape": "ring", "q": 1, "x": 1, "y": "a", "radius": 3}]}',
+                                  '{"charges": 5}',
+                                  '{"conductors": {"shape": "circle"}}',
+                                  '{"sources": "line"}',
+                                  '{"charges": [{"q": 1, "x": 2, "y": 3, "trajectory": [[5]]}]}',
+                                  '{"charges": [{"q": 1, "x": 2, "y": 3, "trajectory": [[1, null]]}]}',
+                                  '{"boundary": NaN}',
+                                  '{"density": [[NaN, 1, 2]]}'])
+def test_malformed_scene(tmp_path, text):
+    path = tmp_path / "scene.json"
+    path.write_text(text)
+    with pytest.raises(ValueError):
+        read_scene(str(path))
+
+# the arrays of a .npz archive must be of the same length and finite
+@pytest.mark.parametrize("arrays", [{"x": np.array([1.0])},
+                                    {"y": np.array([np.nan, 2.0])},
+                                    {"density_q": np.array([1.0]), "density_x": np.array([1.0, 2.0]), "density_y": np.array([1.0])}])
+def test_malformed_npz(tmp_path, arrays):
+    path = str(tmp_path / "scene.npz")
+    write_scene(path, make_scene([[1.0, 300, 300, "Charge1"], [-1.0, 700, 300, "Charge2"]]))
+    with np.load(path) as data:
+        contents = dict(data)
+    contents.update(arrays)
+    np.savez(path, **contents)
+    with pytest.raises(ValueError):
+        read_scene(path)
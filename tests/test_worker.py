@@ -0,0 +1,28 @@
+# test_worker.py - tests of the field worker's thread
+
+# Copyright (C) 2025 Deepto Debnath, Subhradip Mondal
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+import pygame
+from curl.worker import FieldWorker
+
+# a job that raises is given up on, without stopping the worker or
+# leaving wait() blocked, and the next job is drawn as usual, its layer
+# coming with what draw_job returned for it
+def test_failed_job_keeps_worker_running():
+    def draw_job(surface, job, is_cancelled):
+        if job == "bad":
+            raise RuntimeError("bad job")
+        return job
+    worker = FieldWorker((10, 10), draw_job)
+    try:
+        worker.submit("bad")
+        assert worker.wait(5)
+        assert worker.take_result(pygame.surface.Surface((10, 10))) is None
+        worker.submit("good")
+        assert worker.wait(5)
+        result = worker.take_result(pygame.surface.Surface((10, 10)))
+        assert result is not None and result[1] == "good"
+    finally:
+        worker.stop()